@@ -49,7 +49,7 @@ public class SecurityConfig {
                 .requestMatchers("/api/auth/**").permitAll()
                 .requestMatchers("/ws/**").permitAll() // Allow WebSocket connections
                 .requestMatchers(HttpMethod.GET, "/actuator/health").permitAll()
-                .requestMatchers(HttpMethod.POST, "/api/transcriptions").permitAll()
+                .requestMatchers(HttpMethod.POST, "/api/transcriptions", "/api/transcriptions/batch").permitAll()
                 .anyRequest().authenticated()
         );
         http.exceptionHandling(ex -> ex
@@ -4,6 +4,8 @@ import com.itss_nihongo.backend.dto.request.CreateTranscriptionRecordRequest;
 import com.itss_nihongo.backend.dto.response.TranscriptionRecordResponse;
 import com.itss_nihongo.backend.service.TranscriptionService;
 import jakarta.validation.Valid;
+import jakarta.validation.constraints.NotEmpty;
+import java.util.List;
 import org.springframework.http.HttpStatus;
 import org.springframework.web.bind.annotation.PostMapping;
 import org.springframework.web.bind.annotation.RequestBody;
@@ -26,6 +28,13 @@ public class TranscriptionController {
     public TranscriptionRecordResponse createTranscription(@Valid @RequestBody CreateTranscriptionRecordRequest request) {
         return transcriptionService.saveTranscription(request);
     }
+
+    @PostMapping("/batch")
+    @ResponseStatus(HttpStatus.CREATED)
+    public List<TranscriptionRecordResponse> createTranscriptions(
+            @RequestBody @NotEmpty List<@Valid CreateTranscriptionRecordRequest> requests) {
+        return transcriptionService.saveTranscriptions(requests);
+    }
 }
 
 
@@ -2,10 +2,13 @@ package com.itss_nihongo.backend.service;
 
 import com.itss_nihongo.backend.dto.request.CreateTranscriptionRecordRequest;
 import com.itss_nihongo.backend.dto.response.TranscriptionRecordResponse;
+import java.util.List;
 
 public interface TranscriptionService {
 
     TranscriptionRecordResponse saveTranscription(CreateTranscriptionRecordRequest request);
+
+    List<TranscriptionRecordResponse> saveTranscriptions(List<CreateTranscriptionRecordRequest> requests);
 }
 
 
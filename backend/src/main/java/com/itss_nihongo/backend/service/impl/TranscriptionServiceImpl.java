@@ -71,6 +71,14 @@ public class TranscriptionServiceImpl implements TranscriptionService {
                 .build();
     }
 
+    @Override
+    public List<TranscriptionRecordResponse> saveTranscriptions(List<CreateTranscriptionRecordRequest> requests) {
+        // One transaction for the whole batch: it is stored completely or not at all
+        return requests.stream()
+                .map(this::saveTranscription)
+                .toList();
+    }
+
     private BigDecimal sanitizeDecimal(BigDecimal value) {
         if (value == null) {
             return null;
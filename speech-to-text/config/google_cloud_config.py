@@ -120,7 +120,7 @@ UPLOAD_TIMEOUT = int(os.getenv("UPLOAD_TIMEOUT", "300"))      # 5 minutes
 # Database Configuration
 # ============================================
 
-DATABASE_FILE = os.getenv("DATABASE_FILE", "database.json")
+DATABASE_FILE = os.getenv("DATABASE_FILE", "database.db")
 
 # ============================================
 # Logging Configuration
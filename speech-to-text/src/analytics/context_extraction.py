@@ -759,6 +759,7 @@ class ContextExtractor:
         self,
         segments: List[Dict],
         slide_transitions: List[Tuple[float, int]],
+        min_importance_threshold: Optional[float] = None,
     ) -> List[ContextObject]:
         """
         Extract contexts from transcript segments.
@@ -774,10 +775,15 @@ class ContextExtractor:
                 - matched_keywords: List[str]
                 - timestamp: Optional[float]
             slide_transitions: List of (timestamp, slide_id) tuples
+            min_importance_threshold: Per-call override of the instance threshold,
+                so a single extractor can serve requests with different thresholds
             
         Returns:
             List of ContextObject instances
         """
+        if min_importance_threshold is None:
+            min_importance_threshold = self.min_importance_threshold
+        
         logger.info(f"Extracting contexts from {len(segments)} segments")
         
         # Convert to TranscriptSegment objects
@@ -806,13 +812,13 @@ class ContextExtractor:
         scored_segments = []
         for segment in transcript_segments:
             importance_score = self.scorer.score_segment(segment, transition_times)
-            if importance_score >= self.min_importance_threshold:
+            if importance_score >= min_importance_threshold:
                 context_type = self.classifier.classify(segment)
                 scored_segments.append((segment, importance_score, context_type))
         
         logger.info(
             f"Scored {len(scored_segments)}/{len(transcript_segments)} segments "
-            f"above threshold {self.min_importance_threshold}"
+            f"above threshold {min_importance_threshold}"
         )
         
         # Step 2: Aggregate related segments
@@ -473,8 +473,8 @@ class IntentionAnalyzer:
         
         return positions
     
+    @staticmethod
     def _calculate_statistics(
-        self,
         intention_segments: List[IntentionSegment],
     ) -> IntentionStatistics:
         """Calculate intention distribution statistics."""
@@ -0,0 +1,55 @@
+"""Locate the Google Cloud service account file shared by the API routers."""
+
+from __future__ import annotations
+
+import functools
+import os
+from pathlib import Path
+from typing import Optional
+
+# speech-to-text/ and the repository root above it
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+REPO_ROOT = PROJECT_DIR.parent
+
+SERVICE_ACCOUNT_FILE = "speech-processing-prod-9ffbefa55e2c.json"
+DEFAULT_SERVICE_ACCOUNT = REPO_ROOT / SERVICE_ACCOUNT_FILE
+
+
+@functools.lru_cache(maxsize=1)
+def find_credentials_file() -> Optional[str]:
+    """
+    Find credentials file in multiple possible locations.
+
+    The result is cached: the candidates are fixed once the process has started,
+    so later callers skip the stat() calls.
+    """
+    # 1. Check environment variable first
+    env_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    if env_path and Path(env_path).exists():
+        return str(Path(env_path))
+
+    candidates = (
+        # 2. Repository root
+        DEFAULT_SERVICE_ACCOUNT,
+        # 3. User-specified path
+        Path("/home/sagiri/Code/python/speech-to-text") / SERVICE_ACCOUNT_FILE,
+        # 4. speech-to-text directory (current project)
+        PROJECT_DIR / SERVICE_ACCOUNT_FILE,
+        # 5. google-credentials.json in repository root
+        REPO_ROOT / "google-credentials.json",
+    )
+    for path in candidates:
+        if path.exists():
+            return str(path)
+
+    return None
+
+
+def ensure_credentials_path() -> Optional[str]:
+    """Ensure GOOGLE_APPLICATION_CREDENTIALS is set, using local json as fallback."""
+    credentials_path = find_credentials_file()
+    if credentials_path:
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
+        return credentials_path
+
+    return os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
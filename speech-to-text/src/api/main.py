@@ -2,10 +2,13 @@
 FastAPI application entrypoint exposing slide processing and speech-to-text services.
 """
 
+import asyncio
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import aiohttp
 from dotenv import load_dotenv
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
@@ -109,6 +112,32 @@ def create_app() -> FastAPI:
         version="1.0.0",
     )
 
+    @app.on_event("startup")
+    async def open_http_session() -> None:
+        """Shared outbound HTTP client (pooled connections) and transcription publisher."""
+        app.state.http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+        )
+
+        # Batched publishing of final transcriptions to the backend
+        app.state.transcription_publisher = transcription.BackendPublisher(app.state.http)
+        app.state.transcription_publisher.start()
+
+        # Default executor behind run_in_executor(None, ...), which runs the blocking
+        # gRPC session calls; Python's default of min(32, cpus + 4) threads is shared
+        # by every websocket session, so size it for the expected concurrency
+        executor_threads = os.getenv("STT_EXECUTOR_THREADS")
+        if executor_threads:
+            asyncio.get_running_loop().set_default_executor(
+                ThreadPoolExecutor(max_workers=int(executor_threads), thread_name_prefix="stt-blocking")
+            )
+            logger.info("Default executor sized to %s threads", executor_threads)
+
+    @app.on_event("shutdown")
+    async def close_http_session() -> None:
+        await app.state.transcription_publisher.close()
+        await app.state.http.close()
+
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -1,14 +1,27 @@
 """
 API router for analyzing slide recordings with Gemini.
 """
+import functools
+import json
 import logging
 import os
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Optional
 
 import google.generativeai as genai
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import re2 as _scan_re  # google-re2: linear-time DFA matching in native code
+except ImportError:
+    _scan_re = re
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -19,6 +32,19 @@ if api_key:
 else:
     logger.warning("GOOGLE_API_KEY not found, Gemini analysis will not work")
 
+# Name of the first model that answered the probe; later requests reuse it
+_active_model_name: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=4)
+def _model(name: str) -> genai.GenerativeModel:
+    """Return the process-wide GenerativeModel instance for a model name."""
+    return genai.GenerativeModel(name)
+
+
+# Transcript text beyond this budget is dropped before building the prompt
+_MAX_TRANSCRIPT_CHARS = int(os.getenv("MAX_TRANSCRIPT_CHARS", "40000"))
+
 
 class AnalysisRequest(BaseModel):
     """Request for analyzing a slide recording."""
@@ -39,25 +65,116 @@ class AnalysisResponse(BaseModel):
     suggestions: List[str] = Field(default_factory=list, description="Gợi ý cải thiện")
 
 
+if msgspec is not None:
+    class _GeminiOut(msgspec.Struct):
+        """Schema of the JSON object Gemini is asked to return."""
+        context_accuracy: float = 0.0
+        content_completeness: float = 0.0
+        context_relevance: float = 0.0
+        feedback: str = "Không có nhận xét"
+        suggestions: List[str] = []
+
+    # strict=False lets numeric strings like "0.8" coerce to float, as float(...) did
+    _DEC = msgspec.json.Decoder(_GeminiOut, strict=False)
+    _DECODE_ERRORS = (json.JSONDecodeError, msgspec.DecodeError)
+else:
+    _DEC = None
+    _DECODE_ERRORS = (json.JSONDecodeError,)
+
+
+_RAW_DECODER = json.JSONDecoder()
+# Flat JSON object whose string values may contain escaped quotes or braces
+_JSON_OBJ = _scan_re.compile(r'(?s)\{(?:[^{}"]|"(?:\\.|[^"\\])*")*\}')
+
+
+def _extract_json_object(text: str) -> str:
+    """
+    Return the first substring of text that is a complete JSON object.
+
+    raw_decode (C scanner) is tried at each '{' first; the precompiled
+    object pattern is only used when no candidate decodes.
+    """
+    start = text.find('{')
+    while start != -1:
+        try:
+            _, end = _RAW_DECODER.raw_decode(text, start)
+            return text[start:end]
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+
+    match = _JSON_OBJ.search(text)
+    if match:
+        return match.group(0)
+    raise ValueError("Could not extract JSON from response")
+
+
+def _join_transcript(texts: List[str]) -> str:
+    """Join transcript texts, cutting the one that reaches the character budget."""
+    buf = []
+    remaining = _MAX_TRANSCRIPT_CHARS
+    for index, text in enumerate(texts):
+        if len(text) > remaining:
+            if remaining > 0:
+                buf.append(text[:remaining])
+            logger.info(
+                f"Transcript truncated within text {index + 1}/{len(texts)} "
+                f"(limit {_MAX_TRANSCRIPT_CHARS} chars)"
+            )
+            break
+        buf.append(text)
+        remaining -= len(text) + 1  # joining space
+    return " ".join(buf)
+
+
+@functools.lru_cache(maxsize=4096)
+def _kw_join(keywords: tuple) -> str:
+    """Render slide keywords for the prompt; cached since slides are re-analyzed often."""
+    return ', '.join(keywords) if keywords else 'Không có'
+
+
+def _decode_analysis(json_str: str) -> AnalysisResponse:
+    """Decode and validate a Gemini JSON object into an AnalysisResponse."""
+    if _DEC is not None:
+        out = _DEC.decode(json_str)
+        return AnalysisResponse(
+            context_accuracy=out.context_accuracy,
+            content_completeness=out.content_completeness,
+            context_relevance=out.context_relevance,
+            feedback=out.feedback,
+            suggestions=out.suggestions,
+        )
+
+    result_json = json.loads(json_str)
+    return AnalysisResponse(
+        context_accuracy=float(result_json.get("context_accuracy", 0.0)),
+        content_completeness=float(result_json.get("content_completeness", 0.0)),
+        context_relevance=float(result_json.get("context_relevance", 0.0)),
+        feedback=result_json.get("feedback", "Không có nhận xét"),
+        suggestions=result_json.get("suggestions", [])
+    )
+
+
 @router.post("/analyze-recording", response_model=AnalysisResponse)
 async def analyze_recording(request: AnalysisRequest) -> AnalysisResponse:
     """
     Phân tích slide recording với Gemini API.
     Đánh giá: ngữ cảnh, độ chính xác, độ đầy đủ.
     """
+    global _active_model_name
+
     if not api_key:
         raise HTTPException(status_code=503, detail="Gemini API key not configured")
 
     try:
         # Combine all transcript texts
-        full_transcript = " ".join(request.transcript_texts)
+        full_transcript = _join_transcript(request.transcript_texts)
         
         # Prepare slide context
         slide_context = f"""
 Nội dung slide:
 {request.slide_content}
 
-Từ khóa: {', '.join(request.slide_keywords) if request.slide_keywords else 'Không có'}
+Từ khóa: {_kw_join(tuple(request.slide_keywords))}
 """
 
         # Determine language for feedback
@@ -96,21 +213,24 @@ Từ khóa: {', '.join(request.slide_keywords) if request.slide_keywords else 'K
 JSONのみを返してください。追加のテキストは含めないでください。
 """
 
-        # Initialize Gemini model
-        model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
-        model = None
+        # Initialize Gemini model (probe only until one model has worked)
+        model = _model(_active_model_name) if _active_model_name else None
         last_error = None
         
-        for name in [model_name, "gemini-1.5-flash", "gemini-flash-latest", "gemini-2.0-flash-001"]:
-            try:
-                model = genai.GenerativeModel(name)
-                # Test with a simple prompt
-                _ = model.generate_content("test")
-                logger.info(f"Using Gemini model: {name}")
-                break
-            except Exception as e:
-                last_error = e
-                continue
+        if model is None:
+            model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+            for name in [model_name, "gemini-1.5-flash", "gemini-flash-latest", "gemini-2.0-flash-001"]:
+                try:
+                    candidate = _model(name)
+                    # Test with a simple prompt
+                    _ = candidate.generate_content("test")
+                    model = candidate
+                    _active_model_name = name
+                    logger.info(f"Using Gemini model: {name}")
+                    break
+                except Exception as e:
+                    last_error = e
+                    continue
         
         if not model:
             raise RuntimeError(f"Could not initialize Gemini model. Last error: {last_error}")
@@ -119,51 +239,13 @@ JSONのみを返してください。追加のテキストは含めないでく
         response = model.generate_content(prompt)
         result_text = response.text.strip()
 
-        # Parse JSON response
-        import json
-        import re
-        
-        # Try to extract JSON from response (handle nested objects)
-        # Find JSON object with balanced braces
-        brace_count = 0
-        start_idx = -1
-        for i, char in enumerate(result_text):
-            if char == '{':
-                if start_idx == -1:
-                    start_idx = i
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0 and start_idx != -1:
-                    json_str = result_text[start_idx:i+1]
-                    try:
-                        result_json = json.loads(json_str)
-                        break
-                    except json.JSONDecodeError:
-                        start_idx = -1
-                        brace_count = 0
-        else:
-            # Fallback: try parsing entire response as JSON
-            try:
-                result_json = json.loads(result_text)
-            except json.JSONDecodeError:
-                # Last resort: try to find JSON with regex
-                json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                if json_match:
-                    result_json = json.loads(json_match.group())
-                else:
-                    raise ValueError("Could not extract JSON from response")
-
-        # Validate and return
-        return AnalysisResponse(
-            context_accuracy=float(result_json.get("context_accuracy", 0.0)),
-            content_completeness=float(result_json.get("content_completeness", 0.0)),
-            context_relevance=float(result_json.get("context_relevance", 0.0)),
-            feedback=result_json.get("feedback", "Không có nhận xét"),
-            suggestions=result_json.get("suggestions", [])
-        )
+        # Gemini usually returns bare JSON; otherwise locate the object in the text
+        try:
+            return _decode_analysis(result_text)
+        except _DECODE_ERRORS:
+            return _decode_analysis(_extract_json_object(result_text))
 
-    except json.JSONDecodeError as e:
+    except _DECODE_ERRORS as e:
         logger.error(f"Failed to parse Gemini JSON response: {e}")
         logger.error(f"Response text: {result_text[:500]}")
         raise HTTPException(status_code=500, detail=f"Failed to parse analysis response: {str(e)}")
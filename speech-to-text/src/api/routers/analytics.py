@@ -4,8 +4,12 @@ Analytics API endpoints for Phase 5: Teaching Analytics Features.
 Core AI endpoints without UI dependencies.
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
@@ -13,10 +17,12 @@ from pydantic import BaseModel, Field
 
 from ...analytics.context_extraction import (
     ContextExtractor,
+    ContextObject,
     ExportGenerator,
 )
 from ...analytics.intention_analysis import (
     IntentionAnalyzer,
+    IntentionSegment,
     IntentionStatistics,
 )
 from datetime import datetime, timezone
@@ -25,6 +31,26 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Extractor and analyzer are stateless between calls (the importance threshold is
+# passed per request), so build them once instead of recompiling patterns per request.
+_EXTRACTOR = ContextExtractor(min_importance_threshold=30.0)
+_ANALYZER = IntentionAnalyzer()
+
+# Runs extraction and intention analysis side by side for /full
+_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="analytics")
+
+# [epoch_seconds, iso_string] of the last generated_at value handed out
+_last_ts: List[Any] = [0.0, ""]
+
+
+def _utcnow_iso() -> str:
+    """Return the current UTC time as ISO string, refreshed at most once per second."""
+    now = time.time()
+    if now - _last_ts[0] > 1.0:
+        _last_ts[0] = now
+        _last_ts[1] = datetime.fromtimestamp(now, timezone.utc).isoformat()
+    return _last_ts[1]
+
 
 class ContextExtractionRequest(BaseModel):
     """Request for context extraction analysis."""
@@ -51,6 +77,48 @@ class ContextExtractionResponse(BaseModel):
         populate_by_name = True
 
 
+def _slide_transitions(request: BaseModel) -> List[Tuple[float, Optional[int]]]:
+    """Convert request slide_transitions into (timestamp, slide_id) tuples."""
+    return [
+        (tran.get('timestamp', 0.0), tran.get('slide_id'))
+        for tran in request.slide_transitions
+    ]
+
+
+def _build_context_response(
+    presentation_id: str,
+    contexts: List[ContextObject],
+) -> ContextExtractionResponse:
+    """Assemble the context extraction response with statistics."""
+    # Generate statistics
+    stats = ExportGenerator._calculate_statistics(contexts)
+    
+    # Convert contexts to dict
+    contexts_dict = [
+        {
+            "context_id": ctx.context_id,
+            "start_time": ctx.start_time,
+            "end_time": ctx.end_time,
+            "slide_page": ctx.slide_page,
+            "text": ctx.text,
+            "context_type": ctx.context_type,
+            "importance_score": ctx.importance_score,
+            "keywords_matched": ctx.keywords_matched,
+            "teacher_notes": ctx.teacher_notes,
+            "created_at": ctx.created_at,
+        }
+        for ctx in contexts
+    ]
+    
+    return ContextExtractionResponse(
+        presentation_id=presentation_id,
+        total_contexts=len(contexts),
+        contexts=contexts_dict,
+        statistics=stats,
+        generated_at=_utcnow_iso(),
+    )
+
+
 @router.post("/context-extraction", response_model=ContextExtractionResponse)
 async def extract_contexts(request: ContextExtractionRequest) -> ContextExtractionResponse:
     """
@@ -59,51 +127,19 @@ async def extract_contexts(request: ContextExtractionRequest) -> ContextExtracti
     This endpoint implements Week 9-10: Context Extraction System.
     Analyzes transcript segments to identify important teaching moments.
     """
+    if not request.segments:
+        # Nothing to analyze: skip the extraction pipeline entirely
+        return _build_context_response(request.presentation_id, [])
+
     try:
-        # Convert slide_transitions format
-        slide_transitions = [
-            (tran.get('timestamp', 0.0), tran.get('slide_id'))
-            for tran in request.slide_transitions
-        ]
-        
-        # Initialize extractor
-        extractor = ContextExtractor(
-            min_importance_threshold=request.min_importance_threshold,
-        )
-        
         # Extract contexts
-        contexts = extractor.extract_contexts(
+        contexts = _EXTRACTOR.extract_contexts(
             segments=request.segments,
-            slide_transitions=slide_transitions,
+            slide_transitions=_slide_transitions(request),
+            min_importance_threshold=request.min_importance_threshold,
         )
         
-        # Generate statistics
-        stats = ExportGenerator._calculate_statistics(contexts)
-        
-        # Convert contexts to dict
-        contexts_dict = [
-            {
-                "context_id": ctx.context_id,
-                "start_time": ctx.start_time,
-                "end_time": ctx.end_time,
-                "slide_page": ctx.slide_page,
-                "text": ctx.text,
-                "context_type": ctx.context_type,
-                "importance_score": ctx.importance_score,
-                "keywords_matched": ctx.keywords_matched,
-                "teacher_notes": ctx.teacher_notes,
-                "created_at": ctx.created_at,
-            }
-            for ctx in contexts
-        ]
-        
-        return ContextExtractionResponse(
-            presentation_id=request.presentation_id,
-            total_contexts=len(contexts),
-            contexts=contexts_dict,
-            statistics=stats,
-            generated_at=datetime.now(timezone.utc).isoformat(),
-        )
+        return _build_context_response(request.presentation_id, contexts)
         
     except Exception as e:
         logger.error(f"Context extraction failed: {e}", exc_info=True)
@@ -113,23 +149,22 @@ async def extract_contexts(request: ContextExtractionRequest) -> ContextExtracti
         ) from e
 
 
+def _export_contexts(request: ContextExtractionRequest) -> List[ContextObject]:
+    """Contexts for the export endpoints; without segments extraction is skipped."""
+    if not request.segments:
+        return []
+    return _EXTRACTOR.extract_contexts(
+        segments=request.segments,
+        slide_transitions=_slide_transitions(request),
+        min_importance_threshold=request.min_importance_threshold,
+    )
+
+
 @router.post("/context-extraction/export/json")
 async def export_contexts_json(request: ContextExtractionRequest) -> Dict[str, Any]:
     """Export contexts as JSON."""
     try:
-        slide_transitions = [
-            (tran.get('timestamp', 0.0), tran.get('slide_id'))
-            for tran in request.slide_transitions
-        ]
-        
-        extractor = ContextExtractor(
-            min_importance_threshold=request.min_importance_threshold,
-        )
-        
-        contexts = extractor.extract_contexts(
-            segments=request.segments,
-            slide_transitions=slide_transitions,
-        )
+        contexts = _export_contexts(request)
         
         return ExportGenerator.export_json(contexts)
         
@@ -145,26 +180,14 @@ async def export_contexts_json(request: ContextExtractionRequest) -> Dict[str, A
 async def export_contexts_text(request: ContextExtractionRequest) -> Dict[str, str]:
     """Export contexts as formatted text report."""
     try:
-        slide_transitions = [
-            (tran.get('timestamp', 0.0), tran.get('slide_id'))
-            for tran in request.slide_transitions
-        ]
-        
-        extractor = ContextExtractor(
-            min_importance_threshold=request.min_importance_threshold,
-        )
-        
-        contexts = extractor.extract_contexts(
-            segments=request.segments,
-            slide_transitions=slide_transitions,
-        )
+        contexts = _export_contexts(request)
         
         text_report = ExportGenerator.export_text(contexts)
         
         return {
             "format": "text",
             "content": text_report,
-            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "generated_at": _utcnow_iso(),
         }
         
     except Exception as e:
@@ -182,26 +205,14 @@ async def export_contexts_html(
 ) -> Dict[str, str]:
     """Export contexts as HTML timeline visualization."""
     try:
-        slide_transitions = [
-            (tran.get('timestamp', 0.0), tran.get('slide_id'))
-            for tran in request.slide_transitions
-        ]
-        
-        extractor = ContextExtractor(
-            min_importance_threshold=request.min_importance_threshold,
-        )
-        
-        contexts = extractor.extract_contexts(
-            segments=request.segments,
-            slide_transitions=slide_transitions,
-        )
+        contexts = _export_contexts(request)
         
         html_timeline = ExportGenerator.export_html_timeline(contexts, total_duration)
         
         return {
             "format": "html",
             "content": html_timeline,
-            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "generated_at": _utcnow_iso(),
         }
         
     except Exception as e:
@@ -236,6 +247,46 @@ class IntentionAnalysisResponse(BaseModel):
         populate_by_name = True
 
 
+def _build_intention_response(
+    presentation_id: str,
+    intention_segments: List[IntentionSegment],
+    statistics: IntentionStatistics,
+) -> IntentionAnalysisResponse:
+    """Assemble the intention analysis response."""
+    # Convert segments to dict
+    segments_dict = [
+        {
+            "segment_id": seg.segment_id,
+            "text": seg.text,
+            "start_time": seg.start_time,
+            "end_time": seg.end_time,
+            "slide_page": seg.slide_page,
+            "intention_category": seg.intention_category,
+            "confidence_score": seg.confidence_score,
+            "key_phrases": seg.key_phrases,
+            "word_count": seg.word_count,
+            "created_at": seg.created_at,
+        }
+        for seg in intention_segments
+    ]
+    
+    # Convert statistics to dict
+    stats_dict = {
+        "total_segments": statistics.total_segments,
+        "total_duration": statistics.total_duration,
+        "by_category": statistics.by_category,
+        "timeline": statistics.timeline,
+    }
+    
+    return IntentionAnalysisResponse(
+        presentation_id=presentation_id,
+        total_segments=len(intention_segments),
+        segments=segments_dict,
+        statistics=stats_dict,
+        generated_at=_utcnow_iso(),
+    )
+
+
 @router.post("/intention-analysis", response_model=IntentionAnalysisResponse)
 async def analyze_intentions(request: IntentionAnalysisRequest) -> IntentionAnalysisResponse:
     """
@@ -245,53 +296,21 @@ async def analyze_intentions(request: IntentionAnalysisRequest) -> IntentionAnal
     Classifies all segments into intention categories (explanation, emphasis, example, 
     comparison, warning, summary) to reveal teaching patterns.
     """
+    if not request.segments:
+        # Nothing to analyze: skip the analysis pipeline entirely
+        return _build_intention_response(
+            request.presentation_id, [], IntentionAnalyzer._calculate_statistics([])
+        )
+
     try:
-        # Convert slide_transitions format
-        slide_transitions = [
-            (tran.get('timestamp', 0.0), tran.get('slide_id'))
-            for tran in request.slide_transitions
-        ]
-        
-        # Initialize analyzer
-        analyzer = IntentionAnalyzer()
-        
         # Analyze intentions
-        intention_segments, statistics = analyzer.analyze_intentions(
+        intention_segments, statistics = _ANALYZER.analyze_intentions(
             segments=request.segments,
-            slide_transitions=slide_transitions,
+            slide_transitions=_slide_transitions(request),
         )
         
-        # Convert segments to dict
-        segments_dict = [
-            {
-                "segment_id": seg.segment_id,
-                "text": seg.text,
-                "start_time": seg.start_time,
-                "end_time": seg.end_time,
-                "slide_page": seg.slide_page,
-                "intention_category": seg.intention_category,
-                "confidence_score": seg.confidence_score,
-                "key_phrases": seg.key_phrases,
-                "word_count": seg.word_count,
-                "created_at": seg.created_at,
-            }
-            for seg in intention_segments
-        ]
-        
-        # Convert statistics to dict
-        stats_dict = {
-            "total_segments": statistics.total_segments,
-            "total_duration": statistics.total_duration,
-            "by_category": statistics.by_category,
-            "timeline": statistics.timeline,
-        }
-        
-        return IntentionAnalysisResponse(
-            presentation_id=request.presentation_id,
-            total_segments=len(intention_segments),
-            segments=segments_dict,
-            statistics=stats_dict,
-            generated_at=datetime.now(timezone.utc).isoformat(),
+        return _build_intention_response(
+            request.presentation_id, intention_segments, statistics
         )
         
     except Exception as e:
@@ -301,3 +320,71 @@ async def analyze_intentions(request: IntentionAnalysisRequest) -> IntentionAnal
             detail=f"Intention analysis failed: {str(e)}"
         ) from e
 
+
+class FullAnalyticsResponse(BaseModel):
+    """Combined response from context extraction and intention analysis."""
+    
+    presentation_id: str = Field(..., alias="presentation_id")
+    context_extraction: ContextExtractionResponse = Field(..., alias="context_extraction")
+    intention_analysis: IntentionAnalysisResponse = Field(..., alias="intention_analysis")
+    generated_at: str = Field(..., alias="generated_at")
+    
+    class Config:
+        populate_by_name = True
+
+
+@router.post("/full", response_model=FullAnalyticsResponse)
+async def analyze_full(request: ContextExtractionRequest) -> FullAnalyticsResponse:
+    """
+    Run context extraction and intention analysis on the same payload.
+    
+    Both pipelines are dispatched to the analytics thread pool concurrently,
+    saving clients a second round-trip with the same segments.
+    """
+    if not request.segments:
+        return FullAnalyticsResponse(
+            presentation_id=request.presentation_id,
+            context_extraction=_build_context_response(request.presentation_id, []),
+            intention_analysis=_build_intention_response(
+                request.presentation_id, [], IntentionAnalyzer._calculate_statistics([])
+            ),
+            generated_at=_utcnow_iso(),
+        )
+
+    try:
+        slide_transitions = _slide_transitions(request)
+        loop = asyncio.get_running_loop()
+        contexts_fut = loop.run_in_executor(
+            _EXECUTOR,
+            lambda: _EXTRACTOR.extract_contexts(
+                segments=request.segments,
+                slide_transitions=slide_transitions,
+                min_importance_threshold=request.min_importance_threshold,
+            ),
+        )
+        intentions_fut = loop.run_in_executor(
+            _EXECUTOR,
+            lambda: _ANALYZER.analyze_intentions(
+                segments=request.segments,
+                slide_transitions=slide_transitions,
+            ),
+        )
+        contexts, (intention_segments, statistics) = await asyncio.gather(
+            contexts_fut, intentions_fut
+        )
+        
+        return FullAnalyticsResponse(
+            presentation_id=request.presentation_id,
+            context_extraction=_build_context_response(request.presentation_id, contexts),
+            intention_analysis=_build_intention_response(
+                request.presentation_id, intention_segments, statistics
+            ),
+            generated_at=_utcnow_iso(),
+        )
+        
+    except Exception as e:
+        logger.error(f"Full analytics failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Full analytics failed: {str(e)}"
+        ) from e
@@ -4,17 +4,25 @@ Final Analysis API endpoint for comprehensive lecture evaluation.
 Analyzes all slide transcripts and global summary to provide comprehensive feedback.
 """
 
+import asyncio
+import functools
 import json
 import logging
 import os
-import re
-from typing import List, Dict, Any, Optional
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from io import BytesIO
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
+import aiohttp
+import orjson
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +39,345 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if GOOGLE_API_KEY:
     genai.configure(api_key=GOOGLE_API_KEY)
 
+# Preferred model first, then fallbacks (pro model is better for vision); duplicates removed
+MODEL_NAMES = tuple(dict.fromkeys([
+    os.getenv("GEMINI_MODEL", "gemini-1.5-flash"),
+    "gemini-1.5-flash",
+    "gemini-1.5-pro",
+    "gemini-flash-latest",
+    "gemini-2.0-flash-001",
+    "gemini-2.0-flash",
+    "gemini-pro",
+]))
+
+# Index into MODEL_NAMES of the model currently used for final analysis
+_model_index = 0
+
+# Static instruction block of the final-analysis prompt, kept terse: every
+# request pays its input tokens and prefill latency. It is sent as the model's
+# system instruction so the per-request contents carry only lecture data.
+ANALYSIS_INSTRUCTIONS = """あなたは教育プレゼンテーションの評価専門家です。全体概要・スライド画像（ある場合）・各スライドのトランスクリプトから講義全体を評価してください。
+- 画像とトランスクリプトを照合し、講師がスライドの要点や図表・箇条書きを正確に説明しているか確認する
+- 要約が未生成のスライドは画像とトランスクリプトから評価する
+- 公平・客観的に、具体的で実行可能な強みと改善点を挙げる
+評価基準（各0.0-1.0）: content_coverage(要点の説明度)|structure_quality(構成の論理性)|clarity_score(分かりやすさ)|engagement_score(魅力)|time_management(時間配分)
+出力: 次のキーを持つ有効なJSONのみ。テキストはすべて日本語。
+{"overall_score":数値,"overall_feedback":文字列,"content_coverage":数値,"structure_quality":数値,"clarity_score":数値,"engagement_score":数値,"time_management":数値,
+"slide_analyses":[{"slide_page_number":整数,"score":数値,"feedback":文字列,"strengths":[文字列],"improvements":[文字列]}],
+"strengths":[文字列],"improvements":[文字列],"recommendations":[文字列]}
+"""
+
+
+# Output cap per analysis call; sized for one chunk of SLIDE_CHUNK_SIZE slides
+# of Japanese feedback, bounding tail latency and cost of runaway answers
+MAX_OUTPUT_TOKENS = int(os.getenv("FINAL_ANALYSIS_MAX_OUTPUT_TOKENS", "4096"))
+
+# JSON mode: Gemini returns a bare JSON document (no markdown fences or prose)
+GENERATION_CONFIG = genai.types.GenerationConfig(
+    response_mime_type="application/json",
+    temperature=0.2,
+    candidate_count=1,
+    max_output_tokens=MAX_OUTPUT_TOKENS,
+)
+
+
+# Explicit Gemini context caching of ANALYSIS_INSTRUCTIONS (opt-in: the API
+# enforces a minimum cached token count that depends on the model)
+PROMPT_CACHE_ENABLED = os.getenv("GEMINI_PROMPT_CACHE", "false").lower() == "true"
+PROMPT_CACHE_TTL = timedelta(hours=1)
+# After a failed create (other than a too-small prompt) the plain model is used
+# for this long before creating the cache is tried again
+PROMPT_CACHE_RETRY_DELAY = 300.0
+
+# model name -> (CachedContent, monotonic time after which it is re-created)
+_prompt_caches: Dict[str, Any] = {}
+# model name -> monotonic time before which no cache create is attempted
+_prompt_cache_retry_at: Dict[str, float] = {}
+
+
+@functools.lru_cache(maxsize=4)
+def _resolve_model(name: str) -> genai.GenerativeModel:
+    """Process-wide model instance per name, built lazily; no probe request is sent."""
+    logger.info(f"Using Gemini model: {name} for final analysis")
+    return genai.GenerativeModel(
+        name,
+        system_instruction=ANALYSIS_INSTRUCTIONS,
+        generation_config=GENERATION_CONFIG,
+    )
+
+
+def _below_cache_minimum(error: Exception) -> bool:
+    """True if Gemini rejected the cache because the prompt has too few tokens."""
+    message = str(error).lower()
+    return isinstance(error, google_exceptions.InvalidArgument) and (
+        "too small" in message or "min_total_token_count" in message
+    )
+
+
+async def _cached_content_model(name: str) -> Optional[genai.GenerativeModel]:
+    """
+    Return a model bound to a CachedContent holding ANALYSIS_INSTRUCTIONS,
+    creating it lazily and again shortly before the TTL runs out.
+    Returns None (plain model is used) if the cache cannot be created.
+    """
+    global PROMPT_CACHE_ENABLED
+
+    entry = _prompt_caches.get(name)
+    if entry is None or entry[1] <= time.monotonic():
+        if _prompt_cache_retry_at.get(name, 0.0) > time.monotonic():
+            return None
+        try:
+            # Blocking network call; run it off the event loop
+            cache = await asyncio.to_thread(
+                genai.caching.CachedContent.create,
+                model=name,
+                system_instruction=ANALYSIS_INSTRUCTIONS,
+                ttl=PROMPT_CACHE_TTL,
+            )
+        except Exception as e:
+            if _below_cache_minimum(e):
+                # The prompt stays below the model's minimum cacheable size
+                logger.warning(f"Gemini prompt caching unavailable for {name}: {e}. Disabling it.")
+                PROMPT_CACHE_ENABLED = False
+            else:
+                logger.warning(
+                    f"Failed to create Gemini cached content for {name}: {e}. "
+                    f"Retrying in {PROMPT_CACHE_RETRY_DELAY:.0f}s"
+                )
+                _prompt_cache_retry_at[name] = time.monotonic() + PROMPT_CACHE_RETRY_DELAY
+            return None
+        entry = (cache, time.monotonic() + PROMPT_CACHE_TTL.total_seconds() * 0.9)
+        _prompt_caches[name] = entry
+        logger.info(f"Created Gemini cached content {cache.name} for {name}")
+
+    return genai.GenerativeModel.from_cached_content(entry[0], generation_config=GENERATION_CONFIG)
+
+
+async def _model_for(name: str) -> genai.GenerativeModel:
+    """Pick the cached-content model when prompt caching is on, else the plain model."""
+    if PROMPT_CACHE_ENABLED:
+        model = await _cached_content_model(name)
+        if model is not None:
+            return model
+    return _resolve_model(name)
+
+
+async def _generate_content(contents: Any) -> Any:
+    """
+    Call Gemini with the current model, trying the next fallbacks if the model
+    is rejected (NotFound/InvalidArgument).
+
+    Only NotFound (the model is gone) moves later requests to the fallback;
+    InvalidArgument is often caused by this request's content, e.g. an
+    oversized image, so the fallback is used for this request only.
+    """
+    global _model_index
+
+    index = _model_index
+    while True:
+        name = MODEL_NAMES[index]
+        try:
+            model = await _model_for(name)
+            return await model.generate_content_async(contents)
+        except (google_exceptions.NotFound, google_exceptions.InvalidArgument) as e:
+            if index + 1 >= len(MODEL_NAMES):
+                raise
+            logger.warning(f"Model {name} failed: {e}. Falling back to {MODEL_NAMES[index + 1]}")
+            # Compared with the index this request started from, so concurrent
+            # failures of the same model advance the shared index only once
+            if isinstance(e, google_exceptions.NotFound) and _model_index == index:
+                _model_index = index + 1
+            index += 1
+
+
+# Lectures with more slides than this are analyzed in parallel chunks and combined
+SLIDE_CHUNK_SIZE = int(os.getenv("FINAL_ANALYSIS_CHUNK_SIZE", "10"))
+
+# Numeric scores of the analysis JSON (each 0.0-1.0)
+SCORE_FIELDS = (
+    "overall_score",
+    "content_coverage",
+    "structure_quality",
+    "clarity_score",
+    "engagement_score",
+    "time_management",
+)
+
+# Transcripts of summarized slides longer than this are sent as head + tail
+# snippets; the slide summary already carries their content.
+TRANSCRIPT_SNIPPET_THRESHOLD = 1500
+TRANSCRIPT_SNIPPET_HEAD = 600
+TRANSCRIPT_SNIPPET_TAIL = 400
+
+# Maximum number of slide image/PDF downloads in flight per request
+FETCH_CONCURRENCY = 10
+
+# Longest edge (px) of slide images sent to Gemini vision; larger renders are
+# only downsampled server-side and cost upload time and request size.
+MAX_IMAGE_EDGE = int(os.getenv("SLIDE_IMAGE_MAX_EDGE", "1024"))
+
+# Decoded slide images keyed by URL (the #page= fragment makes PDF pages unique).
+# Slides rarely change between analyses of a lecture, so warm calls skip both
+# the download and the PyMuPDF render.
+SLIDE_IMAGE_CACHE_SIZE = int(os.getenv("SLIDE_IMAGE_CACHE_SIZE", "64"))
+_slide_image_cache: "OrderedDict[str, Any]" = OrderedDict()
+
+
+def _cache_get(url: str) -> Optional[Any]:
+    """Return a cached slide image and mark it most recently used."""
+    img = _slide_image_cache.get(url)
+    if img is not None:
+        _slide_image_cache.move_to_end(url)
+    return img
+
+
+def _cache_put(url: str, img: Any) -> None:
+    """Store a slide image, evicting the least recently used entries."""
+    if SLIDE_IMAGE_CACHE_SIZE <= 0:
+        return
+    _slide_image_cache[url] = img
+    _slide_image_cache.move_to_end(url)
+    while len(_slide_image_cache) > SLIDE_IMAGE_CACHE_SIZE:
+        _slide_image_cache.popitem(last=False)
+
+
+async def _fetch_bytes(session: aiohttp.ClientSession, url: str, sem: asyncio.Semaphore) -> bytes:
+    """Download a URL body, bounded by the shared semaphore."""
+    async with sem:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            return await response.read()
+
+
+def _pixmap_to_image(pix: Any) -> Any:
+    """Convert a PyMuPDF pixmap to a PIL image, letting the C layer pack the pixels."""
+    if hasattr(pix, "pil_image"):  # PyMuPDF >= 1.22
+        return pix.pil_image()
+
+    from PIL import Image as PILImage
+    return PILImage.open(BytesIO(pix.tobytes("ppm")))
+
+
+def _render_pdf_pages(pdf_data: bytes, page_nums: List[int]) -> Dict[int, Any]:
+    """
+    Render the requested PDF pages (0-indexed) to PIL images from a single open
+    document; CPU-bound, run off the event loop. Out-of-range pages are skipped.
+    """
+    import fitz  # PyMuPDF for PDF page extraction
+
+    rendered: Dict[int, Any] = {}
+    pdf_doc = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        for page_num in page_nums:
+            if not 0 <= page_num < len(pdf_doc):
+                continue
+            page = pdf_doc[page_num]
+            # Render at zoom 2 for quality, but no larger than MAX_IMAGE_EDGE
+            zoom = min(2.0, MAX_IMAGE_EDGE / max(page.rect.width, page.rect.height, 1.0))
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+            rendered[page_num] = _pixmap_to_image(pix)
+    finally:
+        pdf_doc.close()
+    return rendered
+
+
+async def _load_pdf_pages(
+    session: aiohttp.ClientSession,
+    pdf_url: str,
+    pages: Dict[str, int],
+    sem: asyncio.Semaphore,
+    images: Dict[str, Any],
+) -> None:
+    """Download a PDF once and render every requested page into images (keyed by URL)."""
+    try:
+        pdf_data = await _fetch_bytes(session, pdf_url, sem)
+        rendered = await asyncio.to_thread(_render_pdf_pages, pdf_data, list(set(pages.values())))
+    except Exception as e:
+        # Nếu không load được image, chỉ dùng text prompt
+        logger.warning(f"Failed to load PDF from {pdf_url}: {e}. Continuing without its pages.")
+        return
+
+    for img_url, page_num in pages.items():
+        img = rendered.get(page_num)
+        if img is not None:
+            logger.debug(f"Extracted page {page_num + 1} from PDF and added to content")
+            images[img_url] = img
+            _cache_put(img_url, img)
+
+
+async def _load_image(
+    session: aiohttp.ClientSession,
+    img_url: str,
+    sem: asyncio.Semaphore,
+    images: Dict[str, Any],
+) -> None:
+    """Download and decode a regular slide image into images (keyed by URL)."""
+    from PIL import Image as PILImage
+
+    try:
+        img_data = await _fetch_bytes(session, img_url, sem)
+        img = PILImage.open(BytesIO(img_data))
+        img.load()  # decode now so the cached image does not re-read the buffer
+        img.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), PILImage.LANCZOS)
+    except Exception as e:
+        # Nếu không load được image, chỉ dùng text prompt
+        logger.warning(f"Failed to load image from {img_url}: {e}. Continuing without image.")
+        return
+
+    logger.debug(f"Added image from URL: {img_url}")
+    images[img_url] = img
+    _cache_put(img_url, img)
+
+
+async def _load_slide_images(
+    image_urls: List[str],
+    session: Optional[aiohttp.ClientSession] = None,
+) -> List[Any]:
+    """
+    Fetch all slide images concurrently, preserving the order of image_urls.
+
+    URLs of the form <pdf>#page=N are grouped by PDF so each document is
+    downloaded and opened once, however many of its pages are referenced.
+    session is the app-wide client; a temporary one is used if it is missing.
+    """
+    images: Dict[str, Any] = {}
+    pdf_pages: Dict[str, Dict[str, int]] = {}
+    plain_urls: Dict[str, None] = {}
+
+    for img_url in image_urls:
+        cached = _cache_get(img_url)
+        if cached is not None:
+            images[img_url] = cached
+            continue
+
+        # Check if URL is PDF with page parameter
+        if "#page=" in img_url:
+            pdf_url, page = img_url.split("#page=", 1)
+            try:
+                page_num = int(page) - 1  # 0-indexed
+            except ValueError:
+                logger.warning(f"Invalid page number in {img_url}. Continuing without image.")
+                continue
+            pdf_pages.setdefault(pdf_url, {})[img_url] = page_num
+        else:
+            plain_urls[img_url] = None
+
+    if pdf_pages or plain_urls:
+        sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+        temp_session = None
+        if session is None or session.closed:
+            session = temp_session = aiohttp.ClientSession()
+        try:
+            await asyncio.gather(
+                *[_load_pdf_pages(session, pdf_url, pages, sem, images) for pdf_url, pages in pdf_pages.items()],
+                *[_load_image(session, img_url, sem, images) for img_url in plain_urls],
+            )
+        finally:
+            if temp_session is not None:
+                await temp_session.close()
+
+    return [images[img_url] for img_url in image_urls if img_url in images]
+
 
 class SlideTranscript(BaseModel):
     slide_page_number: int
@@ -43,6 +390,7 @@ class FinalAnalysisRequest(BaseModel):
     lecture_id: int
     global_summary: Optional[str] = None
     slide_transcripts: List[SlideTranscript] = Field(default_factory=list)
+    full_transcript: bool = False  # Gửi toàn bộ transcript kể cả khi đã có slide_summary
 
 
 class SlideAnalysis(BaseModel):
@@ -69,71 +417,29 @@ class FinalAnalysisResponse(BaseModel):
     recommendations: List[str] = Field(default_factory=list)
 
 
-def create_analysis_prompt(global_summary: Optional[str], slide_transcripts: List[SlideTranscript]) -> tuple[str, List[str]]:
+def _transcript_snippet(transcript: SlideTranscript) -> str:
+    """Shorten a long transcript to its head and tail when the slide has a summary."""
+    text = transcript.transcript_text
+    if not transcript.slide_summary or len(text) < TRANSCRIPT_SNIPPET_THRESHOLD:
+        return text
+    return text[:TRANSCRIPT_SNIPPET_HEAD] + " …(中略)… " + text[-TRANSCRIPT_SNIPPET_TAIL:]
+
+
+def create_analysis_prompt(
+    global_summary: Optional[str],
+    slide_transcripts: List[SlideTranscript],
+    full_transcript: bool = False,
+) -> tuple[str, List[str]]:
     """
-    Create prompt for Gemini to analyze the entire lecture. Returns analysis in Japanese.
+    Create the per-lecture part of the Gemini prompt (the static instructions are
+    the model's system instruction). Returns analysis in Japanese.
+    Long transcripts of summarized slides are shortened unless full_transcript is set.
     Returns: (prompt_text, image_urls) - prompt text and list of image URLs for vision API
     """
     
     prompt_parts = []
     image_urls = []
     
-    prompt_parts.append("""あなたは教育プレゼンテーションの評価・分析の専門家です。
-以下の情報に基づいて、講義全体を分析する任務を担います：
-1. スライドの全体概要（global summary）
-2. 各スライドの画像（提供されている場合）
-3. 録音されたすべてのスライドからのトランスクリプト
-
-**重要な注意事項：**
-- 各スライドには画像が提供されている場合があります。画像を注意深く確認し、スライドの内容を理解してください。
-- トランスクリプトとスライド画像を照合して、講師がスライドの内容を正確に説明しているかを評価してください。
-- 一部のスライドにはトランスクリプトがあるが、まだ要約（summary）が生成されていない場合があります。その場合でも、スライド画像とトランスクリプトを基に評価してください。
-
-以下の評価基準に基づいて講義を評価し、詳細で有用なフィードバックを提供してください：
-
-**評価基準：**
-1. **コンテンツカバレッジ（Content Coverage）**: 講師がスライドの主要なポイントを十分に説明しているかを評価
-2. **構造の質（Structure Quality）**: 内容の構成と提示方法が論理的で一貫性があるかを評価
-3. **明確性（Clarity）**: 表現や説明が理解しやすいかを評価
-4. **エンゲージメント（Engagement）**: プレゼンテーションが魅力的で興味を引くかを評価
-5. **時間管理（Time Management）**: 各部分への時間配分が適切かを評価
-
-**出力要件：**
-以下の構造のJSONオブジェクトを返してください（JSONのみを返し、追加のテキストは含めないでください）。
-すべてのテキスト（フィードバック、強み、改善点、推奨事項など）は日本語で記述してください：
-
-{
-  "overall_score": <0.0から1.0の数値>,
-  "overall_feedback": "<講義全体に関する総合的なコメント（日本語）>",
-  "content_coverage": <0.0から1.0の数値>,
-  "structure_quality": <0.0から1.0の数値>,
-  "clarity_score": <0.0から1.0の数値>,
-  "engagement_score": <0.0から1.0の数値>,
-  "time_management": <0.0から1.0の数値>,
-  "slide_analyses": [
-    {
-      "slide_page_number": <ページ番号>,
-      "score": <0.0から1.0の数値>,
-      "feedback": "<このスライドに関するコメント（日本語）>",
-      "strengths": ["<強み1（日本語）>", "<強み2（日本語）>", ...],
-      "improvements": ["<改善点1（日本語）>", "<改善点2（日本語）>", ...]
-    },
-    ...
-  ],
-  "strengths": ["<総合的な強み1（日本語）>", "<総合的な強み2（日本語）>", ...],
-  "improvements": ["<総合的な改善点1（日本語）>", "<総合的な改善点2（日本語）>", ...],
-  "recommendations": ["<具体的な推奨事項1（日本語）>", "<具体的な推奨事項2（日本語）>", ...]
-}
-
-**注意事項：**
-- 公平で客観的な評価を行ってください
-- 具体的で実行可能なフィードバックを提供してください
-- 強みと改善点の両方に焦点を当ててください
-- 有効なJSON形式であることを確認してください
-- すべてのテキストフィールドは必ず日本語で記述してください
-
-""")
-    
     if global_summary:
         prompt_parts.append(f"\n**スライドの全体概要（Global Summary）：**\n{global_summary}\n")
     
@@ -149,28 +455,178 @@ def create_analysis_prompt(global_summary: Optional[str], slide_transcripts: Lis
         if transcript.slide_summary:
             prompt_parts.append(f"スライドの要約: {transcript.slide_summary}")
         else:
-            prompt_parts.append(f"スライドの要約: (まだ生成されていません - スライド画像とトランスクリプトを基に評価してください)")
+            prompt_parts.append("スライドの要約: (未生成)")
         
-        prompt_parts.append(f"トランスクリプト:\n{transcript.transcript_text}\n")
+        text = transcript.transcript_text if full_transcript else _transcript_snippet(transcript)
+        prompt_parts.append(f"トランスクリプト:\n{text}\n")
     
-    prompt_parts.append("""
-**分析のポイント：**
-- 各スライドについて、スライド画像の内容とトランスクリプトを照合してください
-- スライドの要約がない場合でも、画像とトランスクリプトから内容を理解して評価してください
-- 講師がスライドの主要なポイントを正確に説明しているかを確認してください
-- スライドの視覚的な要素（図表、グラフ、箇条書きなど）が適切に説明されているかを評価してください
-
-上記の要件に従って分析し、JSONを返してください。すべてのテキストは日本語で記述してください。""")
+    prompt_parts.append("\n上記の要件に従って分析し、JSONのみを返してください。")
     
     return "\n".join(prompt_parts), image_urls
 
 
+def _parse_analysis_response(response: Any) -> Dict[str, Any]:
+    """Extract the analysis JSON object from a Gemini response."""
+    # Parse JSON từ response
+    if not response or not response.text:
+        logger.error("Gemini API returned empty response!")
+        raise HTTPException(
+            status_code=500,
+            detail="Gemini API returned empty response"
+        )
+    
+    response_text = response.text.strip()
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=== Gemini API Raw Response ===")
+        logger.debug(f"Response length: {len(response_text)} characters")
+        logger.debug(f"Full response text:\n{response_text}")
+        logger.debug("================================")
+    
+    # JSON mode (GENERATION_CONFIG) guarantees a bare JSON document. orjson
+    # accepts str directly; its JSONDecodeError subclasses json.JSONDecodeError
+    try:
+        analysis_data = orjson.loads(response_text)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("=== Parsed Analysis Data ===")
+            logger.debug(f"Overall Score: {analysis_data.get('overall_score')}")
+            logger.debug(f"Content Coverage: {analysis_data.get('content_coverage')}")
+            logger.debug(f"Structure Quality: {analysis_data.get('structure_quality')}")
+            logger.debug(f"Clarity Score: {analysis_data.get('clarity_score')}")
+            logger.debug(f"Engagement Score: {analysis_data.get('engagement_score')}")
+            logger.debug(f"Time Management: {analysis_data.get('time_management')}")
+            logger.debug(f"Number of slide analyses: {len(analysis_data.get('slide_analyses', []))}")
+            logger.debug("============================")
+    except orjson.JSONDecodeError:
+        logger.error(f"Failed to parse JSON from response: {response_text[:500]}")
+        raise
+    
+    return analysis_data
+
+
+async def _analyze_slides(
+    global_summary: Optional[str],
+    slide_transcripts: List[SlideTranscript],
+    session: Optional[aiohttp.ClientSession] = None,
+    full_transcript: bool = False,
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Run one Gemini analysis call over the given slides (with their images).
+    Returns: (analysis_data, response_length) - parsed JSON and raw response size in characters
+    """
+    # Tạo prompt và lấy image URLs
+    prompt, image_urls = create_analysis_prompt(global_summary, slide_transcripts, full_transcript)
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Prompt length: {len(prompt)} characters")
+        logger.debug(f"Number of images: {len(image_urls)}")
+        if image_urls:
+            logger.debug(f"Image URLs: {image_urls}")
+    
+    # Tạo content với images nếu có
+    if image_urls:
+        # Nếu có images, tạo content parts với images
+        images = await _load_slide_images(image_urls, session)
+        content_parts = [prompt, *images]
+        
+        # Generate với images
+        logger.debug(f"Generating content with {len(images)} images...")
+        response = await _generate_content(content_parts)
+    else:
+        # Không có images, chỉ dùng text prompt
+        logger.debug("Generating content with text only...")
+        response = await _generate_content(prompt)
+    
+    return _parse_analysis_response(response), len(response.text)
+
+
+def _weighted_score(results: List[Dict[str, Any]], weights: List[int], key: str) -> Optional[float]:
+    """Weighted mean of a numeric field over chunk results, ignoring missing/invalid values."""
+    total = 0.0
+    weight_sum = 0
+    for result, weight in zip(results, weights):
+        try:
+            total += float(result.get(key)) * weight
+            weight_sum += weight
+        except (TypeError, ValueError):
+            continue
+    return total / weight_sum if weight_sum else None
+
+
+async def _reduce_chunk_results(
+    results: List[Dict[str, Any]],
+    chunk_sizes: List[int],
+) -> Dict[str, Any]:
+    """
+    Combine per-chunk analyses: scores are slide-weighted means, slide analyses
+    are concatenated, and one small Gemini call merges the lecture-level texts.
+    """
+    merged: Dict[str, Any] = {
+        key: _weighted_score(results, chunk_sizes, key) for key in SCORE_FIELDS
+    }
+    merged["slide_analyses"] = [
+        sa for result in results for sa in (result.get("slide_analyses") or [])
+    ]
+    merged["overall_feedback"] = "\n".join(
+        str(result["overall_feedback"]) for result in results if result.get("overall_feedback")
+    )
+    for key in ("strengths", "improvements", "recommendations"):
+        merged[key] = list(dict.fromkeys(
+            item for result in results for item in (result.get(key) or [])
+        ))
+    
+    partials = [
+        {key: result.get(key) for key in ("overall_feedback", "strengths", "improvements", "recommendations")}
+        for result in results
+    ]
+    reduce_prompt = (
+        "以下は講義をスライド順に分割して評価した部分結果です。"
+        "講義全体として overall_feedback・strengths・improvements・recommendations を統合し、"
+        "重複を除いて同じJSON形式で返してください（slide_analysesは空配列）。\n"
+        + json.dumps(partials, ensure_ascii=False)
+    )
+    try:
+        combined = _parse_analysis_response(await _generate_content(reduce_prompt))
+    except Exception as e:
+        logger.warning(f"Reduce step failed: {e}. Using concatenated chunk feedback.")
+        return merged
+    
+    for key in ("overall_feedback", "strengths", "improvements", "recommendations"):
+        if combined.get(key):
+            merged[key] = combined[key]
+    return merged
+
+
+def _safe_float(data: Dict[str, Any], key: str, default: float = 0.0) -> float:
+    """Read a numeric field from Gemini output, falling back to default if missing or invalid."""
+    value = data.get(key)
+    if value is None:
+        logger.warning(f"Missing or null value for {key}, using default {default}")
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Invalid value for {key}: {value}, using default {default}. Error: {e}")
+        return default
+
+
+def _safe_str(data: Dict[str, Any], key: str, default: str = "") -> str:
+    """Read a text field from Gemini output, falling back to default if missing or empty."""
+    value = data.get(key)
+    if value is None:
+        logger.warning(f"Missing or null value for {key}, using default")
+        return default
+    return str(value) if value else default
+
+
 @router.post("/final-analysis", response_model=FinalAnalysisResponse)
-async def analyze_final_lecture(request: FinalAnalysisRequest) -> FinalAnalysisResponse:
+async def analyze_final_lecture(request: FinalAnalysisRequest, http_request: Request) -> FinalAnalysisResponse:
     """
     Analyze the entire lecture comprehensively based on global summary and all transcripts.
     Returns analysis results in Japanese.
     """
+    started = time.perf_counter()
+    session = getattr(http_request.app.state, "http", None)
     try:
         if not GOOGLE_API_KEY:
             raise HTTPException(
@@ -185,189 +641,47 @@ async def analyze_final_lecture(request: FinalAnalysisRequest) -> FinalAnalysisR
             )
         
         # Log request data
-        logger.info("=== Final Analysis Request Received ===")
-        logger.info(f"Lecture ID: {request.lecture_id}")
-        logger.info(f"Global Summary: {request.global_summary[:200] if request.global_summary else 'None'}...")
-        logger.info(f"Number of slide transcripts: {len(request.slide_transcripts)}")
-        for i, transcript in enumerate(request.slide_transcripts):
-            logger.info(f"  Slide {i+1}: page={transcript.slide_page_number}, "
-                       f"transcript_length={len(transcript.transcript_text) if transcript.transcript_text else 0}, "
-                       f"summary={'present' if transcript.slide_summary else 'None'}, "
-                       f"image_url={'present' if transcript.slide_image_url else 'None'}")
-        logger.info("========================================")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("=== Final Analysis Request Received ===")
+            logger.debug(f"Lecture ID: {request.lecture_id}")
+            logger.debug(f"Global Summary: {request.global_summary[:200] if request.global_summary else 'None'}...")
+            logger.debug(f"Number of slide transcripts: {len(request.slide_transcripts)}")
+            for i, transcript in enumerate(request.slide_transcripts):
+                logger.debug(f"  Slide {i+1}: page={transcript.slide_page_number}, "
+                            f"transcript_length={len(transcript.transcript_text) if transcript.transcript_text else 0}, "
+                            f"summary={'present' if transcript.slide_summary else 'None'}, "
+                            f"image_url={'present' if transcript.slide_image_url else 'None'}")
+            logger.debug("========================================")
         
-        # Tạo prompt và lấy image URLs
-        prompt, image_urls = create_analysis_prompt(request.global_summary, request.slide_transcripts)
-        
-        logger.info(f"Prompt length: {len(prompt)} characters")
-        logger.info(f"Number of images: {len(image_urls)}")
-        if image_urls:
-            logger.info(f"Image URLs: {image_urls}")
-        
-        # Gọi Gemini - thử các model names khác nhau (giống như analysis.py)
-        # Sử dụng model hỗ trợ vision nếu có images
-        model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
-        model = None
-        last_error = None
-        
-        model_names = [
-            model_name,
-            "gemini-1.5-flash",
-            "gemini-1.5-pro",  # Pro model tốt hơn cho vision
-            "gemini-flash-latest",
-            "gemini-2.0-flash-001",
-            "gemini-2.0-flash",
-            "gemini-pro",
-        ]
-        
-        for name in model_names:
-            try:
-                model = genai.GenerativeModel(name)
-                # Test với một prompt đơn giản
-                _ = model.generate_content("test")
-                logger.info(f"Using Gemini model: {name} for final analysis")
-                break
-            except Exception as e:
-                last_error = e
-                logger.debug(f"Model {name} failed: {e}")
-                continue
-        
-        if not model:
-            error_msg = f"Could not initialize Gemini model. Tried: {model_names}. Last error: {last_error}"
-            logger.error(error_msg)
-            raise HTTPException(
-                status_code=500,
-                detail=error_msg
+        transcripts = request.slide_transcripts
+        if len(transcripts) > SLIDE_CHUNK_SIZE:
+            # Long lecture: analyze chunks in parallel, then combine (map-reduce)
+            chunks = [
+                transcripts[k:k + SLIDE_CHUNK_SIZE]
+                for k in range(0, len(transcripts), SLIDE_CHUNK_SIZE)
+            ]
+            logger.debug(f"Analyzing {len(transcripts)} slides in {len(chunks)} chunks")
+            chunk_outputs = await asyncio.gather(
+                *[
+                    _analyze_slides(request.global_summary, chunk, session, request.full_transcript)
+                    for chunk in chunks
+                ]
+            )
+            response_length = sum(length for _, length in chunk_outputs)
+            analysis_data = await _reduce_chunk_results(
+                [data for data, _ in chunk_outputs], [len(chunk) for chunk in chunks]
             )
-        
-        # Tạo content với images nếu có
-        if image_urls:
-            # Nếu có images, tạo content parts với images
-            import urllib.request
-            from io import BytesIO
-            from PIL import Image as PILImage
-            import fitz  # PyMuPDF for PDF page extraction
-            
-            content_parts = [prompt]
-            image_count = 0
-            
-            for img_url in image_urls:
-                try:
-                    # Check if URL is PDF with page parameter
-                    if "#page=" in img_url:
-                        # Extract PDF URL and page number
-                        pdf_url = img_url.split("#page=")[0]
-                        page_num = int(img_url.split("#page=")[1]) - 1  # 0-indexed
-                        
-                        # Download PDF
-                        with urllib.request.urlopen(pdf_url) as response:
-                            pdf_data = response.read()
-                        
-                        # Extract page as image using PyMuPDF
-                        pdf_doc = fitz.open(stream=pdf_data, filetype="pdf")
-                        if page_num < len(pdf_doc):
-                            page = pdf_doc[page_num]
-                            # Render page as image (zoom factor 2 for better quality)
-                            mat = fitz.Matrix(2.0, 2.0)
-                            pix = page.get_pixmap(matrix=mat)
-                            # Convert to PIL Image
-                            img = PILImage.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                            content_parts.append(img)
-                            image_count += 1
-                            logger.info(f"Extracted page {page_num + 1} from PDF and added to content")
-                        pdf_doc.close()
-                    else:
-                        # Regular image URL
-                        with urllib.request.urlopen(img_url) as response:
-                            img_data = response.read()
-                            img = PILImage.open(BytesIO(img_data))
-                            content_parts.append(img)
-                            image_count += 1
-                            logger.debug(f"Added image from URL: {img_url}")
-                except Exception as e:
-                    logger.warning(f"Failed to load image from {img_url}: {e}. Continuing without image.")
-                    # Nếu không load được image, chỉ dùng text prompt
-                    pass
-            
-            # Generate với images
-            logger.info(f"Generating content with {image_count} images...")
-            response = model.generate_content(content_parts)
         else:
-            # Không có images, chỉ dùng text prompt
-            logger.info("Generating content with text only...")
-            response = model.generate_content(prompt)
-        
-        # Parse JSON từ response
-        if not response or not response.text:
-            logger.error("Gemini API returned empty response!")
-            raise HTTPException(
-                status_code=500,
-                detail="Gemini API returned empty response"
+            analysis_data, response_length = await _analyze_slides(
+                request.global_summary, transcripts, session, request.full_transcript
             )
         
-        response_text = response.text.strip()
-        
-        logger.info("=== Gemini API Raw Response ===")
-        logger.info(f"Response length: {len(response_text)} characters")
-        logger.info(f"Full response text:\n{response_text}")
-        logger.info("================================")
-        
-        # Loại bỏ markdown code blocks nếu có
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        # Parse JSON với error handling tốt hơn
-        try:
-            analysis_data = json.loads(response_text)
-            logger.info("=== Parsed Analysis Data ===")
-            logger.info(f"Overall Score: {analysis_data.get('overall_score')}")
-            logger.info(f"Content Coverage: {analysis_data.get('content_coverage')}")
-            logger.info(f"Structure Quality: {analysis_data.get('structure_quality')}")
-            logger.info(f"Clarity Score: {analysis_data.get('clarity_score')}")
-            logger.info(f"Engagement Score: {analysis_data.get('engagement_score')}")
-            logger.info(f"Time Management: {analysis_data.get('time_management')}")
-            logger.info(f"Number of slide analyses: {len(analysis_data.get('slide_analyses', []))}")
-            logger.info("============================")
-        except json.JSONDecodeError:
-            # Nếu không parse được JSON, thử extract JSON từ text
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                analysis_data = json.loads(json_match.group())
-            else:
-                logger.error(f"Failed to extract JSON from response: {response_text[:500]}")
-                raise
-        
-        # Helper function to safely get float value
-        def get_float_value(data: Dict[str, Any], key: str, default: float = 0.0) -> float:
-            value = data.get(key)
-            if value is None:
-                logger.warning(f"Missing or null value for {key}, using default {default}")
-                return default
-            try:
-                return float(value)
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Invalid value for {key}: {value}, using default {default}. Error: {e}")
-                return default
-        
-        # Helper function to safely get string value
-        def get_string_value(data: Dict[str, Any], key: str, default: str = "") -> str:
-            value = data.get(key)
-            if value is None:
-                logger.warning(f"Missing or null value for {key}, using default")
-                return default
-            return str(value) if value else default
-        
         # Convert slide_analyses
         slide_analyses = [
             SlideAnalysis(
                 slide_page_number=sa.get("slide_page_number", 0),
-                score=get_float_value(sa, "score", 0.0),
-                feedback=get_string_value(sa, "feedback", ""),
+                score=_safe_float(sa, "score"),
+                feedback=_safe_str(sa, "feedback"),
                 strengths=sa.get("strengths", []) or [],
                 improvements=sa.get("improvements", []) or []
             )
@@ -375,42 +689,43 @@ async def analyze_final_lecture(request: FinalAnalysisRequest) -> FinalAnalysisR
         ]
         
         # Build response with validated values
+        scores = {key: _safe_float(analysis_data, key) for key in SCORE_FIELDS}
         response_data = FinalAnalysisResponse(
             lecture_id=request.lecture_id,
-            overall_score=get_float_value(analysis_data, "overall_score", 0.0),
-            overall_feedback=get_string_value(analysis_data, "overall_feedback", "分析結果が利用できませんでした。"),
-            content_coverage=get_float_value(analysis_data, "content_coverage", 0.0),
-            structure_quality=get_float_value(analysis_data, "structure_quality", 0.0),
-            clarity_score=get_float_value(analysis_data, "clarity_score", 0.0),
-            engagement_score=get_float_value(analysis_data, "engagement_score", 0.0),
-            time_management=get_float_value(analysis_data, "time_management", 0.0),
+            overall_feedback=_safe_str(analysis_data, "overall_feedback", "分析結果が利用できませんでした。"),
+            **scores,
             slide_analyses=slide_analyses,
             strengths=analysis_data.get("strengths", []) or [],
             improvements=analysis_data.get("improvements", []) or [],
             recommendations=analysis_data.get("recommendations", []) or []
         )
         
-        logger.info("=== Final Response Data ===")
-        logger.info(f"Lecture ID: {response_data.lecture_id}")
-        logger.info(f"Overall Score: {response_data.overall_score}")
-        logger.info(f"Content Coverage: {response_data.content_coverage}")
-        logger.info(f"Structure Quality: {response_data.structure_quality}")
-        logger.info(f"Clarity Score: {response_data.clarity_score}")
-        logger.info(f"Engagement Score: {response_data.engagement_score}")
-        logger.info(f"Time Management: {response_data.time_management}")
-        logger.info(f"Overall Feedback: {response_data.overall_feedback[:200] if response_data.overall_feedback else 'None'}...")
-        logger.info(f"Number of slide analyses: {len(response_data.slide_analyses)}")
-        logger.info(f"Number of strengths: {len(response_data.strengths)}")
-        logger.info(f"Number of improvements: {len(response_data.improvements)}")
-        logger.info(f"Number of recommendations: {len(response_data.recommendations)}")
-        logger.info("===========================")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("=== Final Response Data ===")
+            logger.debug(f"Lecture ID: {response_data.lecture_id}")
+            logger.debug(f"Overall Score: {response_data.overall_score}")
+            logger.debug(f"Content Coverage: {response_data.content_coverage}")
+            logger.debug(f"Structure Quality: {response_data.structure_quality}")
+            logger.debug(f"Clarity Score: {response_data.clarity_score}")
+            logger.debug(f"Engagement Score: {response_data.engagement_score}")
+            logger.debug(f"Time Management: {response_data.time_management}")
+            logger.debug(f"Overall Feedback: {response_data.overall_feedback[:200] if response_data.overall_feedback else 'None'}...")
+            logger.debug(f"Number of slide analyses: {len(response_data.slide_analyses)}")
+            logger.debug(f"Number of strengths: {len(response_data.strengths)}")
+            logger.debug(f"Number of improvements: {len(response_data.improvements)}")
+            logger.debug(f"Number of recommendations: {len(response_data.recommendations)}")
+            logger.debug("===========================")
+        
+        logger.info(
+            f"Final analysis done: lecture_id={request.lecture_id}, "
+            f"slides={len(transcripts)}, response_chars={response_length}, "
+            f"elapsed={(time.perf_counter() - started) * 1000:.0f}ms"
+        )
         
         return response_data
         
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse Gemini response as JSON: {e}")
-        if 'response_text' in locals():
-            logger.error(f"Response text: {response_text[:500]}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to parse analysis response: {str(e)}"
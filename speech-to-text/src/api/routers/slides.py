@@ -2,38 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
 import os
-import tempfile
-from pathlib import Path
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+import anyio
+import orjson
+from fastapi import APIRouter, File, HTTPException, Response, UploadFile
 from google.api_core import exceptions as gcs_exceptions
 from google.cloud import storage
 from pydantic import BaseModel, Field
 
-logger = logging.getLogger(__name__)
-
-# Default service account path (same as transcription router)
-DEFAULT_SERVICE_ACCOUNT = Path(__file__).resolve().parents[4] / "speech-processing-prod-9ffbefa55e2c.json"
-
-
-def _ensure_credentials_path() -> Optional[str]:
-    """Ensure GOOGLE_APPLICATION_CREDENTIALS is set, using local json as fallback."""
-    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    if credentials_path and Path(credentials_path).exists():
-        return credentials_path
-
-    if DEFAULT_SERVICE_ACCOUNT.exists():
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = str(DEFAULT_SERVICE_ACCOUNT)
-        return str(DEFAULT_SERVICE_ACCOUNT)
-
-    return credentials_path
+from ..credentials import ensure_credentials_path
 
+logger = logging.getLogger(__name__)
 
 # Ensure credentials are set on module import
-_ensure_credentials_path()
+ensure_credentials_path()
 
 from ...slide_processing import PDFProcessingError, SlideProcessor
 from ...pdf_processing.text_summarizer import TextSummarizer
@@ -42,6 +32,16 @@ from ...pdf_processing.gemini_processor import GeminiProcessor
 router = APIRouter()
 
 
+@functools.lru_cache(maxsize=1)
+def _pdf_limiter() -> anyio.CapacityLimiter:
+    """
+    Bound concurrent PDF processing (PyMuPDF parsing + Gemini request) so a burst
+    of uploads cannot occupy every worker thread. Created on first use, inside
+    the event loop.
+    """
+    return anyio.CapacityLimiter(os.cpu_count() or 4)
+
+
 class SlideProcessingRequest(BaseModel):
     """Payload for processing slides stored in GCS."""
 
@@ -102,52 +102,144 @@ def _parse_gcs_uri(gcs_uri: str) -> Tuple[str, str]:
     return bucket_name, object_name
 
 
-def _download_gcs_file(bucket_name: str, object_name: str) -> Path:
-    """Download a GCS object to a temporary local file."""
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(object_name)
+_storage_client_instance: Optional[storage.Client] = None
+_storage_client_lock = threading.Lock()
+
+
+def _storage_client() -> storage.Client:
+    """
+    Process-wide GCS client, reusing credentials and pooled connections.
+
+    Built once under a lock: downloads run in worker threads, and concurrent
+    first requests would otherwise each construct (and discard) a client.
+    """
+    global _storage_client_instance
 
-    if not blob.exists():
+    if _storage_client_instance is None:
+        with _storage_client_lock:
+            if _storage_client_instance is None:
+                _storage_client_instance = storage.Client()
+    return _storage_client_instance
+
+
+# Objects larger than one part are fetched as parallel ranged GETs, since a
+# single stream underuses the bandwidth available for multi-MB slide decks.
+GCS_DOWNLOAD_PART_SIZE = 4 * 1024 * 1024
+GCS_DOWNLOAD_MAX_PARTS = 8
+_DOWNLOAD_EXECUTOR = ThreadPoolExecutor(
+    max_workers=GCS_DOWNLOAD_MAX_PARTS, thread_name_prefix="gcs-download"
+)
+
+
+def _get_blob(bucket_name: str, object_name: str) -> storage.Blob:
+    """Return a GCS object with its metadata (generation, size); no content is read."""
+    try:
+        blob = _storage_client().bucket(bucket_name).get_blob(object_name)
+    except gcs_exceptions.NotFound:
+        blob = None
+    if blob is None:
         raise HTTPException(
             status_code=404,
             detail=f"GCS object not found: gs://{bucket_name}/{object_name}",
         )
+    return blob
+
+
+def _download_gcs_bytes(blob: storage.Blob) -> bytes:
+    """
+    Download the generation of a GCS object returned by _get_blob into memory.
 
-    suffix = Path(object_name).suffix or ".pdf"
-    tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    temp_path = Path(tmp_file.name)
+    Its size is already known, so no further metadata request is made: objects
+    up to one part are fetched with a single GET, larger ones as concurrent
+    byte ranges written into one preallocated buffer.
+    """
+    size = blob.size
     try:
-        blob.download_to_file(tmp_file)
-        tmp_file.flush()
-    finally:
-        tmp_file.close()
+        if size is None or size <= GCS_DOWNLOAD_PART_SIZE:
+            return blob.download_as_bytes()
 
-    return temp_path
+        part_size = max(GCS_DOWNLOAD_PART_SIZE, -(-size // GCS_DOWNLOAD_MAX_PARTS))
+        buffer = bytearray(size)
 
+        def fetch_range(start: int) -> None:
+            end = min(start + part_size, size) - 1
+            part = blob.bucket.blob(blob.name, generation=blob.generation)
+            buffer[start:end + 1] = part.download_as_bytes(start=start, end=end)
 
-def _build_slide_payload(processor: SlideProcessor) -> Tuple[List[Dict[str, Any]], int]:
-    """Build slide payload list and count unique keywords."""
-    slides_payload: List[Dict[str, Any]] = []
-    unique_keywords: set[str] = set()
+        # list() re-raises the first failed range
+        list(_DOWNLOAD_EXECUTOR.map(fetch_range, range(0, size, part_size)))
+    except gcs_exceptions.NotFound as exc:
+        raise HTTPException(
+            status_code=404,
+            detail=f"GCS object not found: gs://{blob.bucket.name}/{blob.name}",
+        ) from exc
+    return bytes(buffer)
 
-    for slide in processor.slides:
-        slide_keywords = processor.slide_keywords.get(slide.page_number, [])
-        unique_keywords.update(slide_keywords)
-        slides_payload.append(
-            {
-                "slide_id": slide.page_number,
-                "title": slide.title,
-                "headings": slide.headings,
-                "bullets": slide.bullets,
-                "body": slide.body,
-                "keywords": slide_keywords,
-                "all_text": slide.all_text,
-                "summary": slide.summary,  # Semantic summary processed by NLP
-            }
-        )
 
-    return slides_payload, len(unique_keywords)
+# Gemini results keyed by (bucket, object, generation). Uploaded lecture PDFs
+# are never rewritten in place (a new upload gets a new generation), so a repeat
+# /process call for the same object can skip the download and the Gemini request.
+SLIDE_RESULT_CACHE_SIZE = int(os.getenv("SLIDE_RESULT_CACHE_SIZE", "128"))
+_slide_result_cache: "OrderedDict[Tuple[str, str, int], Dict[str, Any]]" = OrderedDict()
+
+
+def _result_cache_get(key: Tuple[str, str, int]) -> Optional[Dict[str, Any]]:
+    """Return a cached processing result and mark it most recently used."""
+    result = _slide_result_cache.get(key)
+    if result is not None:
+        _slide_result_cache.move_to_end(key)
+    return result
+
+
+def _result_cache_put(key: Tuple[str, str, int], result: Dict[str, Any]) -> None:
+    """Store a processing result, evicting the least recently used entries."""
+    if SLIDE_RESULT_CACHE_SIZE <= 0:
+        return
+    _slide_result_cache[key] = result
+    _slide_result_cache.move_to_end(key)
+    while len(_slide_result_cache) > SLIDE_RESULT_CACHE_SIZE:
+        _slide_result_cache.popitem(last=False)
+
+
+def _coerce_keywords(keywords: Any) -> List[str]:
+    """Keywords as a list of strings; anything other than a list becomes []."""
+    if not isinstance(keywords, list):
+        return []
+    return [str(keyword) for keyword in keywords]
+
+
+def _build_slide_payload(slides: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Build SlideDetails-shaped dicts from the processor's slides in a single pass.
+
+    slide_id, keywords and summary come from model output, so they are coerced
+    explicitly (the response is serialized without Pydantic validation).
+    """
+    return [
+        {
+            "slide_id": int(slide["slide_id"]),
+            "keywords": _coerce_keywords(slide.get("keywords")),
+            "summary": str(slide.get("summary") or ""),
+        }
+        for slide in slides
+    ]
+
+
+def _json_response(payload: Dict[str, Any]) -> Response:
+    """JSON response of plain JSON types, encoded by orjson without jsonable_encoder."""
+    return Response(orjson.dumps(payload), media_type="application/json")
+
+
+@functools.lru_cache(maxsize=2)
+def _summarizer(use_llm: bool = True) -> TextSummarizer:
+    """Process-wide TextSummarizer per mode; loading the NLP models takes seconds."""
+    return TextSummarizer(use_llm=use_llm)
+
+
+@functools.lru_cache(maxsize=1)
+def _gemini_processor() -> GeminiProcessor:
+    """Process-wide GeminiProcessor, so genai is configured and the model built once."""
+    return GeminiProcessor()
 
 
 def _generate_all_summary(processor: SlideProcessor, use_llm: bool = True) -> str:
@@ -164,7 +256,7 @@ def _generate_all_summary(processor: SlideProcessor, use_llm: bool = True) -> st
     """
     try:
         # Force use LLM if requested and available
-        summarizer = TextSummarizer(use_llm=use_llm)
+        summarizer = _summarizer(use_llm)
         slides_data_for_summary = [
             {
                 "page_number": slide.page_number,
@@ -204,86 +296,76 @@ async def upload_slide(
     presentation_id: Optional[str] = None,
     use_embeddings: bool = True,  # Not used with Gemini, kept for compatibility
     use_llm_summary: bool = True,  # Not used with Gemini, kept for compatibility
-) -> Dict[str, Any]:
+) -> Response:
     """Receive a PDF, process it with Gemini API and return JSON data."""
     if file.content_type not in {"application/pdf", "application/x-pdf"}:
         raise HTTPException(status_code=400, detail="Only PDF files are supported.")
 
-    temp_path: Optional[Path] = None
-
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            temp_path = Path(tmp_file.name)
-            contents = await file.read()
-            tmp_file.write(contents)
+        contents = await file.read()
+        # Release the spooled upload (memory or temp file) before the
+        # multi-second Gemini call instead of holding it until the response
+        await file.close()
 
         # Use Gemini processor instead of local processing
-        processor = GeminiProcessor()
-        result = processor.process_pdf(str(temp_path))
-
-        # Build simplified response
-        slides_payload = [
-            {
-                "slide_id": slide["slide_id"],
-                "keywords": slide.get("keywords", []),
-                "summary": slide.get("summary", ""),
-            }
-            for slide in result.get("slides", [])
-        ]
+        processor = _gemini_processor()
+        # Blocking Gemini request + PyMuPDF parsing: keep it off the event loop
+        result = await anyio.to_thread.run_sync(
+            processor.process_pdf_stream, contents, limiter=_pdf_limiter()
+        )
 
         response: Dict[str, Any] = {
             "filename": file.filename,
             "presentation_id": presentation_id,
             "slide_count": result.get("slide_count", 0),
             "keywords_count": result.get("keywords_count", 0),
-            "all_summary": result.get("all_summary", ""),
-            "slides": slides_payload,
+            "all_summary": str(result.get("all_summary") or ""),
+            "slides": _build_slide_payload(result.get("slides", [])),
         }
 
-        return response
+        # Plain JSON types only: serialize directly, skipping jsonable_encoder
+        return _json_response(response)
 
     except PDFProcessingError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:  # pragma: no cover - safeguard against unexpected errors
         raise HTTPException(status_code=500, detail=f"Slide processing error: {exc}") from exc
-    finally:
-        if temp_path and temp_path.exists():
-            try:
-                temp_path.unlink()
-            except OSError:
-                pass
 
 
 @router.post("/process", response_model=SlideProcessingResponse)
-async def process_slide(request: SlideProcessingRequest) -> SlideProcessingResponse:
+async def process_slide(request: SlideProcessingRequest) -> Response:
     """Process a slide deck stored in GCS using Gemini API and return structured data."""
-    temp_path: Optional[Path] = None
     try:
         bucket_name, object_name = _parse_gcs_uri(request.gcs_uri)
-        temp_path = _download_gcs_file(bucket_name, object_name)
-
-        # Use Gemini processor instead of local processing
-        processor = GeminiProcessor()
-        result = processor.process_pdf(str(temp_path))
-
-        # Build slide models from Gemini result
-        slide_models = [
-            SlideDetails(
-                slide_id=slide["slide_id"],
-                keywords=slide.get("keywords", []),
-                summary=slide.get("summary", ""),
+        blob = await asyncio.to_thread(_get_blob, bucket_name, object_name)
+        generation = blob.generation
+        cache_key = (bucket_name, object_name, generation)
+
+        result = _result_cache_get(cache_key)
+        if result is None:
+            pdf_bytes = await asyncio.to_thread(_download_gcs_bytes, blob)
+
+            # Use Gemini processor instead of local processing
+            processor = _gemini_processor()
+            result = await anyio.to_thread.run_sync(
+                processor.process_pdf_stream, pdf_bytes, limiter=_pdf_limiter()
             )
-            for slide in result.get("slides", [])
-        ]
-
-        return SlideProcessingResponse(
-            lecture_id=request.lecture_id,
-            original_name=request.original_name,
-            slide_count=result.get("slide_count", 0),
-            keywords_count=result.get("keywords_count", 0),
-            all_summary=result.get("all_summary", ""),
-            slides=slide_models,
-        )
+            # Failed Gemini calls come back empty; only keep real results
+            if result.get("slides"):
+                _result_cache_put(cache_key, result)
+        else:
+            logger.info("Reusing processed slides for %s (generation %s)", request.gcs_uri, generation)
+
+        # SlideProcessingResponse layout (by alias) as plain JSON types: serialize
+        # directly instead of building models for FastAPI to dump again
+        return _json_response({
+            "lecture_id": request.lecture_id,
+            "original_name": request.original_name,
+            "slide_count": result.get("slide_count", 0),
+            "keywords_count": result.get("keywords_count", 0),
+            "all_summary": str(result.get("all_summary") or ""),
+            "slides": _build_slide_payload(result.get("slides", [])),
+        })
 
     except PDFProcessingError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -296,11 +378,5 @@ async def process_slide(request: SlideProcessingRequest) -> SlideProcessingRespo
         raise
     except Exception as exc:  # pragma: no cover - safeguard against unexpected errors
         raise HTTPException(status_code=500, detail=f"Slide processing error: {exc}") from exc
-    finally:
-        if temp_path and temp_path.exists():
-            try:
-                temp_path.unlink()
-            except OSError:
-                pass
 
 
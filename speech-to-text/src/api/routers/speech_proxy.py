@@ -4,51 +4,23 @@ Based on working demo code - uses SpeechAsyncClient for better async support.
 """
 
 import asyncio
+import functools
 import json
 import logging
-import os
-from pathlib import Path
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from google.cloud import speech
+from starlette.websockets import WebSocketState
+
+from ..credentials import ensure_credentials_path, find_credentials_file
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Path to credentials file - try multiple locations
-def find_credentials_file():
-    """Find credentials file in multiple possible locations."""
-    # 1. Check environment variable first
-    env_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    if env_path and Path(env_path).exists():
-        return str(Path(env_path))
-    
-    # 2. Try current project directory
-    current_dir = Path(__file__).resolve().parents[4] / "speech-processing-prod-9ffbefa55e2c.json"
-    if current_dir.exists():
-        return str(current_dir)
-    
-    # 3. Try user-specified path
-    user_path = Path("/home/sagiri/Code/python/speech-to-text/speech-processing-prod-9ffbefa55e2c.json")
-    if user_path.exists():
-        return str(user_path)
-    
-    # 4. Try in speech-to-text directory (current project)
-    project_path = Path(__file__).resolve().parents[3] / "speech-processing-prod-9ffbefa55e2c.json"
-    if project_path.exists():
-        return str(project_path)
-    
-    # 5. Try google-credentials.json in project root
-    creds_file = Path(__file__).resolve().parents[4] / "google-credentials.json"
-    if creds_file.exists():
-        return str(creds_file)
-    
-    return None
-
 # Set credentials before importing client
 credentials_path = find_credentials_file()
 if credentials_path:
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
+    ensure_credentials_path()
     logger.info(f"Using credentials: {credentials_path}")
 else:
     logger.warning("Credentials file not found, will use default or environment variable")
@@ -56,9 +28,106 @@ else:
 # Cấu hình Audio chuẩn
 SAMPLE_RATE = 16000
 CHUNK_SIZE = int(SAMPLE_RATE / 10)  # 100ms
+# Audio frames smaller than one 100 ms chunk (LINEAR16: 2 bytes/sample) are
+# coalesced before being sent, so tiny client frames don't become one gRPC
+# message each; frames of 100 ms or more are forwarded as-is.
+AUDIO_BATCH_BYTES = CHUNK_SIZE * 2
+# Audio batches buffered between the WebSocket receiver and the gRPC stream
+AUDIO_QUEUE_SIZE = 32
+
 
-# Sử dụng ASYNC Client để tránh bị block luồng
-client = speech.SpeechAsyncClient()
+@functools.lru_cache(maxsize=1)
+def _speech_client() -> speech.SpeechAsyncClient:
+    """
+    Sử dụng ASYNC Client để tránh bị block luồng.
+    Created on first use and shared, so importing the router needs no credentials.
+    """
+    return speech.SpeechAsyncClient()
+
+
+# Checked per audio frame and per response; compare the enum member by identity
+CONNECTED = WebSocketState.CONNECTED
+
+
+@functools.lru_cache(maxsize=16)
+def _streaming_config(language_code: str) -> speech.StreamingRecognitionConfig:
+    """
+    Streaming config for a language, built once and shared by all connections.
+    Bounded, since the language code comes from the client.
+    """
+    # Cấu hình nhận diện
+    config = speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        sample_rate_hertz=SAMPLE_RATE,
+        language_code=language_code,
+        enable_automatic_punctuation=True,
+    )
+    
+    return speech.StreamingRecognitionConfig(
+        config=config,
+        interim_results=True
+    )
+
+
+async def _receive_audio(websocket: WebSocket, queue: asyncio.Queue) -> None:
+    """
+    Read audio frames from the client into queue until it stops sending.
+
+    Runs as its own task so socket reads continue while a gRPC write is
+    pending; the bounded queue applies backpressure in the other direction.
+    Puts None at a clean end, or the exception that stopped reading.
+    """
+    # Audio carried over until it reaches AUDIO_BATCH_BYTES
+    pending = bytearray()
+    error = None
+
+    while True:
+        try:
+            # Kiểm tra WebSocket state trước khi receive
+            if websocket.client_state is not CONNECTED:
+                logger.info("WebSocket not connected, stopping receiver")
+                break
+
+            # Nhận dữ liệu từ WebSocket (có thể là bytes hoặc text)
+            message = await websocket.receive()
+
+            # Text messages are ignored (language config already handled)
+            data = message.get("bytes")
+            if not data:
+                continue
+
+            # Full-size, even-length frame with nothing pending: pass through
+            if not pending and len(data) >= AUDIO_BATCH_BYTES and len(data) % 2 == 0:
+                await queue.put(data)
+                continue
+
+            pending += data
+            if len(pending) >= AUDIO_BATCH_BYTES:
+                # Đảm bảo even bytes
+                if len(pending) % 2 != 0:
+                    pending.append(0)
+                await queue.put(bytes(pending))
+                pending.clear()
+        except WebSocketDisconnect:
+            logger.info("WebSocket disconnected in receiver")
+            break
+        except RuntimeError as e:
+            # Handle "Cannot call receive once disconnect" error
+            if "disconnect" in str(e).lower():
+                logger.info("WebSocket disconnected (RuntimeError)")
+                break
+            error = e
+            break
+        except Exception as e:
+            logger.error(f"Error in receiver: {e}", exc_info=True)
+            break
+
+    # Forward audio still buffered when the client stops sending
+    if pending:
+        if len(pending) % 2 != 0:
+            pending.append(0)
+        await queue.put(bytes(pending))
+    await queue.put(error)
 
 
 @router.websocket("/speech-stream")
@@ -69,6 +138,7 @@ async def speech_stream_proxy(websocket: WebSocket):
     """
     await websocket.accept()
     logger.info("Client connected to speech proxy")
+    receiver = None
 
     try:
         # BƯỚC 1: Nhận cấu hình ngôn ngữ từ Frontend trước khi stream audio
@@ -76,72 +146,32 @@ async def speech_stream_proxy(websocket: WebSocket):
         language_code = config_data.get("language", "ja-JP")
         logger.info(f"Selected Language: {language_code}")
 
-        # Cấu hình nhận diện
-        config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=SAMPLE_RATE,
-            language_code=language_code,
-            enable_automatic_punctuation=True,
-        )
-        
-        streaming_config = speech.StreamingRecognitionConfig(
-            config=config,
-            interim_results=True
-        )
-
-        # BƯỚC 2: Tạo Generator để gửi dữ liệu lên Google
+        streaming_config = _streaming_config(language_code)
+
+        # BƯỚC 2: Nhận audio trong task riêng, tách khỏi việc gửi gRPC
+        audio_queue: asyncio.Queue = asyncio.Queue(maxsize=AUDIO_QUEUE_SIZE)
+        receiver = asyncio.create_task(_receive_audio(websocket, audio_queue))
+
+        # Generator gửi dữ liệu lên Google
         async def request_generator():
             # Gửi cấu hình ban đầu
             yield speech.StreamingRecognizeRequest(streaming_config=streaming_config)
-            
-            # Vòng lặp nhận audio từ WebSocket và gửi lên Google
+
             while True:
-                try:
-                    # Kiểm tra WebSocket state trước khi receive
-                    if websocket.client_state.name != "CONNECTED":
-                        logger.info("WebSocket not connected, stopping generator")
-                        break
-                    
-                    # Nhận dữ liệu từ WebSocket (có thể là bytes hoặc text)
-                    message = await websocket.receive()
-                    
-                    # Kiểm tra nếu là bytes
-                    if "bytes" in message:
-                        data = message["bytes"]
-                        # Convert memoryview to bytes if needed
-                        if isinstance(data, memoryview):
-                            data = data.tobytes()
-                        elif not isinstance(data, bytes):
-                            data = bytes(data)
-                        
-                        # Validate và đảm bảo even bytes
-                        if len(data) > 0:
-                            if len(data) % 2 != 0:
-                                data = data + b'\x00'
-                            yield speech.StreamingRecognizeRequest(audio_content=data)
-                    # Ignore text messages (already handled language config)
-                    elif "text" in message:
-                        continue
-                except WebSocketDisconnect:
-                    logger.info("WebSocket disconnected in generator")
-                    break
-                except RuntimeError as e:
-                    # Handle "Cannot call receive once disconnect" error
-                    if "disconnect" in str(e).lower():
-                        logger.info("WebSocket disconnected (RuntimeError)")
-                        break
-                    raise
-                except Exception as e:
-                    logger.error(f"Error in generator: {e}", exc_info=True)
+                item = await audio_queue.get()
+                if item is None:
                     break
+                if isinstance(item, Exception):
+                    raise item
+                yield speech.StreamingRecognizeRequest(audio_content=item)
 
         # BƯỚC 3: Xử lý phản hồi từ Google
         # Hàm streaming_recognize của AsyncClient trả về một AsyncIterator
-        responses = await client.streaming_recognize(requests=request_generator())
+        responses = await _speech_client().streaming_recognize(requests=request_generator())
 
         async for response in responses:
             # Kiểm tra WebSocket state trước khi send
-            if websocket.client_state.name != "CONNECTED":
+            if websocket.client_state is not CONNECTED:
                 logger.info("WebSocket disconnected, stopping response processing")
                 break
                 
@@ -171,8 +201,11 @@ async def speech_stream_proxy(websocket: WebSocket):
         logger.error(f"Server Error: {e}", exc_info=True)
         # Nếu connection còn mở thì gửi lỗi về
         try:
-            if websocket.client_state.name == "CONNECTED":
+            if websocket.client_state is CONNECTED:
                 await websocket.send_json({"error": str(e)})
         except:
             pass
+    finally:
+        if receiver is not None:
+            receiver.cancel()
 
@@ -3,19 +3,30 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import contextlib
+import functools
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import threading
-import time
 import uuid
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
-import requests
+import aiohttp
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+from ..credentials import ensure_credentials_path
 from ...streaming.session_manager import StreamingSessionManager
 
 router = APIRouter()
@@ -24,25 +35,385 @@ logger = logging.getLogger(__name__)
 BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "http://localhost:8080").rstrip("/")
 BACKEND_TIMEOUT_SECONDS = float(os.getenv("BACKEND_CALLBACK_TIMEOUT", "5"))
 BACKEND_SERVICE_TOKEN = os.getenv("BACKEND_SERVICE_TOKEN")
+# Final results are only published when a backend is configured
+PUBLISH_ENABLED = bool(BACKEND_BASE_URL)
+
+# Per-chunk tracing of the audio path. Disabled (a level check per call) unless
+# LOG_DEBUG_FILE names a file to write it to. Records are handed to a
+# QueueListener thread so the file writes never run on the event loop.
+LOG_DEBUG_FILE = os.getenv("LOG_DEBUG_FILE")
+LOG_DEBUG_MAX_BYTES = int(os.getenv("LOG_DEBUG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_DEBUG_BACKUP_COUNT = int(os.getenv("LOG_DEBUG_BACKUP_COUNT", "3"))
+debug_logger = logging.getLogger("transcription.debug")
+debug_logger.propagate = False
+if LOG_DEBUG_FILE:
+    _debug_file_handler = logging.handlers.RotatingFileHandler(
+        LOG_DEBUG_FILE,
+        maxBytes=LOG_DEBUG_MAX_BYTES,
+        backupCount=LOG_DEBUG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    _debug_file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    _debug_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _debug_listener = logging.handlers.QueueListener(_debug_queue, _debug_file_handler)
+    _debug_listener.start()
+    atexit.register(_debug_listener.stop)
+    debug_logger.addHandler(logging.handlers.QueueHandler(_debug_queue))
+    debug_logger.setLevel(logging.DEBUG)
+else:
+    debug_logger.setLevel(logging.INFO)
+
+# Final transcriptions are coalesced into one POST to the batch endpoint: at most
+# PUBLISH_BATCH_SIZE results, waiting at most PUBLISH_BATCH_DELAY for more to arrive.
+PUBLISH_BATCH_SIZE = int(os.getenv("BACKEND_PUBLISH_BATCH_SIZE", "32"))
+PUBLISH_BATCH_DELAY = float(os.getenv("BACKEND_PUBLISH_BATCH_DELAY", "0.2"))
+# Results waiting to be published while the backend is slow; when full the
+# oldest is dropped so memory stays bounded
+PUBLISH_QUEUE_SIZE = int(os.getenv("BACKEND_PUBLISH_QUEUE_SIZE", "1024"))
+
+# The session's AudioChunkHandler holds audio until a 100 ms chunk is complete.
+# After STT_PAUSE_FLUSH_MS without a new frame (client pauses, push-to-talk) the
+# held audio is sent anyway, so the end of an utterance is not delayed
+PAUSE_FLUSH_DELAY = int(os.getenv("STT_PAUSE_FLUSH_MS", "200")) / 1000
+
+# Audio held while no session exists is capped at STT_PENDING_AUDIO_MS; beyond
+# that the oldest audio is dropped so a client that never sends "start" cannot
+# grow the buffer without bound
+STT_PENDING_AUDIO_MS = int(os.getenv("STT_PENDING_AUDIO_MS", "10000"))
+PENDING_AUDIO_LIMIT = STT_PENDING_AUDIO_MS * 32
+
+# Clients offering this websocket subprotocol receive transcription events as
+# MessagePack binary frames; control and error events stay JSON text frames
+MSGPACK_SUBPROTOCOL = "msgpack"
+
+# Transcription events buffered per connection while the client is slow to read
+RESULT_QUEUE_SIZE = int(os.getenv("STT_RESULT_QUEUE_SIZE", "256"))
+
+
+class ResultQueue:
+    """
+    Transcription events waiting to be sent to one client.
+
+    Holds at most maxsize events: when full, the oldest interim result is
+    dropped, since a later result for the same utterance supersedes it (or the
+    new one, if only final results are queued). Final results and the None end
+    marker are never dropped.
+    """
+
+    def __init__(self, maxsize: int = RESULT_QUEUE_SIZE) -> None:
+        self._items: deque[Optional[Dict[str, Any]]] = deque()
+        self._maxsize = maxsize
+        self._ready = asyncio.Event()
+
+    def put_nowait(self, item: Optional[Dict[str, Any]]) -> None:
+        if len(self._items) >= self._maxsize and not self._drop_interim():
+            if item is not None and not item["result"].get("is_final"):
+                return
+        self._items.append(item)
+        self._ready.set()
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+    async def get_all(self) -> list[Optional[Dict[str, Any]]]:
+        """Wait for at least one event, then take every queued event."""
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        items = list(self._items)
+        self._items.clear()
+        return items
+
+    def _drop_interim(self) -> bool:
+        """Remove the oldest queued interim result; False if there is none."""
+        for index, item in enumerate(self._items):
+            if item is not None and not item["result"].get("is_final"):
+                del self._items[index]
+                return True
+        return False
+
+
+class BackendPublisher:
+    """
+    Send final transcriptions to the backend in batches.
+
+    submit() may be called from any thread; a background task on the event loop
+    drains the queue and POSTs each batch to /api/transcriptions/batch. Single
+    results, and every result once the backend turns out not to have the batch
+    endpoint, go to /api/transcriptions one by one as before.
+
+    The backend saves a batch in one transaction, so a batch rejected with an
+    error response is retried item by item. A batch that got no response (timeout,
+    dropped connection) may already be stored and is dropped, not re-posted.
+    At most PUBLISH_QUEUE_SIZE results wait; beyond that the oldest is dropped.
+    """
+
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None) -> None:
+        self._session = session
+        self._own_session: Optional[aiohttp.ClientSession] = None
+        self._queue: asyncio.Queue[Optional[Dict[str, Any]]] = asyncio.Queue(maxsize=PUBLISH_QUEUE_SIZE)
+        self._stopping = False
+        self._stop_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch_supported = True
+
+    def start(self) -> None:
+        """Start the sender task on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._task = self._loop.create_task(self._run())
+
+    def submit(self, payload: Dict[str, Any]) -> None:
+        """Queue a payload for publishing (thread-safe); a no-op until start()."""
+        if self._loop is None or self._loop.is_closed():
+            logger.warning(
+                "Transcription publisher not running; dropping result for session %s",
+                payload.get("session_id"),
+            )
+            return
+        self._loop.call_soon_threadsafe(self._enqueue, payload)
+
+    async def close(self) -> None:
+        """Flush queued payloads, then stop the sender task."""
+        if self._task is not None:
+            # Same path as submit(), so results submitted before close() are sent first
+            self._loop.call_soon_threadsafe(self._stop)
+            await self._task
+        if self._own_session is not None:
+            await self._own_session.close()
+
+    def _enqueue(self, payload: Dict[str, Any]) -> None:
+        """Put on the queue (event loop thread), dropping the oldest result when full."""
+        if self._stopping:
+            return
+        if self._queue.full():
+            dropped = self._queue.get_nowait()
+            logger.warning(
+                "Publish queue full (%d); dropping oldest transcription for session %s",
+                PUBLISH_QUEUE_SIZE,
+                dropped.get("session_id"),
+            )
+        self._queue.put_nowait(payload)
 
-DEFAULT_SERVICE_ACCOUNT = Path(__file__).resolve().parents[4] / "speech-processing-prod-9ffbefa55e2c.json"
+    def _stop(self) -> None:
+        """Queue the end marker after everything submitted so far (event loop thread)."""
+        self._stopping = True
+        # Waits for room instead of dropping a result; nothing is enqueued any more
+        self._stop_task = self._loop.create_task(self._queue.put(None))
 
+    async def _run(self) -> None:
+        while True:
+            payload = await self._queue.get()
+            if payload is None:
+                return
+
+            batch = [payload]
+            stopping = False
+            deadline = self._loop.time() + PUBLISH_BATCH_DELAY
+            while len(batch) < PUBLISH_BATCH_SIZE:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    payload = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if payload is None:
+                    stopping = True
+                    break
+                batch.append(payload)
+
+            await self._send(batch)
+            if stopping:
+                return
+
+    async def _send(self, batch: list[Dict[str, Any]]) -> None:
+        if len(batch) > 1 and self._batch_supported:
+            response = await self._post("/api/transcriptions/batch", batch)
+            if response is None:
+                logger.error("Dropping %d transcriptions: backend did not answer the batch", len(batch))
+                return
+            status_code, body = response
+            if status_code < 300:
+                return
+            # A 404 whose error body names an application error (e.g. lecture_not_found
+            # for one stale lecture_id) comes from the endpoint, not a missing route
+            if status_code == 405 or (status_code == 404 and "_not_found" not in body):
+                logger.info("Backend has no batch transcription endpoint; publishing one by one")
+                self._batch_supported = False
+            # The backend rejected the whole batch, so nothing was stored: retry per item
+
+        for index, payload in enumerate(batch):
+            response = await self._post("/api/transcriptions", payload)
+            if response is None:
+                logger.error(
+                    "Backend unreachable; dropping the remaining %d transcriptions", len(batch) - index - 1
+                )
+                return
+            status_code, body = response
+            if status_code >= 300:
+                logger.error(
+                    "Failed to publish transcription for session %s: HTTP %s %s",
+                    payload.get("session_id"),
+                    status_code,
+                    body,
+                )
+
+    async def _post(self, path: str, body: Any) -> Optional[tuple[int, str]]:
+        """
+        POST JSON to the backend.
+
+        Returns (status code, response body, empty on success), or None when no
+        response arrived (network error or timeout).
+        """
+        if self._session is None or self._session.closed:
+            if self._own_session is None:
+                self._own_session = aiohttp.ClientSession()
+            self._session = self._own_session
+
+        headers = {"Content-Type": "application/json"}
+        if BACKEND_SERVICE_TOKEN:
+            headers["Authorization"] = f"Bearer {BACKEND_SERVICE_TOKEN}"
+
+        try:
+            async with self._session.post(
+                f"{BACKEND_BASE_URL}{path}",
+                json=body,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=BACKEND_TIMEOUT_SECONDS),
+            ) as response:
+                if response.status < 300:
+                    return response.status, ""
+                return response.status, await response.text(errors="replace")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            logger.error("Failed to publish transcriptions to %s: %s", path, exc)
+            return None
+
+
+class AudioSender:
+    """
+    Hand audio chunks to the session manager from one long-lived thread.
+
+    send() only enqueues, so a connection pays no executor round trip per audio
+    frame. Chunks are delivered in order; flush() waits until everything queued
+    so far has been delivered, which callers do before starting or closing the
+    recognition session. send_held_audio() makes the manager send the audio its
+    chunk handler is still accumulating. A chunk the manager rejects with an
+    exception is reported through on_error on the event loop.
+    """
+
+    def __init__(
+        self,
+        manager: StreamingSessionManager,
+        loop: asyncio.AbstractEventLoop,
+        on_error: Optional[Callable[[str, Exception], Awaitable[None]]] = None,
+    ) -> None:
+        self._manager = manager
+        self._loop = loop
+        self._on_error = on_error
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="stt-audio-sender", daemon=True)
+        self._thread.start()
+
+    def send(self, session_id: str, chunk: bytes) -> None:
+        """Queue a chunk for the session (non-blocking)."""
+        self._queue.put((session_id, chunk))
+
+    def send_held_audio(self, session_id: str) -> None:
+        """Queue a flush of the session's accumulated audio, after the chunks queued so far."""
+        self._queue.put((session_id, None))
+
+    async def flush(self) -> None:
+        """Wait until every chunk queued before this call has been delivered."""
+        done = self._loop.create_future()
+        self._queue.put(done)
+        await done
+
+    def close(self) -> None:
+        """Stop the thread once the chunks already queued are delivered."""
+        self._queue.put(None)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, asyncio.Future):
+                self._loop.call_soon_threadsafe(_resolve_future, item)
+                continue
+
+            session_id, chunk = item
+            try:
+                if chunk is None:
+                    self._manager.flush_audio(session_id)
+                elif not self._manager.send_audio_chunk(session_id, chunk):
+                    logger.warning("Failed to send chunk to session %s", session_id)
+            except Exception as exc:
+                logger.error("Failed sending chunk for session %s: %s", session_id, exc)
+                if self._on_error is not None:
+                    with contextlib.suppress(RuntimeError):  # loop already closed
+                        asyncio.run_coroutine_threadsafe(self._on_error(session_id, exc), self._loop)
+
+
+def _resolve_future(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _pad_to_even(chunk: bytes | memoryview) -> bytes | memoryview:
+    """Pad a chunk to an even byte count (required for 16-bit LINEAR16)."""
+    if len(chunk) % 2 == 0:
+        return chunk
+    logger.warning("Chunk size %d not even, padding with zero", len(chunk))
+    return bytes(chunk) + b"\x00"
+
+
+@functools.lru_cache(maxsize=4)
+def _session_manager(credentials_path: Optional[str], project_id: str) -> StreamingSessionManager:
+    """
+    Session manager shared by all websocket connections.
+
+    Its Speech client (gRPC channel and cached credentials token) is created
+    once per process; each connection passes its own result callback when it
+    creates a session.
+    """
+    return StreamingSessionManager(credentials_path=credentials_path, project_id=project_id)
+
+
+async def _send_json(websocket: WebSocket, payload: Dict[str, Any]) -> None:
+    """WebSocket.send_json with orjson encoding; still sent as a text frame."""
+    await websocket.send_text(
+        orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    )
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Encode numpy scalars and arrays, as orjson's OPT_SERIALIZE_NUMPY does for JSON."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise NotImplementedError(f"Cannot encode {type(obj).__name__} as MessagePack")
 
-def _ensure_credentials_path() -> Optional[str]:
-    """Ensure GOOGLE_APPLICATION_CREDENTIALS is set, using local json as fallback."""
-    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    if credentials_path and Path(credentials_path).exists():
-        return credentials_path
 
-    if DEFAULT_SERVICE_ACCOUNT.exists():
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = str(DEFAULT_SERVICE_ACCOUNT)
-        return str(DEFAULT_SERVICE_ACCOUNT)
+if msgspec is not None:
+    _msgpack_encoder = msgspec.msgpack.Encoder(enc_hook=_msgpack_default)
 
-    return credentials_path
 
+async def _send_msgpack(websocket: WebSocket, payload: Dict[str, Any]) -> None:
+    """Send payload as a MessagePack binary frame (MSGPACK_SUBPROTOCOL connections)."""
+    await websocket.send_bytes(_msgpack_encoder.encode(payload))
 
+
+@functools.lru_cache(maxsize=4)
 def _resolve_project_id(credentials_path: Optional[str]) -> Optional[str]:
-    """Resolve the Google Cloud project id from environment variables."""
+    """
+    Resolve the Google Cloud project id from environment variables.
+
+    Cached per credentials path, so the service account file is read and parsed
+    once per process instead of on every websocket connect.
+    """
     project_id = (
         os.getenv("GOOGLE_CLOUD_PROJECT")
         or os.getenv("GCLOUD_PROJECT")
@@ -69,15 +440,18 @@ async def websocket_transcribe(websocket: WebSocket) -> None:
     # Accept WebSocket connection - CORS is handled by middleware
     # Log origin for debugging
     origin = websocket.headers.get("origin")
-    logger.info(f"WebSocket connection attempt from origin: {origin}")
-    await websocket.accept()
+    logger.info("WebSocket connection attempt from origin: %s", origin)
+    use_msgpack = msgspec is not None and MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", ())
+    await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL if use_msgpack else None)
     logger.info("WebSocket connection accepted")
+    send_result = _send_msgpack if use_msgpack else _send_json
 
-    credentials_path = _ensure_credentials_path()
+    credentials_path = ensure_credentials_path()
     project_id = _resolve_project_id(credentials_path)
 
     if not project_id:
-        await websocket.send_json(
+        await _send_json(
+            websocket,
             {
                 "event": "error",
                 "message": (
@@ -89,84 +463,70 @@ async def websocket_transcribe(websocket: WebSocket) -> None:
         return
 
     loop = asyncio.get_event_loop()
-    result_queue: asyncio.Queue[Optional[Dict[str, Any]]] = asyncio.Queue()
+    # Process-wide batching publisher started with the app; a per-connection one otherwise
+    publisher: Optional[BackendPublisher] = getattr(websocket.app.state, "transcription_publisher", None)
+    own_publisher: Optional[BackendPublisher] = None
+    if publisher is None:
+        publisher = own_publisher = BackendPublisher(getattr(websocket.app.state, "http", None))
+        publisher.start()
+    result_queue = ResultQueue()
+    # Written on the event loop, read from the recognition callback thread. Each
+    # access is a single dict get/set/pop, atomic under the GIL, so no lock is taken.
     session_context: Dict[str, Dict[str, Any]] = {}
-    context_lock = threading.Lock()
-    pending_audio_chunks: list[bytes] = []
+    # Audio received before the session is ready, kept as one contiguous buffer
+    # and handed to the session manager as a single chunk
+    pending_audio = bytearray()
+    # Flushes the session's held audio once the client pauses
+    pause_timer: Optional[asyncio.TimerHandle] = None
+    last_audio_time = 0.0
 
     def _set_session_context(session_id: str, context: Dict[str, Any]) -> None:
-        with context_lock:
-            session_context[session_id] = context
+        session_context[session_id] = context
 
     def _pop_session_context(session_id: Optional[str]) -> Optional[Dict[str, Any]]:
         if session_id is None:
             return None
-        with context_lock:
-            return session_context.pop(session_id, None)
+        return session_context.pop(session_id, None)
 
     def _get_session_context(session_id: Optional[str]) -> Optional[Dict[str, Any]]:
         if session_id is None:
             return None
-        with context_lock:
-            return session_context.get(session_id)
-
-    def _publish_to_backend(result) -> None:
-        if not BACKEND_BASE_URL or not result.session_id:
-            return
-
-        context = _get_session_context(result.session_id)
-        if not context:
-            return
+        return session_context.get(session_id)
 
+    def _publish_to_backend(data: Dict[str, Any], context: Dict[str, Any]) -> None:
+        """Build the backend payload from a result's to_dict() and queue it for publishing."""
+        slide = data.get("slide") or {}
         payload = {
             "lecture_id": context.get("lecture_id"),
-            "session_id": result.session_id,
-            "presentation_id": result.presentation_id,
-            "text": result.text,
-            "confidence": result.confidence,
-            "timestamp": result.timestamp,
-            "is_final": result.is_final,
-            "slide_number": result.slide_id,
-            "slide_score": result.slide_score,
-            "slide_confidence": result.slide_confidence,
-            "matched_keywords": result.matched_keywords or [],
+            "session_id": data["session_id"],
+            "presentation_id": data["presentation_id"],
+            "text": data["text"],
+            "confidence": data["confidence"],
+            "timestamp": data["timestamp"],
+            "is_final": data["is_final"],
+            "slide_number": slide.get("slide_id"),
+            "slide_score": slide.get("score"),
+            "slide_confidence": slide.get("confidence"),
+            "matched_keywords": slide.get("matched_keywords") or [],
         }
 
-        headers = {"Content-Type": "application/json"}
-        if BACKEND_SERVICE_TOKEN:
-            headers["Authorization"] = f"Bearer {BACKEND_SERVICE_TOKEN}"
-
-        try:
-            response = requests.post(
-                f"{BACKEND_BASE_URL}/api/transcriptions",
-                json=payload,
-                headers=headers,
-                timeout=BACKEND_TIMEOUT_SECONDS,
-            )
-            response.raise_for_status()
-        except requests.RequestException as exc:
-            logger.error(
-                "Failed to publish transcription for session %s: %s",
-                result.session_id,
-                exc,
-            )
+        # Called from the recognition thread: hand off to the batching publisher
+        publisher.submit(payload)
 
     def _handle_result(result) -> None:
         """Thread-safe callback pushing transcription results into the queue."""
-        payload = {
-            "event": "transcription",
-            "result": result.to_dict(),
-        }
-        loop.call_soon_threadsafe(result_queue.put_nowait, payload)
+        data = result.to_dict()
+        loop.call_soon_threadsafe(
+            result_queue.put_nowait, {"event": "transcription", "result": data}
+        )
 
-        if getattr(result, "is_final", False):
-            _publish_to_backend(result)
+        if not (PUBLISH_ENABLED and data["is_final"] and data["session_id"]):
+            return
+        context = _get_session_context(data["session_id"])
+        if context:
+            _publish_to_backend(data, context)
 
-    manager = StreamingSessionManager(
-        credentials_path=credentials_path,
-        project_id=project_id,
-        result_callback=_handle_result,
-    )
+    manager = _session_manager(credentials_path, project_id)
 
     session_id: Optional[str] = None
     presentation_id: Optional[str] = None
@@ -176,10 +536,20 @@ async def websocket_transcribe(websocket: WebSocket) -> None:
     async def _forward_results() -> None:
         try:
             while True:
-                payload = await result_queue.get()
-                if payload is None:
-                    break
-                await websocket.send_json(payload)
+                # Everything queued since the last wake-up, sent back to back
+                payloads = await result_queue.get_all()
+                last = len(payloads) - 1
+                for index, payload in enumerate(payloads):
+                    if payload is None:
+                        return
+                    # An interim result followed by a newer result is already stale
+                    if (
+                        index < last
+                        and payloads[index + 1] is not None
+                        and not payload["result"].get("is_final")
+                    ):
+                        continue
+                    await send_result(websocket, payload)
         except WebSocketDisconnect:
             pass
         except RuntimeError:
@@ -188,255 +558,121 @@ async def websocket_transcribe(websocket: WebSocket) -> None:
 
     forward_task = asyncio.create_task(_forward_results())
 
+    async def _on_audio_error(failed_session_id: str, exc: Exception) -> None:
+        error_msg = f"Failed to process audio stream: {str(exc)}"
+        logger.error("Session %s error: %s", failed_session_id, error_msg)
+        with contextlib.suppress(Exception):
+            await _send_json(websocket, {"event": "error", "message": error_msg})
+
+    # Audio goes to the session manager through one thread per connection
+    audio_sender = AudioSender(manager, loop, on_error=_on_audio_error)
+
     async def run_blocking(func, *args, **kwargs):
-        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+        return await loop.run_in_executor(None, func, *args)
+
+    def _cancel_pause_timer() -> None:
+        nonlocal pause_timer
+        if pause_timer is not None:
+            pause_timer.cancel()
+            pause_timer = None
+
+    def _on_pause_timer() -> None:
+        """Send held audio once no frame has arrived for PAUSE_FLUSH_DELAY."""
+        nonlocal pause_timer
+        # Armed once per burst of frames and re-armed for the remaining time,
+        # rather than rescheduled on every frame
+        remaining = last_audio_time + PAUSE_FLUSH_DELAY - loop.time()
+        if remaining > 0:
+            pause_timer = loop.call_later(remaining, _on_pause_timer)
+            return
+        pause_timer = None
+        if session_id is not None and session_started:
+            audio_sender.send_held_audio(session_id)
 
-    async def send_chunk(chunk_bytes: bytes) -> None:
+    async def send_chunk(chunk_bytes: bytes | memoryview) -> None:
         nonlocal session_started, pending_start_config, session_id, presentation_id
+        nonlocal pause_timer, last_audio_time
 
-        # #region agent log
-        DEBUG_LOG_PATH = Path("/home/sagiri/Code/itss-nihongo/.cursor/debug.log")
-        try:
-            with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                import time
-                log_entry = {
-                    "timestamp": int(time.time() * 1000),
-                    "location": "transcription.py:188",
-                    "message": "send_chunk - received audio from client",
-                    "data": {
-                        "chunk_size": len(chunk_bytes),
-                        "session_id": session_id,
-                        "session_started": session_started,
-                        "pending_chunks": len(pending_audio_chunks)
-                    },
-                    "sessionId": "debug-session",
-                    "runId": "run1",
-                    "hypothesisId": "A"
-                }
-                f.write(json.dumps(log_entry) + "\n")
-        except Exception:
-            pass
-        # #endregion
+        debug_logger.debug(
+            "send_chunk chunk_size=%d session_id=%s started=%s pending=%d",
+            len(chunk_bytes), session_id, session_started, len(pending_audio),
+        )
 
-        # 1. Validate audio chunk format
-        if not chunk_bytes or len(chunk_bytes) == 0:
+        # 1. Validate audio chunk format; this is the only place chunks are padded
+        if not chunk_bytes:
             logger.warning("Empty audio chunk received from client")
             return
-        
-        # Ensure even byte count (required for 16-bit LINEAR16)
-        if len(chunk_bytes) % 2 != 0:
-            logger.warning(f"Chunk size {len(chunk_bytes)} not even, padding with zero")
-            chunk_bytes = chunk_bytes + b'\x00'
+        chunk_bytes = _pad_to_even(chunk_bytes)
 
-        # 2. Nếu session chưa init (chưa nhận lệnh start), buffer tạm vào list cục bộ
+        # 2. Nếu session chưa init (chưa nhận lệnh start), buffer tạm vào bộ đệm cục bộ
         if session_id is None:
             logger.debug("Buffering audio chunk (%d bytes) locally - session not initialized", len(chunk_bytes))
-            pending_audio_chunks.append(chunk_bytes)
-            # #region agent log
-            try:
-                with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                    log_entry = {
-                        "timestamp": int(time.time() * 1000),
-                        "location": "transcription.py:227",
-                        "message": "Buffering chunk - session not initialized",
-                        "data": {
-                            "chunk_size": len(chunk_bytes),
-                            "pending_chunks": len(pending_audio_chunks)
-                        },
-                        "sessionId": "debug-session",
-                        "runId": "run1",
-                        "hypothesisId": "N"
-                    }
-                    f.write(json.dumps(log_entry) + "\n")
-            except Exception:
-                pass
-            # #endregion
+            pending_audio.extend(chunk_bytes)
+            overflow = len(pending_audio) - PENDING_AUDIO_LIMIT
+            if overflow > 0:
+                # Keep the most recent audio; chunks are padded, so this stays sample-aligned
+                del pending_audio[:overflow]
+                if overflow < len(chunk_bytes):
+                    logger.warning(
+                        "Pre-session audio buffer full (%d bytes); dropping oldest audio until start",
+                        PENDING_AUDIO_LIMIT,
+                    )
+            debug_logger.debug(
+                "send_chunk buffered chunk_size=%d pending=%d", len(chunk_bytes), len(pending_audio)
+            )
+            return
+
+        # 3. Once streaming, hand each frame straight to the sender thread (the
+        # per-frame steady state); the session's chunk handler batches small frames
+        if session_started:
+            audio_sender.send(session_id, bytes(chunk_bytes))
+            last_audio_time = loop.time()
+            if pause_timer is None:
+                pause_timer = loop.call_later(PAUSE_FLUSH_DELAY, _on_pause_timer)
             return
 
-        # 3. Gom tất cả audio cần gửi (pending cũ + chunk mới)
-        chunks_to_send = []
-        if pending_audio_chunks:
-            chunks_to_send.extend(pending_audio_chunks)
-            pending_audio_chunks.clear()
-        chunks_to_send.append(chunk_bytes)
+        # 4. Gom tất cả audio cần gửi (pending cũ + chunk mới) thành một khối
+        if pending_audio:
+            pending_audio.extend(chunk_bytes)
+            audio = bytes(pending_audio)
+            pending_audio.clear()
+        else:
+            # Copied only here, before it crosses to the sender thread; bytes()
+            # returns a bytes object unchanged
+            audio = bytes(chunk_bytes)
         
-        # #region agent log
-        try:
-            with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                log_entry = {
-                    "timestamp": int(time.time() * 1000),
-                    "location": "transcription.py:250",
-                    "message": "Prepared chunks to send",
-                    "data": {
-                        "session_id": session_id,
-                        "chunks_count": len(chunks_to_send),
-                        "session_started": session_started
-                    },
-                    "sessionId": "debug-session",
-                    "runId": "run1",
-                    "hypothesisId": "O"
-                }
-                f.write(json.dumps(log_entry) + "\n")
-        except Exception:
-            pass
-        # #endregion
+        debug_logger.debug(
+            "send_chunk prepared bytes=%d session_id=%s started=%s",
+            len(audio), session_id, session_started,
+        )
 
         try:
-            # #region agent log
-            try:
-                with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                    log_entry = {
-                        "timestamp": int(time.time() * 1000),
-                        "location": "transcription.py:210",
-                        "message": "send_chunk - sending to manager",
-                        "data": {
-                            "chunks_count": len(chunks_to_send),
-                            "session_id": session_id,
-                            "session_started": session_started
-                        },
-                        "sessionId": "debug-session",
-                        "runId": "run1",
-                        "hypothesisId": "B"
-                    }
-                    f.write(json.dumps(log_entry) + "\n")
-            except Exception:
-                pass
-            # #endregion
 
-            # 4. Simple approach based on reference code:
+            # 5. Simple approach based on reference code:
             # Pre-buffer audio into queue, then start session
             # This ensures audio is ready when Google API starts consuming
             if not session_started and pending_start_config is not None:
                 # Save config before clearing
                 saved_config = pending_start_config.copy()
                 
-                # Prepare and validate chunks first
-                prepared_chunks = []
-                for chunk in chunks_to_send:
-                    if not chunk or len(chunk) == 0:
-                        continue
-                    if len(chunk) % 2 != 0:
-                        chunk = chunk + b'\x00'
-                    prepared_chunks.append(chunk)
-                
                 logger.info(
-                    "Starting session %s with %d pre-buffered chunks",
-                    session_id, len(prepared_chunks)
+                    "Starting session %s with %d pre-buffered bytes",
+                    session_id, len(audio)
                 )
                 
-                # #region agent log
-                try:
-                    with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                        log_entry = {
-                            "timestamp": int(time.time() * 1000),
-                            "location": "transcription.py:240",
-                            "message": "send_chunk - pre-buffering audio before starting session",
-                            "data": {
-                                "session_id": session_id,
-                                "config": saved_config,
-                                "chunks_count": len(prepared_chunks)
-                            },
-                            "sessionId": "debug-session",
-                            "runId": "run1",
-                            "hypothesisId": "C"
-                        }
-                        f.write(json.dumps(log_entry) + "\n")
-                except Exception:
-                    pass
-                # #endregion
-                
                 # Pre-buffer audio into queue BEFORE starting session
                 # This matches the reference pattern: ensure data is ready before stream starts
-                # #region agent log - Before pre-buffering
-                try:
-                    with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                        log_entry = {
-                            "timestamp": int(time.time() * 1000),
-                            "location": "transcription.py:305",
-                            "message": "Pre-buffering chunks to queue",
-                            "data": {
-                                "session_id": session_id,
-                                "chunks_to_buffer": len(prepared_chunks)
-                            },
-                            "sessionId": "debug-session",
-                            "runId": "run1",
-                            "hypothesisId": "H"
-                        }
-                        f.write(json.dumps(log_entry) + "\n")
-                except Exception:
-                    pass
-                # #endregion
-                
-                for i, chunk in enumerate(prepared_chunks):
-                    result = await run_blocking(manager.send_audio_chunk, session_id, chunk)
-                    # #region agent log - After each chunk
-                    try:
-                        with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                            log_entry = {
-                                "timestamp": int(time.time() * 1000),
-                                "location": "transcription.py:315",
-                                "message": "Chunk sent to manager",
-                                "data": {
-                                    "session_id": session_id,
-                                    "chunk_index": i,
-                                    "chunk_size": len(chunk),
-                                    "result": result
-                                },
-                                "sessionId": "debug-session",
-                                "runId": "run1",
-                                "hypothesisId": "I"
-                            }
-                            f.write(json.dumps(log_entry) + "\n")
-                    except Exception:
-                        pass
-                    # #endregion
-                    if not result:
-                        logger.warning(f"Failed to send chunk {i} to session {session_id}")
-                
-                # Check queue size before starting
-                # #region agent log - Before starting session
-                try:
-                    session = manager.get_session(session_id)
-                    queue_size = session.audio_queue.qsize()
-                    with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                        log_entry = {
-                            "timestamp": int(time.time() * 1000),
-                            "location": "transcription.py:335",
-                            "message": "Queue size before starting session",
-                            "data": {
-                                "session_id": session_id,
-                                "queue_size": queue_size,
-                                "chunks_buffered": len(prepared_chunks)
-                            },
-                            "sessionId": "debug-session",
-                            "runId": "run1",
-                            "hypothesisId": "J"
-                        }
-                        f.write(json.dumps(log_entry) + "\n")
-                except Exception:
-                    pass
-                # #endregion
+                audio_sender.send(session_id, audio)
+                await audio_sender.flush()
+                debug_logger.debug(
+                    "send_chunk pre-buffered %d bytes session_id=%s config=%s",
+                    len(audio), session_id, saved_config,
+                )
                 
                 # Now start session - generator will find audio already in queue
-                # #region agent log - Starting session
-                try:
-                    with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                        log_entry = {
-                            "timestamp": int(time.time() * 1000),
-                            "location": "transcription.py:350",
-                            "message": "Calling start_session",
-                            "data": {
-                                "session_id": session_id,
-                                "config": saved_config
-                            },
-                            "sessionId": "debug-session",
-                            "runId": "run1",
-                            "hypothesisId": "K"
-                        }
-                        f.write(json.dumps(log_entry) + "\n")
-                except Exception:
-                    pass
-                # #endregion
+                debug_logger.debug("send_chunk starting session %s config=%s", session_id, saved_config)
                 
                 await run_blocking(
                     manager.start_session,
@@ -444,34 +680,12 @@ async def websocket_transcribe(websocket: WebSocket) -> None:
                     **saved_config,
                 )
                 
-                # #region agent log - After starting session
-                try:
-                    session = manager.get_session(session_id)
-                    queue_size_after = session.audio_queue.qsize()
-                    with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                        log_entry = {
-                            "timestamp": int(time.time() * 1000),
-                            "location": "transcription.py:365",
-                            "message": "Session started",
-                            "data": {
-                                "session_id": session_id,
-                                "queue_size_after": queue_size_after,
-                                "status": session.status.value
-                            },
-                            "sessionId": "debug-session",
-                            "runId": "run1",
-                            "hypothesisId": "L"
-                        }
-                        f.write(json.dumps(log_entry) + "\n")
-                except Exception:
-                    pass
-                # #endregion
-                
                 session_started = True
                 pending_start_config = None
                 
                 # Thông báo cho Client biết session đã bắt đầu nhận dạng
-                await websocket.send_json(
+                await _send_json(
+                    websocket,
                     {
                         "event": "session_started",
                         "session_id": session_id,
@@ -481,254 +695,224 @@ async def websocket_transcribe(websocket: WebSocket) -> None:
                     }
                 )
             else:
-                # Session already started, just send chunks to queue
-                for chunk in chunks_to_send:
-                    if not chunk or len(chunk) == 0:
-                        continue
-                    if len(chunk) % 2 != 0:
-                        chunk = chunk + b'\x00'
-                    result = await run_blocking(manager.send_audio_chunk, session_id, chunk)
-                    if not result:
-                        logger.warning(f"Failed to send chunk to session {session_id}")
+                # Session already started, just send audio to queue
+                audio_sender.send(session_id, audio)
 
         except Exception as exc:
             # Xử lý lỗi gRPC hoặc Logic
             error_msg = f"Failed to process audio stream: {str(exc)}"
             logger.error("Session %s error: %s", session_id, error_msg, exc_info=True)
             
-            # #region agent log
-            try:
-                with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                    log_entry = {
-                        "timestamp": int(time.time() * 1000),
-                        "location": "transcription.py:270",
-                        "message": "send_chunk - error occurred",
-                        "data": {
-                            "session_id": session_id,
-                            "error": str(exc),
-                            "error_type": type(exc).__name__
-                        },
-                        "sessionId": "debug-session",
-                        "runId": "run1",
-                        "hypothesisId": "D"
-                    }
-                    f.write(json.dumps(log_entry) + "\n")
-            except Exception:
-                pass
-            # #endregion
             
-            await websocket.send_json({"event": "error", "message": error_msg})
+            await _send_json(websocket, {"event": "error", "message": error_msg})
             
             # Reset state để có thể thử lại nếu client muốn
             session_started = False
             # Lưu ý: Không clear pending_start_config để có thể retry start
             # Nhưng clear buffer audio để tránh tắc nghẽn bộ nhớ
-            pending_audio_chunks.clear()
+            pending_audio.clear()
             logger.error("Failed sending chunk for session %s: %s", session_id, exc)
 
-    try:
-        while True:
-            message = await websocket.receive()
-            msg_type = message.get("type")
+    async def _start(data: Dict[str, Any]) -> None:
+        """Create the recognition session; the stream starts with the first audio."""
+        nonlocal session_id, presentation_id, session_started, pending_start_config
 
-            if msg_type == "websocket.disconnect":
-                break
+        if session_id is not None:
+            await _send_json(
+                websocket,
+                {
+                    "event": "error",
+                    "message": "A session is already active; stop it first.",
+                }
+            )
+            return
 
-            if "text" in message and message["text"] is not None:
-                try:
-                    data = json.loads(message["text"])
-                except json.JSONDecodeError:
-                    await websocket.send_json(
-                        {"event": "error", "message": "JSON payload is invalid."}
-                    )
-                    continue
-
-                action = data.get("action")
-                if action == "start":
-                    if session_id is not None:
-                        await websocket.send_json(
-                            {
-                                "event": "error",
-                                "message": "A session is already active; stop it first.",
-                            }
-                        )
-                        continue
+        session_id = data.get("session_id") or uuid.uuid4().hex
+        presentation_id = data.get("presentation_id") or session_id
+        lecture_id = data.get("lecture_id")
+        if lecture_id is None:
+            await _send_json(
+                websocket,
+                {
+                    "event": "error",
+                    "message": "lecture_id is required to start transcription.",
+                }
+            )
+            session_id = None
+            return
 
-                    session_id = data.get("session_id") or uuid.uuid4().hex
-                    presentation_id = data.get("presentation_id") or session_id
-                    lecture_id = data.get("lecture_id")
-                    if lecture_id is None:
-                        await websocket.send_json(
-                            {
-                                "event": "error",
-                                "message": "lecture_id is required to start transcription.",
-                            }
-                        )
-                        session_id = None
-                        continue
+        language_code = data.get("language_code", "ja-JP")
+        model = data.get("model", "latest_long")
+        enable_interim = data.get("enable_interim_results", True)
 
-                    language_code = data.get("language_code", "ja-JP")
-                    model = data.get("model", "latest_long")
-                    enable_interim = data.get("enable_interim_results", True)
-
-                    try:
-                        await run_blocking(
-                            manager.create_session,
-                            session_id=session_id,
-                            presentation_id=presentation_id,
-                            language_code=language_code,
-                            model=model,
-                            enable_interim_results=enable_interim,
-                        )
-                    except Exception as exc:  # pragma: no cover - gRPC errors
-                        session_id = None
-                        await websocket.send_json(
-                            {
-                                "event": "error",
-                                "message": f"Failed to start session: {exc}",
-                            }
-                        )
-                        continue
+        try:
+            await run_blocking(
+                manager.create_session,
+                session_id=session_id,
+                presentation_id=presentation_id,
+                language_code=language_code,
+                model=model,
+                enable_interim_results=enable_interim,
+                result_callback=_handle_result,
+            )
+        except Exception as exc:  # pragma: no cover - gRPC errors
+            session_id = None
+            await _send_json(
+                websocket,
+                {
+                    "event": "error",
+                    "message": f"Failed to start session: {exc}",
+                }
+            )
+            return
 
-                    _set_session_context(
-                        session_id,
-                        {
-                            "lecture_id": lecture_id,
-                            "presentation_id": presentation_id,
-                            "language_code": language_code,
-                        },
-                    )
-                    pending_start_config = {
-                        "language_code": language_code,
-                        "model": model,
-                        "enable_interim_results": enable_interim,
-                    }
-                    session_started = False
-
-                    # Replay any buffered chunks (if audio arrived before "start" message)
-                    # Note: We manually manage the list here to avoid iteration issues,
-                    # then let send_chunk process each chunk. send_chunk will check
-                    # pending_audio_chunks again (now empty) and process only the current chunk.
-                    if pending_audio_chunks:
-                        logger.info(
-                            "Replaying %d buffered chunks for session %s before starting gRPC stream",
-                            len(pending_audio_chunks),
-                            session_id,
-                        )
-                        # Copy and clear to avoid iteration issues, then process each chunk
-                        buffered_chunks = pending_audio_chunks.copy()
-                        pending_audio_chunks.clear()
-                        for buffered_chunk in buffered_chunks:
-                            await send_chunk(buffered_chunk)
-                            logger.debug(
-                                "Flushed buffered chunk (%d bytes) for session %s prior to start",
-                                len(buffered_chunk),
-                                session_id,
-                            )
-
-                elif action == "stop":
-                    if session_id is None:
-                        await websocket.send_json(
-                            {
-                                "event": "error",
-                                "message": "No active session to close.",
-                            }
-                        )
-                        continue
+        _set_session_context(
+            session_id,
+            {
+                "lecture_id": lecture_id,
+                "presentation_id": presentation_id,
+                "language_code": language_code,
+            },
+        )
+        pending_start_config = {
+            "language_code": language_code,
+            "model": model,
+            "enable_interim_results": enable_interim,
+        }
+        session_started = False
 
-                    try:
-                        summary = await run_blocking(
-                            manager.close_session,
-                            session_id,
-                        )
-                    except Exception as exc:  # pragma: no cover - gRPC errors
-                        await websocket.send_json(
-                            {
-                                "event": "error",
-                                "message": f"Failed to close session: {exc}",
-                            }
-                        )
-                        session_id = None
-                        continue
+        # Replay buffered audio (if audio arrived before "start" message)
+        # as one chunk; send_chunk pre-buffers it and starts the stream.
+        if pending_audio:
+            logger.info(
+                "Replaying %d buffered bytes for session %s before starting gRPC stream",
+                len(pending_audio),
+                session_id,
+            )
+            buffered_audio = bytes(pending_audio)
+            pending_audio.clear()
+            await send_chunk(buffered_audio)
 
-                    await websocket.send_json(
-                        {
-                            "event": "session_closed",
-                            "session_id": session_id,
-                            "summary": summary,
-                        }
-                    )
-                    _pop_session_context(session_id)
-                    session_id = None
-                    session_started = False
-                    pending_start_config = None
-                    pending_audio_chunks.clear()
-
-                else:
-                    await websocket.send_json(
-                            {
-                                "event": "error",
-                                "message": f"Unsupported action: {action}",
-                            }
-                    )
+    async def _stop(data: Dict[str, Any]) -> None:
+        """Deliver pending audio, close the session and report its summary."""
+        nonlocal session_id, session_started, pending_start_config
 
-            elif "bytes" in message and message["bytes"] is not None:
-                chunk_data = message["bytes"]
-                if isinstance(chunk_data, memoryview):
-                    chunk_bytes = chunk_data.tobytes()
-                else:
-                    chunk_bytes = bytes(chunk_data)
+        if session_id is None:
+            await _send_json(
+                websocket,
+                {
+                    "event": "error",
+                    "message": "No active session to close.",
+                }
+            )
+            return
 
-                # #region agent log - Frontend audio received
-                try:
-                    with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                        log_entry = {
-                            "timestamp": int(time.time() * 1000),
-                            "location": "transcription.py:websocket.receive_bytes",
-                            "message": "Received audio bytes from frontend",
-                            "data": {
-                                "chunk_size": len(chunk_bytes),
-                                "session_id": session_id,
-                                "session_started": session_started,
-                                "pending_chunks": len(pending_audio_chunks),
-                                "has_session": session_id is not None
-                            },
-                            "sessionId": "debug-session",
-                            "runId": "run1",
-                            "hypothesisId": "E"
-                        }
-                        f.write(json.dumps(log_entry) + "\n")
-                except Exception:
-                    pass
-                # #endregion
-                
+        try:
+            # Deliver queued audio before the stream is closed; close_session
+            # sends what the chunk handler still holds
+            _cancel_pause_timer()
+            await audio_sender.flush()
+            summary = await run_blocking(
+                manager.close_session,
+                session_id,
+            )
+        except Exception as exc:  # pragma: no cover - gRPC errors
+            await _send_json(
+                websocket,
+                {
+                    "event": "error",
+                    "message": f"Failed to close session: {exc}",
+                }
+            )
+            session_id = None
+            return
+
+        await _send_json(
+            websocket,
+            {
+                "event": "session_closed",
+                "session_id": session_id,
+                "summary": summary,
+            }
+        )
+        _pop_session_context(session_id)
+        session_id = None
+        session_started = False
+        pending_start_config = None
+        pending_audio.clear()
+
+    # Control actions sent as JSON text frames
+    action_handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {
+        "start": _start,
+        "stop": _stop,
+    }
+
+    try:
+        while True:
+            message = await websocket.receive()
+
+            # Audio frames first: a single lookup on the per-frame path.
+            # Kept as received (bytes or memoryview); send_chunk copies it
+            # at most once, when it is handed to the session manager
+            chunk_bytes = message.get("bytes")
+            if chunk_bytes is not None:
                 logger.debug(
                     "Received audio chunk: %d bytes, session_id=%s, started=%s",
                     len(chunk_bytes), session_id, session_started
                 )
 
-                if session_id is None:
-                    logger.debug("Buffering chunk (%d bytes) - session not initialized", len(chunk_bytes))
-                    pending_audio_chunks.append(chunk_bytes)
-                    continue
-
+                # Buffered by send_chunk until a session is started
                 await send_chunk(chunk_bytes)
+                continue
+
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("text") is None:
+                continue
+
+            try:
+                data = orjson.loads(message["text"])
+            except orjson.JSONDecodeError:
+                await _send_json(
+                    websocket,
+                    {"event": "error", "message": "JSON payload is invalid."}
+                )
+                continue
+
+            action = data.get("action")
+            handler = action_handlers.get(action) if isinstance(action, str) else None
+            if handler is None:
+                await _send_json(
+                    websocket,
+                    {
+                        "event": "error",
+                        "message": f"Unsupported action: {action}",
+                    }
+                )
+                continue
+            await handler(data)
 
     except WebSocketDisconnect:
         pass
     finally:
         if session_id is not None:
             try:
+                _cancel_pause_timer()
+                await audio_sender.flush()
                 await run_blocking(manager.close_session, session_id)
             except Exception:
                 pass
+        audio_sender.close()
         _pop_session_context(session_id)
         session_id = None
         session_started = False
         pending_start_config = None
-        pending_audio_chunks.clear()
-        await result_queue.put(None)
+        pending_audio.clear()
+        result_queue.put_nowait(None)
         with contextlib.suppress(asyncio.CancelledError):
             await forward_task
+        if own_publisher is not None:
+            await own_publisher.close()
 
 
@@ -0,0 +1,54 @@
+"""
+Production entrypoint: run the API under uvicorn with a larger websocket write buffer.
+
+uvicorn's websocket protocols leave the transport's write high-water mark at the
+64 KiB default, so a burst of transcription events makes every further send wait
+for the socket to drain. WS_WRITE_LIMIT raises that mark (default 1 MiB) so
+events go straight into the transport buffer and only a genuinely slow client
+applies backpressure.
+
+The server runs on uvloop, whose per-await overhead is lower than the default
+asyncio loop for this many small websocket reads and writes; plain asyncio is
+used where uvloop is not installed.
+"""
+
+import os
+
+import uvicorn
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional dependency (not on Windows)
+    uvloop = None
+
+try:
+    # The protocol "--ws auto" selects on newer uvicorn releases
+    from uvicorn.protocols.websockets.websockets_sansio_impl import (
+        WebSocketsSansIOProtocol as WebSocketProtocol,
+    )
+except ImportError:
+    from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+
+WS_WRITE_LIMIT = int(os.getenv("WS_WRITE_LIMIT", str(1024 * 1024)))
+
+
+class BufferedWebSocketProtocol(WebSocketProtocol):
+    """uvicorn websockets protocol with a write high-water mark of WS_WRITE_LIMIT."""
+
+    def connection_made(self, transport) -> None:
+        super().connection_made(transport)
+        transport.set_write_buffer_limits(high=WS_WRITE_LIMIT)
+
+
+def main() -> None:
+    uvicorn.run(
+        "src.api.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8010")),
+        ws=BufferedWebSocketProtocol,
+        loop="uvloop" if uvloop is not None else "asyncio",
+    )
+
+
+if __name__ == "__main__":
+    main()
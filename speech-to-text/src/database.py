@@ -1,10 +1,14 @@
 """
-Database Module - JSON-based storage (Simple implementation)
+Database Module - SQLite storage (stdlib sqlite3, WAL journal)
 For production, replace with PostgreSQL/MySQL
 """
+import contextlib
 import json
+import logging
 import os
-from typing import Optional, List, Dict
+import sqlite3
+import threading
+from typing import Optional, List, Dict, Iterator
 from datetime import datetime
 from .models import (
     Presentation, AudioFile, SlideFile, Transcript, TranscriptSegment,
@@ -12,69 +16,225 @@ from .models import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+# One table per entity; ids are AUTOINCREMENT so they are never reused,
+# like the counters of the former JSON store. Every lookup column is indexed.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS presentations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    presentation_id TEXT NOT NULL,
+    title TEXT,
+    description TEXT,
+    language TEXT,
+    duration REAL,
+    status TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    user_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_presentations_presentation_id
+    ON presentations (presentation_id);
+-- list_presentations order (created_at DESC, id), unfiltered and by status or
+-- language; the status and language indexes also cover get_statistics
+CREATE INDEX IF NOT EXISTS idx_presentations_created_at
+    ON presentations (created_at DESC, id);
+CREATE INDEX IF NOT EXISTS idx_presentations_status_created_at
+    ON presentations (status, created_at DESC, id);
+CREATE INDEX IF NOT EXISTS idx_presentations_language_created_at
+    ON presentations (language, created_at DESC, id);
+
+CREATE TABLE IF NOT EXISTS audio_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    presentation_id INTEGER NOT NULL,
+    s3_key TEXT,
+    s3_url TEXT,
+    file_name TEXT,
+    file_size INTEGER,
+    format TEXT,
+    duration REAL,
+    upload_status TEXT,
+    uploaded_at TEXT,
+    checksum TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_audio_files_presentation_id
+    ON audio_files (presentation_id);
+
+CREATE TABLE IF NOT EXISTS slide_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    presentation_id INTEGER NOT NULL,
+    s3_key TEXT,
+    s3_url TEXT,
+    file_name TEXT,
+    file_size INTEGER,
+    page_count INTEGER,
+    upload_status TEXT,
+    uploaded_at TEXT,
+    checksum TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_slide_files_presentation_id
+    ON slide_files (presentation_id);
+
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    audio_file_id INTEGER,
+    presentation_id INTEGER NOT NULL,
+    text TEXT,
+    language_detected TEXT,
+    confidence REAL,
+    processing_status TEXT,
+    processed_at TEXT,
+    word_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_presentation_id
+    ON transcripts (presentation_id);
+
+CREATE TABLE IF NOT EXISTS transcript_segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transcript_id INTEGER NOT NULL,
+    text TEXT,
+    start_time REAL,
+    end_time REAL,
+    confidence REAL,
+    speaker_label TEXT,
+    segment_order INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_transcript_segments_transcript_id
+    ON transcript_segments (transcript_id, segment_order);
+"""
+
+# Tables of the former JSON store and the keys of their id counters
+LEGACY_TABLES = (
+    ("presentations", "presentation"),
+    ("audio_files", "audio_file"),
+    ("slide_files", "slide_file"),
+    ("transcripts", "transcript"),
+    ("transcript_segments", "segment"),
+)
+
+# Columns update_presentation may change (besides updated_at)
+PRESENTATION_COLUMNS = (
+    "presentation_id", "title", "description", "language", "duration",
+    "status", "created_at", "user_id",
+)
+
+
 class Database:
     """
-    Simple JSON-based database
-    
-    Structure:
-    {
-        "presentations": [],
-        "audio_files": [],
-        "slide_files": [],
-        "transcripts": [],
-        "transcript_segments": []
-    }
+    Simple SQLite database
+
+    Tables: presentations, audio_files, slide_files, transcripts,
+    transcript_segments. Records are returned as plain dicts.
     """
-    
-    def __init__(self, db_file: str = "database.json"):
+
+    def __init__(self, db_file: str = "database.db", legacy_json_file: Optional[str] = None):
         """
         Initialize database
-        
+
         Args:
-            db_file: Path to JSON file
+            db_file: Path to SQLite file
+            legacy_json_file: File of the former JSON store, imported once when
+                db_file is created (default: db_file with a .json extension)
         """
+        if db_file.endswith(".json"):
+            # DATABASE_FILE still pointing at the JSON store: open its .db sibling
+            legacy_json_file = legacy_json_file or db_file
+            db_file = os.path.splitext(db_file)[0] + ".db"
+            logger.warning(f"JSON database files are no longer supported, using {db_file}")
+        if legacy_json_file is None:
+            legacy_json_file = os.path.splitext(db_file)[0] + ".json"
+        created = not os.path.exists(db_file)
+
         self.db_file = db_file
+        # One connection for the lifetime of the Database: schema and pragmas
+        # are applied once and SQLite's page cache stays warm between calls
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
         self._init_db()
-    
+        if created and os.path.exists(legacy_json_file):
+            try:
+                self._import_json(legacy_json_file)
+            except Exception:
+                # Remove the new file so the import is retried on the next start
+                self.close()
+                for path in (db_file, db_file + "-wal", db_file + "-shm"):
+                    if os.path.exists(path):
+                        os.remove(path)
+                raise
+
     def _init_db(self):
-        """Initialize database file if not exists"""
-        if not os.path.exists(self.db_file):
-            initial_data = {
-                "presentations": [],
-                "audio_files": [],
-                "slide_files": [],
-                "transcripts": [],
-                "transcript_segments": [],
-                "_counters": {
-                    "presentation": 0,
-                    "audio_file": 0,
-                    "slide_file": 0,
-                    "transcript": 0,
-                    "segment": 0
-                }
-            }
-            self._write(initial_data)
-    
-    def _read(self) -> Dict:
-        """Read database"""
-        with open(self.db_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    def _write(self, data: Dict):
-        """Write database"""
-        with open(self.db_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-    
-    def _get_next_id(self, table: str) -> int:
-        """Get next auto-increment ID"""
-        data = self._read()
-        data["_counters"][table] += 1
-        next_id = data["_counters"][table]
-        self._write(data)
-        return next_id
-    
+        """Create tables if not exists and switch the file to WAL journaling"""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _import_json(self, json_file: str):
+        """
+        Copy the records of the former JSON store, keeping their ids.
+
+        The id sequences continue from the JSON counters, so ids of records
+        deleted before the migration are not reused either.
+        """
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        counters = data.get("_counters", {})
+
+        with self._connect() as conn:
+            for table, counter in LEGACY_TABLES:
+                columns = [row["name"] for row in conn.execute(f"PRAGMA table_info({table})")]
+                records = data.get(table, [])
+                for record in records:
+                    values = [record.get(column) for column in columns]
+                    conn.execute(
+                        f"INSERT INTO {table} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' for _ in columns)})",
+                        values
+                    )
+
+                seq = max([counters.get(counter, 0)] + [record["id"] for record in records])
+                if seq:
+                    conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+                    conn.execute(
+                        "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, seq)
+                    )
+
+        logger.info(f"Imported {json_file} into {self.db_file}")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Shared connection for one operation; commits on success, rolls back on error"""
+        with self._lock, self._conn:
+            yield self._conn
+
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
+
+    def _insert(self, table: str, record: Dict) -> Dict:
+        """Insert record, returning it with its new id"""
+        columns = ", ".join(record)
+        placeholders = ", ".join("?" for _ in record)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                tuple(record.values())
+            )
+        return {"id": cursor.lastrowid, **record}
+
+    def _fetch_one(self, query: str, params: tuple = ()) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+        return dict(row) if row else None
+
+    def _fetch_all(self, query: str, params: tuple = ()) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
     # ==================== PRESENTATIONS ====================
-    
+
     def create_presentation(
         self,
         presentation_id: str,
@@ -84,58 +244,53 @@ class Database:
         user_id: Optional[int] = None
     ) -> Presentation:
         """Create new presentation"""
-        data = self._read()
-        
-        presentation = {
-            "id": self._get_next_id("presentation"),
+        now = datetime.now().isoformat()
+        return self._insert("presentations", {
             "presentation_id": presentation_id,
             "title": title,
             "description": description,
             "language": language,
             "duration": None,
             "status": PresentationStatus.PENDING.value,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "created_at": now,
+            "updated_at": now,
             "user_id": user_id
-        }
-        
-        data["presentations"].append(presentation)
-        self._write(data)
-        
-        return presentation
-    
+        })
+
     def get_presentation_by_id(self, presentation_id: str) -> Optional[Dict]:
         """Get presentation by business ID"""
-        data = self._read()
-        for p in data["presentations"]:
-            if p["presentation_id"] == presentation_id:
-                return p
-        return None
-    
+        return self._fetch_one(
+            "SELECT * FROM presentations WHERE presentation_id = ? ORDER BY id LIMIT 1",
+            (presentation_id,)
+        )
+
     def get_presentation_by_pk(self, pk: int) -> Optional[Dict]:
         """Get presentation by primary key"""
-        data = self._read()
-        for p in data["presentations"]:
-            if p["id"] == pk:
-                return p
-        return None
-    
+        return self._fetch_one("SELECT * FROM presentations WHERE id = ?", (pk,))
+
     def update_presentation(self, presentation_id: str, **kwargs) -> Optional[Dict]:
         """Update presentation"""
-        data = self._read()
-        
-        for i, p in enumerate(data["presentations"]):
-            if p["presentation_id"] == presentation_id:
-                for key, value in kwargs.items():
-                    if key in p:
-                        p[key] = value
-                p["updated_at"] = datetime.now().isoformat()
-                data["presentations"][i] = p
-                self._write(data)
-                return p
-        
-        return None
-    
+        # Unknown keys are ignored, as with the former JSON store
+        changes = {key: value for key, value in kwargs.items() if key in PRESENTATION_COLUMNS}
+        changes["updated_at"] = datetime.now().isoformat()
+        assignments = ", ".join(f"{key} = ?" for key in changes)
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM presentations WHERE presentation_id = ? ORDER BY id LIMIT 1",
+                (presentation_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                f"UPDATE presentations SET {assignments} WHERE id = ?",
+                (*changes.values(), row["id"])
+            )
+            updated = conn.execute(
+                "SELECT * FROM presentations WHERE id = ?", (row["id"],)
+            ).fetchone()
+        return dict(updated)
+
     def list_presentations(
         self,
         status: Optional[str] = None,
@@ -144,62 +299,51 @@ class Database:
         offset: int = 0
     ) -> List[Dict]:
         """List presentations with filters"""
-        data = self._read()
-        presentations = data["presentations"]
-        
+        conditions = []
+        params: list = []
+
         # Apply filters
         if status:
-            presentations = [p for p in presentations if p["status"] == status]
+            conditions.append("status = ?")
+            params.append(status)
         if language:
-            presentations = [p for p in presentations if p["language"] == language]
-        
+            conditions.append("language = ?")
+            params.append(language)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
         # Sort by created_at descending
-        presentations.sort(key=lambda x: x["created_at"], reverse=True)
-        
-        return presentations[offset:offset + limit]
-    
+        return self._fetch_all(
+            f"SELECT * FROM presentations {where} "
+            "ORDER BY created_at DESC, id LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        )
+
     def delete_presentation(self, presentation_id: str) -> bool:
         """Delete presentation and related records"""
-        data = self._read()
-        
-        # Find presentation
-        presentation = None
-        for i, p in enumerate(data["presentations"]):
-            if p["presentation_id"] == presentation_id:
-                presentation = data["presentations"].pop(i)
-                break
-        
-        if not presentation:
-            return False
-        
-        presentation_pk = presentation["id"]
-        
-        # Delete related audio files
-        data["audio_files"] = [
-            af for af in data["audio_files"]
-            if af["presentation_id"] != presentation_pk
-        ]
-        
-        # Delete related slide files
-        data["slide_files"] = [
-            sf for sf in data["slide_files"]
-            if sf["presentation_id"] != presentation_pk
-        ]
-        
-        # Delete related transcripts
-        data["transcripts"] = [
-            t for t in data["transcripts"]
-            if t["presentation_id"] != presentation_pk
-        ]
-        
-        # Delete related segments
-        # (need to find transcript IDs first, but for simplicity we skip)
-        
-        self._write(data)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM presentations WHERE presentation_id = ? ORDER BY id LIMIT 1",
+                (presentation_id,)
+            ).fetchone()
+            if row is None:
+                return False
+
+            presentation_pk = row["id"]
+            conn.execute("DELETE FROM presentations WHERE id = ?", (presentation_pk,))
+
+            # Delete related segments, transcripts, audio and slide files
+            conn.execute(
+                "DELETE FROM transcript_segments WHERE transcript_id IN "
+                "(SELECT id FROM transcripts WHERE presentation_id = ?)",
+                (presentation_pk,)
+            )
+            for table in ("transcripts", "audio_files", "slide_files"):
+                conn.execute(f"DELETE FROM {table} WHERE presentation_id = ?", (presentation_pk,))
+
         return True
-    
+
     # ==================== AUDIO FILES ====================
-    
+
     def create_audio_file(
         self,
         presentation_id: int,
@@ -209,10 +353,7 @@ class Database:
         format: str = "mp3"
     ) -> Dict:
         """Create audio file record"""
-        data = self._read()
-        
-        audio_file = {
-            "id": self._get_next_id("audio_file"),
+        return self._insert("audio_files", {
             "presentation_id": presentation_id,
             "s3_key": s3_key,
             "s3_url": None,
@@ -223,23 +364,17 @@ class Database:
             "upload_status": "uploaded",
             "uploaded_at": datetime.now().isoformat(),
             "checksum": None
-        }
-        
-        data["audio_files"].append(audio_file)
-        self._write(data)
-        
-        return audio_file
-    
+        })
+
     def get_audio_file_by_presentation(self, presentation_id: int) -> Optional[Dict]:
         """Get audio file by presentation ID"""
-        data = self._read()
-        for af in data["audio_files"]:
-            if af["presentation_id"] == presentation_id:
-                return af
-        return None
-    
+        return self._fetch_one(
+            "SELECT * FROM audio_files WHERE presentation_id = ? ORDER BY id LIMIT 1",
+            (presentation_id,)
+        )
+
     # ==================== SLIDE FILES ====================
-    
+
     def create_slide_file(
         self,
         presentation_id: int,
@@ -248,10 +383,7 @@ class Database:
         file_size: int
     ) -> Dict:
         """Create slide file record"""
-        data = self._read()
-        
-        slide_file = {
-            "id": self._get_next_id("slide_file"),
+        return self._insert("slide_files", {
             "presentation_id": presentation_id,
             "s3_key": s3_key,
             "s3_url": None,
@@ -261,23 +393,17 @@ class Database:
             "upload_status": "uploaded",
             "uploaded_at": datetime.now().isoformat(),
             "checksum": None
-        }
-        
-        data["slide_files"].append(slide_file)
-        self._write(data)
-        
-        return slide_file
-    
+        })
+
     def get_slide_file_by_presentation(self, presentation_id: int) -> Optional[Dict]:
         """Get slide file by presentation ID"""
-        data = self._read()
-        for sf in data["slide_files"]:
-            if sf["presentation_id"] == presentation_id:
-                return sf
-        return None
-    
+        return self._fetch_one(
+            "SELECT * FROM slide_files WHERE presentation_id = ? ORDER BY id LIMIT 1",
+            (presentation_id,)
+        )
+
     # ==================== TRANSCRIPTS ====================
-    
+
     def create_transcript(
         self,
         audio_file_id: int,
@@ -288,10 +414,7 @@ class Database:
         word_count: int
     ) -> Dict:
         """Create transcript record"""
-        data = self._read()
-        
-        transcript = {
-            "id": self._get_next_id("transcript"),
+        return self._insert("transcripts", {
             "audio_file_id": audio_file_id,
             "presentation_id": presentation_id,
             "text": text,
@@ -300,23 +423,17 @@ class Database:
             "processing_status": "completed",
             "processed_at": datetime.now().isoformat(),
             "word_count": word_count
-        }
-        
-        data["transcripts"].append(transcript)
-        self._write(data)
-        
-        return transcript
-    
+        })
+
     def get_transcript_by_presentation(self, presentation_id: int) -> Optional[Dict]:
         """Get transcript by presentation ID"""
-        data = self._read()
-        for t in data["transcripts"]:
-            if t["presentation_id"] == presentation_id:
-                return t
-        return None
-    
+        return self._fetch_one(
+            "SELECT * FROM transcripts WHERE presentation_id = ? ORDER BY id LIMIT 1",
+            (presentation_id,)
+        )
+
     # ==================== TRANSCRIPT SEGMENTS ====================
-    
+
     def create_segment(
         self,
         transcript_id: int,
@@ -328,10 +445,7 @@ class Database:
         segment_order: int
     ) -> Dict:
         """Create transcript segment"""
-        data = self._read()
-        
-        segment = {
-            "id": self._get_next_id("segment"),
+        return self._insert("transcript_segments", {
             "transcript_id": transcript_id,
             "text": text,
             "start_time": start_time,
@@ -339,60 +453,57 @@ class Database:
             "confidence": confidence,
             "speaker_label": speaker_label,
             "segment_order": segment_order
-        }
-        
-        data["transcript_segments"].append(segment)
-        self._write(data)
-        
-        return segment
-    
+        })
+
     def get_segments_by_transcript(self, transcript_id: int) -> List[Dict]:
         """Get all segments for a transcript"""
-        data = self._read()
-        segments = [
-            s for s in data["transcript_segments"]
-            if s["transcript_id"] == transcript_id
-        ]
-        segments.sort(key=lambda x: x["segment_order"])
-        return segments
-    
+        return self._fetch_all(
+            "SELECT * FROM transcript_segments WHERE transcript_id = ? "
+            "ORDER BY segment_order, id",
+            (transcript_id,)
+        )
+
     # ==================== UTILITIES ====================
-    
+
     def get_presentation_with_files(self, presentation_id: str) -> Optional[Dict]:
         """Get presentation với audio, slide, và transcript"""
         presentation = self.get_presentation_by_id(presentation_id)
         if not presentation:
             return None
-        
+
         presentation_pk = presentation["id"]
-        
+
         result = {
             "presentation": presentation,
             "audio_file": self.get_audio_file_by_presentation(presentation_pk),
             "slide_file": self.get_slide_file_by_presentation(presentation_pk),
             "transcript": self.get_transcript_by_presentation(presentation_pk)
         }
-        
+
         return result
-    
+
     def get_statistics(self) -> Dict:
         """Get database statistics"""
-        data = self._read()
-        
-        stats = {
-            "total_presentations": len(data["presentations"]),
-            "total_audio_files": len(data["audio_files"]),
-            "total_slide_files": len(data["slide_files"]),
-            "total_transcripts": len(data["transcripts"]),
-            "by_status": {},
-            "by_language": {}
-        }
-        
-        for p in data["presentations"]:
-            status = p["status"]
-            stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
-            
-            lang = p["language"]
-            stats["by_language"][lang] = stats["by_language"].get(lang, 0) + 1
-        
+        # by_status and by_language are counted from the status and language
+        # indexes, so none of these statements reads the table rows
+        with self._connect() as conn:
+            totals = conn.execute(
+                "SELECT (SELECT COUNT(*) FROM presentations),"
+                " (SELECT COUNT(*) FROM audio_files),"
+                " (SELECT COUNT(*) FROM slide_files),"
+                " (SELECT COUNT(*) FROM transcripts)"
+            ).fetchone()
+            stats = {
+                "total_presentations": totals[0],
+                "total_audio_files": totals[1],
+                "total_slide_files": totals[2],
+                "total_transcripts": totals[3],
+                "by_status": dict(conn.execute(
+                    "SELECT status, COUNT(*) FROM presentations GROUP BY status"
+                ).fetchall()),
+                "by_language": dict(conn.execute(
+                    "SELECT language, COUNT(*) FROM presentations GROUP BY language"
+                ).fetchall())
+            }
+
         return stats
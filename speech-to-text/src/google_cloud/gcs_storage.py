@@ -2,14 +2,46 @@
 Google Cloud Storage wrapper for intermediate file storage
 Phase 1 - Week 2: AWS Integration and File Transfer Pipeline
 """
+import itertools
 import os
-from typing import Optional, Dict
+from typing import Iterable, Optional, Dict
 from google.cloud import storage
 from google.api_core import exceptions
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Downloads are fetched in 8 MiB ranged requests instead of the library's
+# small streaming reads; objects below this size take a single request.
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Deletes are sent as JSON API batch requests of at most 100 calls each
+DELETE_BATCH_SIZE = 100
+
+
+def delete_blobs_batched(client: storage.Client, blobs: Iterable[storage.Blob]) -> int:
+    """
+    Delete blobs in batch requests of DELETE_BATCH_SIZE instead of one request each
+
+    Objects that are already gone count as deleted, as in GCSStorage.delete_file.
+    Errors only surface once a batch has been sent, so any other failure is
+    raised for the whole batch.
+
+    Returns:
+        int: Number of blobs deleted
+    """
+    blobs = iter(blobs)
+    deleted_count = 0
+    while group := list(itertools.islice(blobs, DELETE_BATCH_SIZE)):
+        try:
+            with client.batch():
+                for blob in group:
+                    blob.delete()
+        except exceptions.NotFound as e:
+            logger.warning(f"⚠️  Some files were already deleted: {e}")
+        deleted_count += len(group)
+    return deleted_count
+
 
 class GCSStorage:
     """
@@ -152,21 +184,20 @@ class GCSStorage:
         """
         try:
             # Create blob reference
-            blob = self.bucket.blob(gcs_key)
-            
-            # Check if blob exists
-            if not blob.exists():
-                return {
-                    "success": False,
-                    "error": f"File not found in GCS: gs://{self.bucket_name}/{gcs_key}"
-                }
+            blob = self.bucket.blob(gcs_key, chunk_size=DOWNLOAD_CHUNK_SIZE)
             
             # Create directory if needed
             os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
             
-            # Download file
+            # Download file (a missing blob raises NotFound, no separate exists() request)
             logger.info(f"📥 Downloading gs://{self.bucket_name}/{gcs_key} to {local_file_path}")
-            blob.download_to_filename(local_file_path)
+            try:
+                blob.download_to_filename(local_file_path)
+            except exceptions.NotFound:
+                return {
+                    "success": False,
+                    "error": f"File not found in GCS: gs://{self.bucket_name}/{gcs_key}"
+                }
             
             file_size = os.path.getsize(local_file_path)
             
@@ -305,19 +336,10 @@ class GCSStorage:
         try:
             prefix = f"temp/{presentation_id}/"
             
-            # List all files
-            result = self.list_files(prefix)
-            if not result["success"]:
-                return result
-            
-            files = result["files"]
-            deleted_count = 0
-            
-            # Delete each file
-            for file_info in files:
-                delete_result = self.delete_file(file_info["key"])
-                if delete_result["success"]:
-                    deleted_count += 1
+            # Delete all files under the prefix, up to DELETE_BATCH_SIZE per request
+            deleted_count = delete_blobs_batched(
+                self.client, self.client.list_blobs(self.bucket, prefix=prefix)
+            )
             
             logger.info(f"🗑️  Cleaned up {deleted_count} files for presentation {presentation_id}")
             
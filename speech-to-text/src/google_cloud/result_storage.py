@@ -17,6 +17,7 @@ from google.cloud import storage
 from google.api_core import exceptions as google_exceptions
 
 from ..models import TranscriptionResult, ProcessingMetadata
+from .gcs_storage import delete_blobs_batched
 
 logger = logging.getLogger(__name__)
 
@@ -321,13 +322,9 @@ class GCSResultStorage:
         """
         try:
             prefix = f"presentations/{presentation_id}/transcripts/"
-            blobs = list(self.bucket.list_blobs(prefix=prefix))
-            
-            deleted_count = 0
-            for blob in blobs:
-                blob.delete()
-                deleted_count += 1
-                logger.debug(f"Deleted {blob.name}")
+            deleted_count = delete_blobs_batched(
+                self.client, self.client.list_blobs(self.bucket, prefix=prefix)
+            )
             
             logger.info(f"Deleted {deleted_count} transcript files for {presentation_id}")
             
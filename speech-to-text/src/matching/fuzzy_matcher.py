@@ -7,6 +7,7 @@ and phonetic similarity (hiragana comparison).
 
 from typing import List, Dict, Tuple, Set
 import Levenshtein
+from rapidfuzz import fuzz, process
 import logging
 
 logger = logging.getLogger(__name__)
@@ -59,6 +60,10 @@ class FuzzyMatcher:
             for reading in readings:
                 self.all_readings.append((slide_id, reading))
                 
+        # Plain string lists handed to rapidfuzz as choices
+        self._keyword_texts = [keyword for _, keyword in self.all_keywords]
+        self._reading_texts = [reading for _, reading in self.all_readings]
+                
     def match(self, 
              query_keywords: List[str],
              query_readings: List[str] = None) -> Dict[int, Dict[str, any]]:
@@ -94,15 +99,7 @@ class FuzzyMatcher:
         Returns:
             List of (slide_id, matched_keyword, similarity) tuples
         """
-        matches = []
-        
-        for slide_id, keyword in self.all_keywords:
-            similarity = self._string_similarity(query, keyword)
-            
-            if similarity >= self.similarity_threshold:
-                matches.append((slide_id, keyword, similarity))
-                
-        return matches
+        return self._extract_matches(query, self.all_keywords, self._keyword_texts)
         
     def _fuzzy_match_phonetic(self, query_reading: str) -> List[Tuple[int, str, float]]:
         """
@@ -111,13 +108,39 @@ class FuzzyMatcher:
         Returns:
             List of (slide_id, matched_reading, similarity) tuples
         """
-        matches = []
+        return self._extract_matches(query_reading, self.all_readings, self._reading_texts)
         
-        for slide_id, reading in self.all_readings:
-            similarity = self._string_similarity(query_reading, reading)
+    def _extract_matches(self,
+                         query: str,
+                         entries: List[Tuple[int, str]],
+                         choices: List[str]) -> List[Tuple[int, str, float]]:
+        """
+        Score query against all entries in one native rapidfuzz call.
+        
+        fuzz.ratio is Levenshtein.ratio on a 0-100 scale, so entries below
+        the threshold are pruned inside the C scorer; only the survivors are
+        re-scored with _string_similarity for identical values.
+        
+        Returns:
+            List of (slide_id, text, similarity) tuples in entry order
+        """
+        if not query or not choices:
+            return []
             
+        candidates = process.extract(
+            query,
+            choices,
+            scorer=fuzz.ratio,
+            processor=None,
+            score_cutoff=self.similarity_threshold * 100,
+            limit=None
+        )
+        
+        matches = []
+        for text, _, index in sorted(candidates, key=lambda c: c[2]):
+            similarity = self._string_similarity(query, text)
             if similarity >= self.similarity_threshold:
-                matches.append((slide_id, reading, similarity))
+                matches.append((entries[index][0], text, similarity))
                 
         return matches
         
@@ -20,6 +20,11 @@ import google.generativeai as genai
 logger = logging.getLogger(__name__)
 
 
+def _count_unique_keywords(slides: List[Dict[str, Any]]) -> int:
+    """Count distinct keywords across slides with a single C-level set union."""
+    return len(set().union(*(slide.get("keywords") or () for slide in slides)))
+
+
 class GeminiProcessor:
     """Process PDF slides using Gemini API."""
     
@@ -77,13 +82,23 @@ class GeminiProcessor:
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
         # Read PDF file
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
+        return self.process_pdf_stream(pdf_path_obj.read_bytes())
+    
+    def process_pdf_stream(self, pdf_bytes: bytes) -> Dict[str, Any]:
+        """
+        Process a PDF held in memory (e.g. downloaded from GCS or uploaded),
+        without writing it to disk first.
         
+        Args:
+            pdf_bytes: Raw PDF file contents
+            
+        Returns:
+            Same dictionary as process_pdf
+        """
         # Get page count
         try:
             import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
+            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
             total_pages = len(doc)
             doc.close()
         except ImportError:
@@ -94,7 +109,7 @@ class GeminiProcessor:
         
         # Process entire PDF in one request
         try:
-            result = self._process_entire_pdf(pdf_path, pdf_bytes, total_pages)
+            result = self._process_entire_pdf(pdf_bytes, total_pages)
             return result
         except Exception as e:
             logger.error(f"Error processing PDF with Gemini: {e}")
@@ -106,7 +121,7 @@ class GeminiProcessor:
                 "all_summary": "",
             }
     
-    def _process_entire_pdf(self, pdf_path: str, pdf_bytes: bytes, total_pages: int) -> Dict[str, Any]:
+    def _process_entire_pdf(self, pdf_bytes: bytes, total_pages: int) -> Dict[str, Any]:
         """Process entire PDF in one request and extract all slides data."""
         
         # Create comprehensive prompt for Gemini
@@ -153,7 +168,7 @@ PDFファイル全体を分析し、各スライド（ページ）について
             # Upload PDF to Gemini
             # Gemini can process PDF files directly
             import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
+            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
             
             # For Gemini, we can send the PDF file directly
             # But we need to use the file upload API or send as base64
@@ -245,14 +260,9 @@ PDFファイル全体を分析し、各スライド（ページ）について
                 # Sort by slide_id
                 slides.sort(key=lambda x: x.get("slide_id", 0))
             
-            # Count unique keywords
-            all_keywords = set()
-            for slide in slides:
-                all_keywords.update(slide.get("keywords", []))
-            
             return {
                 "slide_count": len(slides),
-                "keywords_count": len(all_keywords),
+                "keywords_count": _count_unique_keywords(slides),
                 "slides": slides,
                 "all_summary": all_summary,
             }
@@ -313,14 +323,9 @@ PDFファイル全体を分析し、各スライド（ページ）について
         if summary_match:
             all_summary = summary_match.group(1)
         
-        # Count unique keywords
-        all_keywords = set()
-        for slide in slides:
-            all_keywords.update(slide.get("keywords", []))
-        
         return {
             "slide_count": len(slides),
-            "keywords_count": len(all_keywords),
+            "keywords_count": _count_unique_keywords(slides),
             "slides": slides,
             "all_summary": all_summary,
         }
@@ -6,6 +6,7 @@ Supports Japanese text and identifies slide structure (titles, bullets, body).
 """
 
 import fitz  # PyMuPDF
+import functools
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
@@ -18,6 +19,19 @@ from .text_summarizer import TextSummarizer
 
 logger = logging.getLogger(__name__)
 
+# Flags for page.get_text("dict") without TEXT_PRESERVE_IMAGES: only text
+# blocks are used, so image blocks and their binary payloads are never built.
+DICT_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_summarizer() -> TextSummarizer:
+    """
+    Process-wide TextSummarizer. Building one sets up the LLM client (or loads
+    GiNZA), which used to happen for every PDFExtractor, i.e. every SlideProcessor.
+    """
+    return TextSummarizer()
+
 
 @dataclass
 class TextBlock:
@@ -80,8 +94,8 @@ class PDFExtractor:
         self.enable_noise_filtering = enable_noise_filtering
         self.enable_header_footer_filtering = enable_header_footer_filtering
         
-        # Initialize text summarizer for NLP-based text reconstruction
-        self.summarizer = TextSummarizer()
+        # Text summarizer for NLP-based text reconstruction (shared, see above)
+        self.summarizer = _shared_summarizer()
         
         # Whitelist for technical acronyms (exempt from caps ratio check)
         self.acronym_whitelist = {
@@ -112,21 +126,44 @@ class PDFExtractor:
         logger.info(f"Extracting content from PDF: {pdf_path}")
         
         try:
-            doc = fitz.open(pdf_path)
+            return self._extract_document(fitz.open(pdf_path))
+        except Exception as e:
+            logger.error(f"Error extracting PDF content: {e}")
+            raise
+    
+    def extract_from_bytes(self, pdf_bytes: bytes) -> List[SlideContent]:
+        """
+        Extract content from a PDF held in memory (upload body or GCS download),
+        without writing it to disk first.
+        
+        Args:
+            pdf_bytes: Raw PDF file contents
+            
+        Returns:
+            List of SlideContent objects, one per page
+        """
+        logger.info(f"Extracting content from in-memory PDF ({len(pdf_bytes)} bytes)")
+        
+        try:
+            return self._extract_document(fitz.open(stream=pdf_bytes, filetype="pdf"))
+        except Exception as e:
+            logger.error(f"Error extracting PDF content: {e}")
+            raise
+    
+    def _extract_document(self, doc: fitz.Document) -> List[SlideContent]:
+        """Extract every page of an open document, then close it."""
+        try:
             slides = []
             
             for page_num in range(len(doc)):
                 page = doc[page_num]
                 slide_content = self._extract_page_content(page, page_num + 1)
                 slides.append(slide_content)
-                
+        finally:
             doc.close()
-            logger.info(f"Extracted {len(slides)} slides from PDF")
-            return slides
-            
-        except Exception as e:
-            logger.error(f"Error extracting PDF content: {e}")
-            raise
+        
+        logger.info(f"Extracted {len(slides)} slides from PDF")
+        return slides
             
     def _extract_page_content(self, page: fitz.Page, page_number: int) -> SlideContent:
         """Extract and structure content from a single page"""
@@ -220,7 +257,7 @@ class PDFExtractor:
         Includes coordinate-based sorting and noise filtering.
         """
         text_blocks = []
-        blocks = page.get_text("dict")["blocks"]
+        blocks = page.get_text("dict", flags=DICT_TEXT_FLAGS)["blocks"]
         page_rect = page.rect
         page_height = page_rect.height
         
@@ -8,10 +8,15 @@ high-level interface for file and streaming pipelines.
 import logging
 import json
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 import tempfile
 
+try:
+    import ahocorasick  # pyahocorasick: Aho-Corasick automaton in C
+except ImportError:
+    ahocorasick = None
+
 from ..pdf_processing.pdf_extractor import PDFExtractor, SlideContent
 from ..pdf_processing.keyword_indexer import KeywordIndexer
 from ..pdf_processing.text_summarizer import TextSummarizer
@@ -62,6 +67,102 @@ def _simple_extract_keywords(text: str, min_length: int = 2) -> List[str]:
     return unique_keywords
 
 
+# Letters and digits of Latin-script words; keywords starting or ending with one
+# only match at a word boundary, so "api" is not found inside "rapid"
+_LATIN_WORD_CHAR = re.compile(r'[0-9A-Za-z\u00C0-\u024F]')
+
+
+def _normalize_keywords(keywords: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Map each lowercased keyword to the index keys it stands for, so the
+    transcript and the keywords are compared under the same case folding.
+    """
+    keyword_forms: Dict[str, List[str]] = {}
+    for keyword in keywords:
+        if keyword:
+            keyword_forms.setdefault(keyword.lower(), []).append(keyword)
+    return keyword_forms
+
+
+def _build_keyword_automaton(keyword_forms: Dict[str, List[str]]):
+    """
+    Compile normalized slide keywords into an Aho-Corasick automaton so a
+    transcript is scanned once for all of them. Returns None if pyahocorasick
+    is unavailable.
+    """
+    if ahocorasick is None or not keyword_forms:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for keyword in keyword_forms:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+def _at_word_boundaries(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] is not part of a longer Latin-script word."""
+    if _LATIN_WORD_CHAR.match(text[start]) and start > 0 and _LATIN_WORD_CHAR.match(text[start - 1]):
+        return False
+    if _LATIN_WORD_CHAR.match(text[end - 1]) and end < len(text) and _LATIN_WORD_CHAR.match(text[end]):
+        return False
+    return True
+
+
+def _find_keywords(
+    text: str,
+    keyword_forms: Dict[str, List[str]],
+    automaton=None
+) -> List[str]:
+    """
+    Find the index keywords occurring in a transcript.
+
+    Matching is case-insensitive and substring-based, so keywords are found in
+    Japanese text without spaces; Latin-script keywords must sit on word
+    boundaries. The automaton only speeds up the scan: without it every keyword
+    is searched for directly and the result is the same.
+
+    Returns:
+        Index keys in order of first occurrence (longer first at the same position)
+    """
+    text = text.lower()
+    first_start: Dict[str, int] = {}
+    
+    if automaton is not None:
+        # Matches arrive by end position, so the first valid one of a keyword is its earliest
+        for end, keyword in automaton.iter(text):
+            start = end - len(keyword) + 1
+            if keyword not in first_start and _at_word_boundaries(text, start, end + 1):
+                first_start[keyword] = start
+    else:
+        for keyword in keyword_forms:
+            start = text.find(keyword)
+            while start != -1:
+                if _at_word_boundaries(text, start, start + len(keyword)):
+                    first_start[keyword] = start
+                    break
+                start = text.find(keyword, start + 1)
+    
+    found = sorted(first_start, key=lambda keyword: (first_start[keyword], -len(keyword), keyword))
+    return [form for keyword in found for form in keyword_forms[keyword]]
+
+
+def _tfidf_by_slide(
+    inverted_index: Dict[str, List[Tuple[int, int, float]]]
+) -> Dict[Tuple[int, str], float]:
+    """
+    Collect the highest TF-IDF of every (slide_id, keyword) pair in one pass
+    over the inverted index, instead of scanning postings per keyword per slide.
+    """
+    scores: Dict[Tuple[int, str], float] = {}
+    for keyword, postings in inverted_index.items():
+        for slide_id, _, tfidf in postings:
+            key = (slide_id, keyword)
+            if tfidf > scores.get(key, float("-inf")):
+                scores[key] = tfidf
+    return scores
+
+
 class SlideProcessingError(Exception):
     """Base exception for slide processing errors."""
     pass
@@ -136,6 +237,8 @@ class SlideProcessor:
         self.exact_matcher = None
         self.fuzzy_matcher = None
         self.score_combiner = None
+        self.keyword_forms: Dict[str, List[str]] = {}
+        self.keyword_automaton = None
         
         # Slide data
         self.slides: List[SlideContent] = []
@@ -149,12 +252,29 @@ class SlideProcessor:
             f"embeddings={use_embeddings}"
         )
     
-    def process_pdf(self, pdf_path: str) -> Dict:
+    def process_pdf_bytes(self, pdf_bytes: bytes) -> Dict:
+        """
+        Process a PDF held in memory and build slide index, without a temp file.
+        Extracted content is not exported (there is no source path).
+        
+        Args:
+            pdf_bytes: Raw PDF file contents
+            
+        Returns:
+            dict with slide_count, keywords_count, has_embeddings
+            
+        Raises:
+            PDFProcessingError: If PDF processing fails
+        """
+        return self.process_pdf("<memory>", pdf_bytes=pdf_bytes)
+    
+    def process_pdf(self, pdf_path: str, pdf_bytes: Optional[bytes] = None) -> Dict:
         """
         Process PDF file and build slide index.
         
         Args:
             pdf_path: Path to PDF file (local or GCS)
+            pdf_bytes: PDF contents already in memory; if given, pdf_path is not read
             
         Returns:
             dict with slide_count, keywords_count, has_embeddings
@@ -166,10 +286,10 @@ class SlideProcessor:
         
         try:
             # Extract PDF content
-            extractor = PDFExtractor()
-            # The original code had: extractor = PDFExtractor()
-            # The change implies using self.pdf_extractor
-            self.slides = self.pdf_extractor.extract_from_file(pdf_path)
+            if pdf_bytes is not None:
+                self.slides = self.pdf_extractor.extract_from_bytes(pdf_bytes)
+            else:
+                self.slides = self.pdf_extractor.extract_from_file(pdf_path)
             
             if not self.slides:
                 raise PDFProcessingError("No slides extracted from PDF")
@@ -177,7 +297,7 @@ class SlideProcessor:
             logger.info(f"Extracted {len(self.slides)} slides from PDF")
             
             # Export extracted content to file if enabled
-            if self.export_extracted_content:
+            if self.export_extracted_content and pdf_bytes is None:
                 try:
                     pdf_path_obj = Path(pdf_path)
                     output_path = pdf_path_obj.parent / f"{pdf_path_obj.stem}_extracted_content.{self.export_format}"
@@ -359,6 +479,7 @@ class SlideProcessor:
             # This ensures we only keep keywords that are significant and relevant
             # Keywords are filtered per page based on their importance in the document
             filtered_slide_keywords = {}
+            slide_tfidf = _tfidf_by_slide(inverted_index)
             for slide_id, keywords in zip(slide_ids, slide_keywords_list):
                 if not keywords:
                     filtered_slide_keywords[slide_id] = []
@@ -376,13 +497,9 @@ class SlideProcessor:
                 
                 # Calculate TF-IDF for each unique keyword in this slide
                 for kw, count in keyword_counts.items():
-                    # Get TF-IDF from index (lookup returns list of (slide_id, position, tfidf))
-                    matches = self.keyword_indexer.lookup(kw)
-                    # Find matches for this slide
-                    slide_matches = [m for m in matches if m[0] == slide_id]
-                    if slide_matches:
-                        # Use the highest TF-IDF score for this keyword in this slide
-                        max_tfidf = max(m[2] for m in slide_matches)
+                    # Highest TF-IDF for this keyword in this slide, precomputed above
+                    max_tfidf = slide_tfidf.get((slide_id, kw))
+                    if max_tfidf is not None:
                         keyword_scores.append((kw, max_tfidf))
                     else:
                         # Fallback: calculate manually
@@ -428,6 +545,8 @@ class SlideProcessor:
             
             # Initialize matchers
             self.exact_matcher = ExactMatcher(inverted_index)
+            self.keyword_forms = _normalize_keywords(inverted_index)
+            self.keyword_automaton = _build_keyword_automaton(self.keyword_forms)
             self.fuzzy_matcher = FuzzyMatcher(
                 self.slide_keywords,
                 similarity_threshold=0.8
@@ -488,8 +607,12 @@ class SlideProcessor:
             keywords = _simple_extract_keywords(text, min_length=2)
             readings = []  # Readings not available without NLP models
             
+            # Index keywords inside the transcript, also where words are not
+            # space-delimited (Japanese); one automaton scan when available
+            exact_keywords = _find_keywords(text, self.keyword_forms, self.keyword_automaton)
+            
             # Run two-pass matching (semantic matching removed)
-            exact_results = self.exact_matcher.match(keywords)
+            exact_results = self.exact_matcher.match(exact_keywords)
             fuzzy_results = self.fuzzy_matcher.match(keywords, readings)
             
             semantic_results = {}  # Semantic matching disabled (local models removed)
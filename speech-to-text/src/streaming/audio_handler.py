@@ -223,9 +223,7 @@ class AudioChunkHandler:
             if split_chunk:
                 chunks.append(split_chunk)
         
-        logger.info(
-            f"Split large chunk ({len(chunk)} bytes) into {len(chunks)} chunks"
-        )
+        logger.info("Split large chunk (%d bytes) into %d chunks", len(chunk), len(chunks))
         return chunks
     
     def _flush_accumulator(self, force: bool = False) -> list[bytes]:
@@ -250,9 +248,7 @@ class AudioChunkHandler:
                 if len(self.accumulator) % 2 != 0:
                     self.accumulator.append(0)  # Pad with zero
                 chunks_to_send.append(bytes(self.accumulator))
-                logger.debug(
-                    f"Force flushed accumulator: {len(self.accumulator)} bytes"
-                )
+                logger.debug("Force flushed accumulator: %d bytes", len(self.accumulator))
                 self.accumulator.clear()
         else:
             # Normal flush: only send if >= MIN_CHUNK_SIZE
@@ -260,9 +256,7 @@ class AudioChunkHandler:
                 chunk = bytes(self.accumulator[:self.validator.MIN_CHUNK_SIZE])
                 chunks_to_send.append(chunk)
                 self.accumulator = self.accumulator[self.validator.MIN_CHUNK_SIZE:]
-                logger.debug(
-                    f"Flushed chunk from accumulator: {len(chunk)} bytes"
-                )
+                logger.debug("Flushed chunk from accumulator: %d bytes", len(chunk))
         
         return chunks_to_send
     
@@ -302,9 +296,7 @@ class AudioChunkHandler:
             
             # Step 2: Check alignment (must be even for 16-bit samples)
             if len(chunk) % 2 != 0:
-                logger.warning(
-                    f"Chunk size {len(chunk)} not aligned. Padding with zero."
-                )
+                logger.warning("Chunk size %d not aligned. Padding with zero.", len(chunk))
                 chunk = chunk + b'\x00'  # Pad with zero
             
             # Step 3: Handle large chunks (> MAX_CHUNK_SIZE)
@@ -324,8 +316,8 @@ class AudioChunkHandler:
                 # Add to accumulator
                 self.accumulator.extend(chunk)
                 logger.debug(
-                    f"Buffered small chunk ({len(chunk)} bytes) in accumulator. "
-                    f"Total: {len(self.accumulator)} bytes"
+                    "Buffered small chunk (%d bytes) in accumulator. Total: %d bytes",
+                    len(chunk), len(self.accumulator),
                 )
                 
                 # Try to flush if accumulator has enough data
@@ -340,9 +332,8 @@ class AudioChunkHandler:
             ready_chunks.append(chunk)
             
             logger.debug(
-                f"Processed normal chunk: {len(chunk)} bytes, "
-                f"ready_chunks={len(ready_chunks)}, "
-                f"accumulator_size={len(self.accumulator)}"
+                "Processed normal chunk: %d bytes, ready_chunks=%d, accumulator_size=%d",
+                len(chunk), len(ready_chunks), len(self.accumulator),
             )
             
             # Update metrics
@@ -8,12 +8,10 @@ Manages:
 - Automatic renewal before 5-minute timeout
 """
 
-import json
 import logging
 import time
 import threading
 import queue
-from pathlib import Path
 from typing import Optional, Dict, Callable
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
@@ -164,7 +162,8 @@ class StreamingSessionManager:
         presentation_id: str,
         language_code: str = "ja-JP",
         model: str = "latest_long",
-        enable_interim_results: bool = True
+        enable_interim_results: bool = True,
+        result_callback: Optional[Callable] = None
     ) -> StreamingSession:
         """
         Create a new streaming session.
@@ -175,6 +174,8 @@ class StreamingSessionManager:
             language_code: Language code (default: ja-JP)
             model: Speech model (default: latest_long)
             enable_interim_results: Enable interim results (default: True)
+            result_callback: Callback for this session's results
+                (default: the manager's result_callback)
             
         Returns:
             StreamingSession object
@@ -192,7 +193,7 @@ class StreamingSessionManager:
                 presentation_id=presentation_id,
                 audio_handler=AudioChunkHandler(max_buffer_size=2),
                 result_handler=StreamingResultHandler(
-                        result_callback=self.result_callback,
+                        result_callback=result_callback or self.result_callback,
                         session_id=session_id,
                         presentation_id=presentation_id
                 )
@@ -440,10 +441,9 @@ class StreamingSessionManager:
                 return False
             
             # Log before processing
-            queue_size_before = session.audio_queue.qsize()
             logger.debug(
-                f"Processing chunk for session {session_id}: "
-                f"input_size={len(chunk)}, queue_size_before={queue_size_before}"
+                "Processing chunk for session %s: input_size=%d, queue_size_before=%d",
+                session_id, len(chunk), session.audio_queue.qsize(),
             )
             
             # Process chunk (returns list of ready chunks after handling edge cases)
@@ -452,8 +452,8 @@ class StreamingSessionManager:
             if not ready_chunks:
                 # Chunk was buffered in accumulator, not ready to send yet
                 logger.debug(
-                    f"Chunk buffered in accumulator for session {session_id}: "
-                    f"input_size={len(chunk)}, queue_size={session.audio_queue.qsize()}"
+                    "Chunk buffered in accumulator for session %s: input_size=%d, queue_size=%d",
+                    session_id, len(chunk), session.audio_queue.qsize(),
                 )
                 return True
             
@@ -461,12 +461,12 @@ class StreamingSessionManager:
             for ready_chunk in ready_chunks:
                 # Final validation before queuing
                 if not ready_chunk or len(ready_chunk) == 0:
-                    logger.warning(f"Empty ready chunk, skipping")
+                    logger.warning("Empty ready chunk, skipping")
                     continue
                 
                 # Ensure even byte count (required for 16-bit LINEAR16)
                 if len(ready_chunk) % 2 != 0:
-                    logger.warning(f"Chunk size {len(ready_chunk)} not even, padding")
+                    logger.warning("Chunk size %d not even, padding", len(ready_chunk))
                     ready_chunk = ready_chunk + b'\x00'
                 
                 try:
@@ -477,37 +477,14 @@ class StreamingSessionManager:
                     session.total_bytes_sent += len(ready_chunk)
                     session.last_audio_time = time.time()
                     
-                    queue_size = session.audio_queue.qsize()
-                    logger.info(
-                        f"Queued chunk for session {session_id}: "
-                        f"{len(ready_chunk)} bytes "
-                        f"(total: {session.total_chunks_sent} chunks, "
-                        f"{session.total_bytes_sent} bytes, queue_size={queue_size})"
+                    logger.debug(
+                        "Queued chunk for session %s: %d bytes "
+                        "(total: %d chunks, %d bytes, queue_size=%d)",
+                        session_id, len(ready_chunk),
+                        session.total_chunks_sent, session.total_bytes_sent,
+                        session.audio_queue.qsize(),
                     )
                     
-                    # #region agent log
-                    try:
-                        DEBUG_LOG_PATH = Path("/home/sagiri/Code/itss-nihongo/.cursor/debug.log")
-                        with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                            log_entry = {
-                                "timestamp": int(time.time() * 1000),
-                                "location": "session_manager.py:471",
-                                "message": "Chunk queued successfully",
-                                "data": {
-                                    "session_id": session_id,
-                                    "chunk_size": len(ready_chunk),
-                                    "queue_size": queue_size,
-                                    "total_chunks_sent": session.total_chunks_sent
-                                },
-                                "sessionId": "debug-session",
-                                "runId": "run1",
-                                "hypothesisId": "M"
-                            }
-                            f.write(json.dumps(log_entry) + "\n")
-                    except Exception:
-                        pass
-                    # #endregion
-                    
                 except queue.Full:
                     logger.error(
                         f"Audio queue full for session {session_id}, dropping chunk"
@@ -546,6 +523,46 @@ class StreamingSessionManager:
                 raise StreamInterruptedError(f"Failed to send audio chunk: {e}")
             return False
     
+    def flush_audio(self, session_id: str) -> bool:
+        """
+        Queue audio held in the session's accumulator (< MIN_CHUNK_SIZE).
+
+        Call when the client pauses, so the end of an utterance reaches
+        Google without waiting for more audio.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if audio was queued
+
+        Raises:
+            SessionNotFoundError: If session doesn't exist
+        """
+        session = self.get_session(session_id)
+
+        if session.status not in (SessionStatus.ACTIVE, SessionStatus.INITIALIZING):
+            return False
+
+        queued = False
+        for remaining_chunk in session.audio_handler.flush_all():
+            try:
+                session.audio_queue.put(remaining_chunk, timeout=1.0)
+            except queue.Full:
+                logger.error(
+                    f"Audio queue full for session {session_id}, dropping flushed audio"
+                )
+                return False
+            session.total_chunks_sent += 1
+            session.total_bytes_sent += len(remaining_chunk)
+            session.last_audio_time = time.time()
+            queued = True
+            logger.debug(
+                "Flushed accumulated audio for session %s: %d bytes",
+                session_id, len(remaining_chunk),
+            )
+        return queued
+
     def close_session(self, session_id: str) -> dict:
         """
         Close a streaming session gracefully.
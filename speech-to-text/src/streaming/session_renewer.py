@@ -303,6 +303,7 @@ class SessionRenewer:
                 new_session = self.session_manager.create_session(
                     session_id=session_id,
                     presentation_id=session.presentation_id,
+                    result_callback=session.result_handler.result_callback,
                 )
                 
                 # Start new session
@@ -0,0 +1,28 @@
+"""
+Tests for the transcript budget applied to analysis prompts.
+"""
+
+from src.api.routers import analysis
+from src.api.routers.analysis import _join_transcript
+
+
+class TestJoinTranscript:
+    """_join_transcript keeps the prompt transcript within MAX_TRANSCRIPT_CHARS."""
+
+    def test_texts_within_budget_are_joined(self, monkeypatch):
+        monkeypatch.setattr(analysis, "_MAX_TRANSCRIPT_CHARS", 20)
+        assert _join_transcript(["abc", "def"]) == "abc def"
+
+    def test_text_crossing_the_budget_is_cut(self, monkeypatch):
+        monkeypatch.setattr(analysis, "_MAX_TRANSCRIPT_CHARS", 10)
+        result = _join_transcript(["abcd", "efghijkl", "mnop"])
+        assert result == "abcd efghi"
+        assert len(result) == 10
+
+    def test_single_long_text_is_not_dropped(self, monkeypatch):
+        monkeypatch.setattr(analysis, "_MAX_TRANSCRIPT_CHARS", 5)
+        assert _join_transcript(["あいうえおかきくけこ"]) == "あいうえお"
+
+    def test_exact_fit_adds_nothing_more(self, monkeypatch):
+        monkeypatch.setattr(analysis, "_MAX_TRANSCRIPT_CHARS", 4)
+        assert _join_transcript(["abcd", "efgh"]) == "abcd"
@@ -0,0 +1,55 @@
+"""
+Tests for the analytics router's handling of requests without segments.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routers import analytics
+
+
+class NoCalls:
+    """Extractor/analyzer stand-in failing any call: empty input must not reach it."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"{name} called for a request without segments")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(analytics, "_EXTRACTOR", NoCalls())
+    monkeypatch.setattr(analytics, "_ANALYZER", NoCalls())
+    app = FastAPI()
+    app.include_router(analytics.router, prefix="/analytics")
+    return TestClient(app)
+
+
+EMPTY_REQUEST = {"presentation_id": "p1", "segments": []}
+
+
+class TestEmptySegments:
+    """Every endpoint answers an empty request without running the pipelines."""
+
+    @pytest.mark.parametrize("path", [
+        "/analytics/context-extraction",
+        "/analytics/intention-analysis",
+        "/analytics/full",
+    ])
+    def test_analysis_endpoints(self, client, path):
+        response = client.post(path, json=EMPTY_REQUEST)
+        assert response.status_code == 200
+        assert response.json()["presentation_id"] == "p1"
+
+    def test_export_json(self, client):
+        response = client.post("/analytics/context-extraction/export/json", json=EMPTY_REQUEST)
+        assert response.status_code == 200
+        assert response.json()["total_contexts"] == 0
+        assert response.json()["contexts"] == []
+
+    @pytest.mark.parametrize("fmt", ["text", "html"])
+    def test_export_reports(self, client, fmt):
+        response = client.post(f"/analytics/context-extraction/export/{fmt}", json=EMPTY_REQUEST)
+        assert response.status_code == 200
+        assert response.json()["format"] == fmt
+        assert response.json()["content"]
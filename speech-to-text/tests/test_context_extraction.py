@@ -420,6 +420,29 @@ class TestContextExtractor:
         
         assert len(contexts_low) >= len(contexts_high)
 
+    def test_extract_contexts_threshold_override(self):
+        """Test that a per-call threshold overrides the constructor threshold."""
+        extractor = ContextExtractor(min_importance_threshold=30.0)
+
+        segments = [
+            {
+                "text": "Low importance segment",
+                "start_time": 0.0,
+                "end_time": 3.0,
+                "confidence": 0.5,
+                "word_count": 5,
+                "slide_id": 1,
+                "matched_keywords": [],
+            },
+        ]
+
+        assert extractor.extract_contexts(segments, []) == []
+
+        contexts = extractor.extract_contexts(segments, [], min_importance_threshold=0.0)
+
+        assert len(contexts) == 1
+        assert extractor.min_importance_threshold == 30.0
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,187 @@
+"""
+Tests for the SQLite-backed Database, including the import of the former
+JSON store.
+"""
+
+import json
+
+import pytest
+
+from src.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "database.db"))
+    yield database
+    database.close()
+
+
+def _presentation_with_files(db: Database, presentation_id: str) -> dict:
+    """Create a presentation with audio, slides, a transcript and two segments."""
+    presentation = db.create_presentation(presentation_id, f"Title {presentation_id}")
+    pk = presentation["id"]
+    audio = db.create_audio_file(pk, f"audio/{presentation_id}.mp3", "talk.mp3", 1024)
+    db.create_slide_file(pk, f"slides/{presentation_id}.pdf", "slides.pdf", 2048)
+    transcript = db.create_transcript(audio["id"], pk, "こんにちは 世界", "ja", 0.9, 2)
+    db.create_segment(transcript["id"], "世界", 1.0, 2.0, 0.9, None, 1)
+    db.create_segment(transcript["id"], "こんにちは", 0.0, 1.0, 0.9, None, 0)
+    return {"presentation": presentation, "transcript": transcript}
+
+
+class TestPresentations:
+    """Create, read, update, list and delete presentations."""
+
+    def test_create_and_get(self, db):
+        created = db.create_presentation("p1", "Lecture", description="intro", user_id=7)
+        assert created["id"] == 1
+        assert created["status"] == "pending"
+        assert db.get_presentation_by_id("p1") == created
+        assert db.get_presentation_by_pk(1) == created
+        assert db.get_presentation_by_id("missing") is None
+
+    def test_update_ignores_unknown_columns(self, db):
+        db.create_presentation("p1", "Lecture")
+        updated = db.update_presentation("p1", status="completed", duration=12.5, bogus=1)
+        assert updated["status"] == "completed"
+        assert updated["duration"] == 12.5
+        assert "bogus" not in updated
+        assert db.update_presentation("missing", status="completed") is None
+
+    def test_list_filters_and_orders_newest_first(self, db):
+        db.create_presentation("p1", "One", language="ja")
+        db.create_presentation("p2", "Two", language="en")
+        db.create_presentation("p3", "Three", language="ja")
+        db.update_presentation("p1", created_at="2024-01-01T00:00:00")
+        db.update_presentation("p2", created_at="2024-01-02T00:00:00", status="completed")
+        db.update_presentation("p3", created_at="2024-01-03T00:00:00")
+
+        assert [p["presentation_id"] for p in db.list_presentations()] == ["p3", "p2", "p1"]
+        assert [p["presentation_id"] for p in db.list_presentations(language="ja")] == ["p3", "p1"]
+        assert [p["presentation_id"] for p in db.list_presentations(status="completed")] == ["p2"]
+        assert [p["presentation_id"] for p in db.list_presentations(limit=1, offset=1)] == ["p2"]
+
+    def test_delete_cascades_to_related_records(self, db):
+        deleted = _presentation_with_files(db, "p1")
+        kept = _presentation_with_files(db, "p2")
+
+        assert db.delete_presentation("p1") is True
+        assert db.delete_presentation("p1") is False
+
+        pk = deleted["presentation"]["id"]
+        assert db.get_presentation_by_id("p1") is None
+        assert db.get_audio_file_by_presentation(pk) is None
+        assert db.get_slide_file_by_presentation(pk) is None
+        assert db.get_transcript_by_presentation(pk) is None
+        assert db.get_segments_by_transcript(deleted["transcript"]["id"]) == []
+        assert len(db.get_segments_by_transcript(kept["transcript"]["id"])) == 2
+
+
+class TestRelatedRecords:
+    """Files, transcripts and segments of a presentation."""
+
+    def test_presentation_with_files(self, db):
+        created = _presentation_with_files(db, "p1")
+        result = db.get_presentation_with_files("p1")
+        assert result["presentation"] == created["presentation"]
+        assert result["audio_file"]["file_name"] == "talk.mp3"
+        assert result["slide_file"]["file_name"] == "slides.pdf"
+        assert result["transcript"] == created["transcript"]
+        assert db.get_presentation_with_files("missing") is None
+
+    def test_segments_are_returned_in_order(self, db):
+        created = _presentation_with_files(db, "p1")
+        segments = db.get_segments_by_transcript(created["transcript"]["id"])
+        assert [s["text"] for s in segments] == ["こんにちは", "世界"]
+
+    def test_statistics(self, db):
+        _presentation_with_files(db, "p1")
+        db.create_presentation("p2", "Two", language="en")
+        db.update_presentation("p2", status="completed")
+        assert db.get_statistics() == {
+            "total_presentations": 2,
+            "total_audio_files": 1,
+            "total_slide_files": 1,
+            "total_transcripts": 1,
+            "by_status": {"pending": 1, "completed": 1},
+            "by_language": {"ja": 1, "en": 1},
+        }
+
+    def test_file_uses_wal_journal(self, db):
+        with db._connect() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+LEGACY_DATA = {
+    "presentations": [
+        {
+            "id": 2, "presentation_id": "p2", "title": "Old", "description": None,
+            "language": "ja", "duration": None, "status": "completed",
+            "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00",
+            "user_id": None,
+        },
+    ],
+    "audio_files": [],
+    "slide_files": [],
+    "transcripts": [
+        {
+            "id": 1, "audio_file_id": None, "presentation_id": 2, "text": "古い",
+            "language_detected": "ja", "confidence": 0.8, "processing_status": "completed",
+            "processed_at": "2024-01-01T00:00:00", "word_count": 1,
+        },
+    ],
+    "transcript_segments": [
+        {
+            "id": 1, "transcript_id": 1, "text": "古い", "start_time": 0.0, "end_time": 1.0,
+            "confidence": 0.8, "speaker_label": None, "segment_order": 0,
+        },
+    ],
+    "_counters": {"presentation": 3, "audio_file": 0, "slide_file": 0, "transcript": 1, "segment": 1},
+}
+
+
+class TestJsonMigration:
+    """A new database file imports the former database.json once."""
+
+    @pytest.fixture
+    def legacy_file(self, tmp_path):
+        path = tmp_path / "database.json"
+        path.write_text(json.dumps(LEGACY_DATA, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    def test_records_keep_their_ids(self, tmp_path, legacy_file):
+        db = Database(str(tmp_path / "database.db"))
+        assert db.get_presentation_by_id("p2")["id"] == 2
+        assert db.get_transcript_by_presentation(2)["text"] == "古い"
+        assert [s["text"] for s in db.get_segments_by_transcript(1)] == ["古い"]
+        # Ids continue after the JSON counters
+        assert db.create_presentation("p4", "New")["id"] == 4
+        assert db.create_audio_file(4, "a", "a.mp3", 1)["id"] == 1
+        db.close()
+
+    def test_existing_database_is_not_reimported(self, tmp_path, legacy_file):
+        Database(str(tmp_path / "database.db")).close()
+        db = Database(str(tmp_path / "database.db"))
+        db.delete_presentation("p2")
+        db.close()
+
+        db = Database(str(tmp_path / "database.db"))
+        assert db.get_presentation_by_id("p2") is None
+        db.close()
+
+    def test_json_path_opens_the_db_sibling(self, tmp_path, legacy_file):
+        db = Database(str(legacy_file))
+        assert db.db_file == str(tmp_path / "database.db")
+        assert db.get_presentation_by_id("p2") is not None
+        db.close()
+
+    def test_failed_import_is_retried(self, tmp_path, legacy_file):
+        legacy_file.write_text("{not json", encoding="utf-8")
+        with pytest.raises(json.JSONDecodeError):
+            Database(str(tmp_path / "database.db"))
+        assert not (tmp_path / "database.db").exists()
+
+        legacy_file.write_text(json.dumps(LEGACY_DATA), encoding="utf-8")
+        db = Database(str(tmp_path / "database.db"))
+        assert db.get_presentation_by_id("p2") is not None
+        db.close()
@@ -0,0 +1,162 @@
+"""
+Tests for the Gemini model fallback and prompt caching of the final-analysis router.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from src.api.routers import final_analysis
+
+MODELS = ("model-a", "model-b", "model-c")
+
+
+class FakeModel:
+    """Raises the error configured for its name, else answers with the name."""
+
+    def __init__(self, name: str, errors: dict, calls: list):
+        self.name = name
+        self.errors = errors
+        self.calls = calls
+
+    async def generate_content_async(self, contents):
+        self.calls.append(self.name)
+        error = self.errors.get(self.name)
+        if error is not None:
+            raise error
+        return self.name
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """Install MODELS with per-model errors; returns (errors, calls)."""
+    errors, calls = {}, []
+    monkeypatch.setattr(final_analysis, "MODEL_NAMES", MODELS)
+    monkeypatch.setattr(final_analysis, "_model_index", 0)
+
+    async def model_for(name):
+        return FakeModel(name, errors, calls)
+
+    monkeypatch.setattr(final_analysis, "_model_for", model_for)
+    return errors, calls
+
+
+def _generate() -> str:
+    return asyncio.run(final_analysis._generate_content("prompt"))
+
+
+class TestGenerateContentFallback:
+    """NotFound moves every later request on; InvalidArgument only this one."""
+
+    def test_not_found_advances_the_shared_model(self, models):
+        errors, calls = models
+        errors["model-a"] = google_exceptions.NotFound("gone")
+        assert _generate() == "model-b"
+        assert final_analysis._model_index == 1
+        assert _generate() == "model-b"
+        assert calls == ["model-a", "model-b", "model-b"]
+
+    def test_invalid_argument_falls_back_for_this_request_only(self, models):
+        errors, calls = models
+        errors["model-a"] = google_exceptions.InvalidArgument("image too large")
+        assert _generate() == "model-b"
+        assert final_analysis._model_index == 0
+
+        del errors["model-a"]
+        assert _generate() == "model-a"
+        assert calls == ["model-a", "model-b", "model-a"]
+
+    def test_fallbacks_are_tried_in_order(self, models):
+        errors, _ = models
+        errors["model-a"] = google_exceptions.InvalidArgument("bad request")
+        errors["model-b"] = google_exceptions.NotFound("gone")
+        assert _generate() == "model-c"
+        # model-b was not the shared model, so the shared index stays
+        assert final_analysis._model_index == 0
+
+    def test_last_model_error_is_raised(self, models):
+        errors, _ = models
+        for name in MODELS:
+            errors[name] = google_exceptions.NotFound("gone")
+        with pytest.raises(google_exceptions.NotFound):
+            _generate()
+
+    def test_concurrent_not_found_advances_once(self, models):
+        errors, _ = models
+        errors["model-a"] = google_exceptions.NotFound("gone")
+
+        async def run():
+            return await asyncio.gather(
+                *[final_analysis._generate_content("prompt") for _ in range(3)]
+            )
+
+        assert asyncio.run(run()) == ["model-b"] * 3
+        assert final_analysis._model_index == 1
+
+
+class FakeCache:
+    name = "cachedContents/test"
+
+
+@pytest.fixture
+def cache_create(monkeypatch):
+    """Replace CachedContent.create; returns (threads it ran on, settable outcome)."""
+    calls = []
+    outcome = {"error": None}
+
+    def create(**kwargs):
+        calls.append(threading.get_ident())
+        if outcome["error"] is not None:
+            raise outcome["error"]
+        return FakeCache()
+
+    monkeypatch.setattr(final_analysis.genai.caching.CachedContent, "create", create)
+    monkeypatch.setattr(
+        final_analysis.genai.GenerativeModel, "from_cached_content",
+        classmethod(lambda cls, cache, **kwargs: ("cached-model", cache)),
+    )
+    monkeypatch.setattr(final_analysis, "PROMPT_CACHE_ENABLED", True)
+    monkeypatch.setattr(final_analysis, "_prompt_caches", {})
+    monkeypatch.setattr(final_analysis, "_prompt_cache_retry_at", {})
+    return calls, outcome
+
+
+def _cached_model(name: str = "model-a"):
+    return asyncio.run(final_analysis._cached_content_model(name))
+
+
+class TestPromptCache:
+    """Cache creation runs off the event loop; only a too-small prompt disables it."""
+
+    def test_cache_is_created_off_the_event_loop_once(self, cache_create):
+        calls, _ = cache_create
+        model, cache = _cached_model()
+        assert model == "cached-model"
+        assert isinstance(cache, FakeCache)
+        assert calls and calls[0] != threading.get_ident()
+        _cached_model()
+        assert len(calls) == 1
+
+    def test_prompt_below_minimum_disables_caching(self, cache_create):
+        _, outcome = cache_create
+        outcome["error"] = google_exceptions.InvalidArgument(
+            "Cached content is too small. total_token_count=900, min_total_token_count=4096"
+        )
+        assert _cached_model() is None
+        assert final_analysis.PROMPT_CACHE_ENABLED is False
+
+    def test_transient_failure_backs_off(self, cache_create, monkeypatch):
+        calls, outcome = cache_create
+        outcome["error"] = google_exceptions.ServiceUnavailable("try again")
+        assert _cached_model() is None
+        assert final_analysis.PROMPT_CACHE_ENABLED is True
+        # Within the backoff no create is attempted
+        assert _cached_model() is None
+        assert len(calls) == 1
+
+        outcome["error"] = None
+        monkeypatch.setattr(final_analysis, "_prompt_cache_retry_at", {})
+        assert _cached_model()[0] == "cached-model"
+        assert len(calls) == 2
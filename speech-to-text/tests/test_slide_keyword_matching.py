@@ -0,0 +1,68 @@
+"""
+Tests for transcript keyword lookup in SlideProcessor.match_segment.
+
+The Aho-Corasick automaton (pyahocorasick) is optional; both code paths must
+find the same keywords.
+"""
+
+import pytest
+
+from src.slide_processing import slide_processor
+from src.slide_processing.slide_processor import (
+    _build_keyword_automaton,
+    _find_keywords,
+    _normalize_keywords,
+)
+
+requires_automaton = pytest.mark.skipif(
+    slide_processor.ahocorasick is None, reason="pyahocorasick not installed"
+)
+
+KEYWORDS = ["api", "データ", "cat", "Python", "データベース", "C++", "REST"]
+
+TEXTS = [
+    "rapid category about データベース Python",
+    "The API returns data",
+    "Pythonでデータを読む",
+    "python3 and C++ code",
+    "RESTful cat api",
+    "",
+]
+
+
+def _find(text: str, use_automaton: bool) -> list:
+    keyword_forms = _normalize_keywords(KEYWORDS)
+    automaton = _build_keyword_automaton(keyword_forms) if use_automaton else None
+    return _find_keywords(text, keyword_forms, automaton)
+
+
+class TestFindKeywords:
+    """Keyword lookup without the automaton (always available)."""
+
+    def test_latin_keywords_need_word_boundaries(self):
+        assert _find("rapid category about データベース Python", False) == ["データベース", "データ", "Python"]
+
+    def test_case_insensitive_returns_index_keys(self):
+        assert _find("The API returns data", False) == ["api"]
+
+    def test_japanese_substrings_match(self):
+        assert _find("Pythonでデータを読む", False) == ["Python", "データ"]
+
+    def test_digits_extend_latin_words(self):
+        assert _find("python3 and C++ code", False) == ["C++"]
+
+    def test_keys_differing_only_in_case_are_all_returned(self):
+        keyword_forms = _normalize_keywords(["Python", "python"])
+        assert _find_keywords("I like PYTHON", keyword_forms) == ["Python", "python"]
+
+
+@requires_automaton
+class TestFindKeywordsWithAutomaton:
+    """The automaton path agrees with the plain search."""
+
+    @pytest.mark.parametrize("text", TEXTS)
+    def test_same_result_as_plain_search(self, text):
+        assert _find(text, True) == _find(text, False)
+
+    def test_reported_mismatch(self):
+        assert _find("rapid category about データベース Python", True) == ["データベース", "データ", "Python"]
@@ -0,0 +1,77 @@
+"""
+Tests for downloading slide decks from GCS in parallel byte ranges.
+"""
+
+import threading
+
+import pytest
+from fastapi import HTTPException
+from google.api_core import exceptions as gcs_exceptions
+
+from src.api.routers import slides
+
+
+class FakeBucket:
+    """Serves one object; records every ranged GET."""
+
+    name = "bucket"
+
+    def __init__(self, data: bytes, missing: bool = False):
+        self.data = data
+        self.missing = missing
+        self.ranges = []
+        self.lock = threading.Lock()
+
+    def blob(self, name, generation=None):
+        return FakeBlob(self, name, generation)
+
+
+class FakeBlob:
+    """Blob as returned by get_blob: size and generation already loaded."""
+
+    def __init__(self, bucket: FakeBucket, name: str, generation: int = 7):
+        self.bucket = bucket
+        self.name = name
+        self.generation = generation
+        self.size = len(bucket.data)
+
+    def reload(self):
+        raise AssertionError("metadata is fetched again")
+
+    def download_as_bytes(self, start=None, end=None):
+        assert self.generation == 7
+        if self.bucket.missing:
+            raise gcs_exceptions.NotFound("gone")
+        with self.bucket.lock:
+            self.bucket.ranges.append((start, end))
+        if start is None:
+            return self.bucket.data
+        return self.bucket.data[start:end + 1]
+
+
+@pytest.fixture(autouse=True)
+def small_parts(monkeypatch):
+    monkeypatch.setattr(slides, "GCS_DOWNLOAD_PART_SIZE", 10)
+    monkeypatch.setattr(slides, "GCS_DOWNLOAD_MAX_PARTS", 4)
+
+
+class TestDownloadGcsBytes:
+    """The blob from _get_blob is downloaded without another metadata request."""
+
+    def test_small_object_is_one_request(self):
+        bucket = FakeBucket(b"x" * 10)
+        assert slides._download_gcs_bytes(FakeBlob(bucket, "deck.pdf")) == b"x" * 10
+        assert bucket.ranges == [(None, None)]
+
+    def test_large_object_is_fetched_in_ranges(self):
+        data = bytes(range(95))
+        bucket = FakeBucket(data)
+        assert slides._download_gcs_bytes(FakeBlob(bucket, "deck.pdf")) == data
+        # 95 bytes in at most 4 parts of at least 10 bytes
+        assert sorted(bucket.ranges) == [(0, 23), (24, 47), (48, 71), (72, 94)]
+
+    def test_deleted_object_is_not_found(self):
+        bucket = FakeBucket(b"x" * 50, missing=True)
+        with pytest.raises(HTTPException) as excinfo:
+            slides._download_gcs_bytes(FakeBlob(bucket, "deck.pdf"))
+        assert excinfo.value.status_code == 404
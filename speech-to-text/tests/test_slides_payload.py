@@ -0,0 +1,85 @@
+"""
+Tests for the /slides/upload and /slides/process payloads, which are built
+without Pydantic validation.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routers import slides
+from src.api.routers.slides import _build_slide_payload
+
+
+class TestBuildSlidePayload:
+    """Model output is coerced to the SlideDetails shape."""
+
+    def test_well_formed_slide_is_unchanged(self):
+        slides = [{"slide_id": 1, "keywords": ["データ", "API"], "summary": "要約"}]
+        assert _build_slide_payload(slides) == slides
+
+    def test_fields_are_coerced(self):
+        slides = [{"slide_id": "2", "keywords": [3, "api", None], "summary": None}]
+        assert _build_slide_payload(slides) == [
+            {"slide_id": 2, "keywords": ["3", "api", "None"], "summary": ""}
+        ]
+
+    def test_keywords_that_are_not_a_list_become_empty(self):
+        for keywords in ("api, data", {"api": 1}, None, 5):
+            payload = _build_slide_payload([{"slide_id": 1, "keywords": keywords}])
+            assert payload[0]["keywords"] == []
+
+
+# Gemini output with the types the payload must not pass through unchanged
+RAW_RESULT = {
+    "slide_count": 1,
+    "keywords_count": 2,
+    "all_summary": None,
+    "slides": [{"slide_id": "1", "keywords": "api, data", "summary": None}],
+}
+
+EXPECTED_SLIDES = [{"slide_id": 1, "keywords": [], "summary": ""}]
+
+
+class FakeGeminiProcessor:
+    def process_pdf_stream(self, contents):
+        return RAW_RESULT
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(slides, "_gemini_processor", FakeGeminiProcessor)
+    monkeypatch.setattr(slides, "_slide_result_cache", slides.OrderedDict())
+    monkeypatch.setattr(slides, "_get_blob", lambda bucket, name: SimpleNamespace(generation=1))
+    monkeypatch.setattr(slides, "_download_gcs_bytes", lambda blob: b"%PDF")
+    app = FastAPI()
+    app.include_router(slides.router, prefix="/slides")
+    return TestClient(app)
+
+
+class TestSlideEndpoints:
+    """Both endpoints coerce Gemini output the same way."""
+
+    def test_upload_coerces_gemini_output(self, client):
+        response = client.post(
+            "/slides/upload",
+            files={"file": ("deck.pdf", b"%PDF", "application/pdf")},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        body = response.json()
+        assert body["all_summary"] == ""
+        assert body["slides"] == EXPECTED_SLIDES
+
+    def test_process_coerces_gemini_output(self, client):
+        response = client.post(
+            "/slides/process",
+            json={"lecture_id": 3, "gcs_uri": "gs://bucket/deck.pdf"},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["lecture_id"] == 3
+        assert body["all_summary"] == ""
+        assert body["slides"] == EXPECTED_SLIDES
@@ -0,0 +1,204 @@
+"""
+Tests for the real-time transcription router.
+
+The backend is a local aiohttp server, so publishing goes over real HTTP; the
+websocket endpoint runs against the real session manager with the gRPC stream
+left out.
+"""
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routers import transcription
+from src.streaming import session_manager
+from src.streaming.audio_handler import AudioChunkValidator
+
+MIN_CHUNK_SIZE = AudioChunkValidator.MIN_CHUNK_SIZE
+
+
+def _payload(index: int) -> dict:
+    return {"lecture_id": 1, "session_id": "s1", "text": f"final {index}", "is_final": True}
+
+
+class FakeBackend:
+    """Records POSTs; batch_status/item_status decide the responses."""
+
+    def __init__(self, batch_status: int = 201, batch_body: str = "[]", item_status: int = 201):
+        self.batch_status = batch_status
+        self.batch_body = batch_body
+        self.item_status = item_status
+        self.batches = []
+        self.items = []
+
+    async def batch(self, request):
+        self.batches.append(await request.json())
+        return web.Response(status=self.batch_status, text=self.batch_body, content_type="application/json")
+
+    async def item(self, request):
+        self.items.append(await request.json())
+        return web.Response(status=self.item_status, text="{}", content_type="application/json")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/transcriptions/batch", self.batch)
+        app.router.add_post("/api/transcriptions", self.item)
+        return app
+
+
+def _publish(monkeypatch, backend: FakeBackend, payloads: list, base_url: str = None):
+    """Submit payloads to a started publisher, close it and return the publisher."""
+
+    async def run():
+        server = TestServer(backend.app())
+        await server.start_server()
+        monkeypatch.setattr(
+            transcription, "BACKEND_BASE_URL", base_url or str(server.make_url("")).rstrip("/")
+        )
+        publisher = transcription.BackendPublisher()
+        publisher.start()
+        for payload in payloads:
+            publisher.submit(payload)
+        await publisher.close()
+        await server.close()
+        return publisher
+
+    return asyncio.run(run())
+
+
+class TestBackendPublisher:
+    """Batching and fallback of final-result publishing."""
+
+    def test_results_are_posted_as_one_batch(self, monkeypatch):
+        backend = FakeBackend()
+        _publish(monkeypatch, backend, [_payload(i) for i in range(3)])
+        assert backend.batches == [[_payload(0), _payload(1), _payload(2)]]
+        assert backend.items == []
+
+    def test_single_result_is_posted_alone(self, monkeypatch):
+        backend = FakeBackend()
+        _publish(monkeypatch, backend, [_payload(0)])
+        assert backend.batches == []
+        assert backend.items == [_payload(0)]
+
+    def test_missing_batch_route_disables_batching(self, monkeypatch):
+        backend = FakeBackend(batch_status=405, batch_body="")
+        publisher = _publish(monkeypatch, backend, [_payload(0), _payload(1)])
+        assert backend.items == [_payload(0), _payload(1)]
+        assert publisher._batch_supported is False
+
+    def test_application_not_found_keeps_batching(self, monkeypatch):
+        """One stale lecture_id rejects the batch; the rest is retried item by item."""
+        backend = FakeBackend(
+            batch_status=404,
+            batch_body='{"status": 404, "error": "Not Found", "message": "lecture_not_found"}',
+        )
+        publisher = _publish(monkeypatch, backend, [_payload(0), _payload(1)])
+        assert backend.items == [_payload(0), _payload(1)]
+        assert publisher._batch_supported is True
+
+    def test_route_not_found_disables_batching(self, monkeypatch):
+        backend = FakeBackend(batch_status=404, batch_body='{"status": 404, "error": "Not Found"}')
+        publisher = _publish(monkeypatch, backend, [_payload(0), _payload(1)])
+        assert backend.items == [_payload(0), _payload(1)]
+        assert publisher._batch_supported is False
+
+    def test_unanswered_batch_is_not_reposted(self, monkeypatch):
+        """Without a response the batch may be stored already, so it is dropped."""
+        backend = FakeBackend()
+        # Nothing listens on port 9 (discard), so the POST fails without a response
+        publisher = _publish(monkeypatch, backend, [_payload(0), _payload(1)], base_url="http://127.0.0.1:9")
+        assert backend.batches == []
+        assert backend.items == []
+        assert publisher._batch_supported is True
+
+    def test_submit_before_start_is_a_no_op(self):
+        publisher = transcription.BackendPublisher()
+        publisher.submit(_payload(0))
+        assert publisher._queue.empty()
+
+    def test_full_queue_drops_oldest_results(self, monkeypatch):
+        monkeypatch.setattr(transcription, "PUBLISH_QUEUE_SIZE", 2)
+        backend = FakeBackend()
+        _publish(monkeypatch, backend, [_payload(i) for i in range(4)])
+        assert backend.batches == [[_payload(2), _payload(3)]]
+        assert backend.items == []
+
+
+class QueueingManager(session_manager.StreamingSessionManager):
+    """
+    Real session manager (and AudioChunkHandler) without the gRPC stream.
+
+    start_session only activates the session, so the audio it would stream to
+    Google stays in the session's audio queue, where the tests read it.
+    """
+
+    def __init__(self, monkeypatch):
+        monkeypatch.setattr(session_manager, "SpeechClient", lambda: None)
+        super().__init__(project_id="test-project")
+        self.queues = {}
+
+    def start_session(self, session_id, **config):
+        session = self.get_session(session_id)
+        session.status = session_manager.SessionStatus.ACTIVE
+        self.queues[session_id] = session.audio_queue
+        return True
+
+    def wait_for(self, count: int, session_id: str = "s1", timeout: float = 2.0) -> list:
+        """Sizes of the chunks queued for Google, once count have arrived (or on timeout)."""
+        audio_queue = self.queues[session_id]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and audio_queue.qsize() < count:
+            time.sleep(0.01)
+        return [len(chunk) for chunk in list(audio_queue.queue) if chunk is not None]
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """Websocket client on /ws/transcribe with a started session, plus its manager."""
+    manager = QueueingManager(monkeypatch)
+    monkeypatch.setattr(transcription, "ensure_credentials_path", lambda: None)
+    monkeypatch.setattr(transcription, "_resolve_project_id", lambda credentials_path: "test-project")
+    monkeypatch.setattr(transcription, "_session_manager", lambda credentials_path, project_id: manager)
+    app = FastAPI()
+    app.include_router(transcription.router, prefix="/ws")
+
+    with TestClient(app).websocket_connect("/ws/transcribe") as websocket:
+        websocket.send_json({"action": "start", "lecture_id": 1, "session_id": "s1"})
+        # The first audio starts the recognition stream and is sent as is
+        websocket.send_bytes(b"\x00" * MIN_CHUNK_SIZE)
+        assert websocket.receive_json()["event"] == "session_started"
+        yield websocket, manager
+
+
+class TestAudioStreaming:
+    """Small frames reach Google in MIN_CHUNK_SIZE blocks, and all of it after a pause."""
+
+    FRAME = 640  # 20 ms of LINEAR16 audio
+
+    def test_small_frames_are_sent_as_one_block(self, stream, monkeypatch):
+        monkeypatch.setattr(transcription, "PAUSE_FLUSH_DELAY", 5.0)
+        websocket, manager = stream
+        for _ in range(MIN_CHUNK_SIZE // self.FRAME):
+            websocket.send_bytes(b"\x00" * self.FRAME)
+        assert manager.wait_for(2) == [MIN_CHUNK_SIZE, MIN_CHUNK_SIZE]
+
+    def test_held_audio_is_sent_when_the_client_pauses(self, stream, monkeypatch):
+        monkeypatch.setattr(transcription, "PAUSE_FLUSH_DELAY", 0.05)
+        websocket, manager = stream
+        websocket.send_bytes(b"\x00" * self.FRAME)
+        # No further frame and no stop: the pause flushes the handler's accumulator
+        assert manager.wait_for(2) == [MIN_CHUNK_SIZE, self.FRAME]
+
+    def test_no_flush_while_frames_keep_arriving(self, stream, monkeypatch):
+        monkeypatch.setattr(transcription, "PAUSE_FLUSH_DELAY", 0.2)
+        websocket, manager = stream
+        for _ in range(2 * MIN_CHUNK_SIZE // self.FRAME):
+            websocket.send_bytes(b"\x00" * self.FRAME)
+            time.sleep(0.02)
+        assert manager.wait_for(3) == [MIN_CHUNK_SIZE, MIN_CHUNK_SIZE, MIN_CHUNK_SIZE]